@@ -330,6 +330,7 @@ switch ($choice) {
         $dataDestination  = "$venvFolder\Borealis"
         $customUIPath     = "$dataSource\Server\WebUI"
         $webUIDestination = "$venvFolder\web-interface"
+        $workflowsDestination = "$venvFolder\Workflows"
         $venvPython       = Join-Path $venvFolder 'Scripts\python.exe'
 
         # Create Virtual Environment & Copy Server Assets
@@ -343,6 +344,19 @@ switch ($choice) {
                 Copy-Item "$dataSource\Server\Sounds"                 $dataDestination -Recurse
                 Copy-Item "$dataSource\Server\server.py"              $dataDestination
             }
+            # Saved workflows (and their blobs) live outside the recreated server folder;
+            # bundled workflows are only added where no file of that name exists yet.
+            New-Item -Path $workflowsDestination -ItemType Directory -Force | Out-Null
+            if (Test-Path "Workflows") {
+                $bundledRoot = (Resolve-Path "Workflows").Path
+                Get-ChildItem $bundledRoot -Recurse -File | ForEach-Object {
+                    $target = Join-Path $workflowsDestination $_.FullName.Substring($bundledRoot.Length + 1)
+                    if (-not (Test-Path $target)) {
+                        New-Item -Path (Split-Path $target -Parent) -ItemType Directory -Force | Out-Null
+                        Copy-Item $_.FullName $target
+                    }
+                }
+            }
             . "$venvFolder\Scripts\Activate"
         }
 
@@ -385,6 +399,7 @@ switch ($choice) {
             Push-Location (Join-Path $scriptDir "Server")
             $py        = Join-Path $scriptDir "Server\Scripts\python.exe"
             $server_py = Join-Path $scriptDir "Server\Borealis\server.py"
+            $env:BOREALIS_WORKFLOWS_DIR = Join-Path $scriptDir $workflowsDestination
 
             Write-Host "`nLaunching Borealis..." -ForegroundColor Green
             Write-Host "===================================================================================="
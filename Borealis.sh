@@ -90,6 +90,7 @@ launch_server() {
     dataDestination="${venvFolder}/Borealis"
     customUIPath="${dataSource}/WebUI"
     webUIDestination="${venvFolder}/web-interface"
+    workflowsDestination="${venvFolder}/Workflows"
     venvPython="${venvFolder}/bin/python3"
 
     # Create Python venv
@@ -111,10 +112,16 @@ launch_server() {
         rm -rf '${dataDestination}' && mkdir -p '${dataDestination}'
         cp -r '${dataSource}/Python_API_Endpoints' '${dataDestination}/'
         cp -r '${dataSource}/Sounds' '${dataDestination}/'
-        cp -r '${dataSource}/Workflows' '${dataDestination}/'
         cp     '${dataSource}/server.py' '${dataDestination}/'
     "
 
+    # Saved workflows (and their blobs) live outside the recreated server folder;
+    # bundled workflows are only added where no file of that name exists yet.
+    run_step "Seed Bundled Workflows" bash -c "
+        mkdir -p '${workflowsDestination}'
+        cp -rn 'Workflows/.' '${workflowsDestination}/'
+    "
+
     # Setup Vite WebUI assets
     run_step "Setup Vite WebUI assets" bash -c "
         rm -rf '${webUIDestination}' && mkdir -p '${webUIDestination}'
@@ -139,6 +146,7 @@ launch_server() {
     echo -e "\n${GREEN}Launching Borealis Flask Server...${RESET}"
     echo "===================================================================================="
     source '${venvFolder}/bin/activate'
+    export BOREALIS_WORKFLOWS_DIR="$(pwd)/${workflowsDestination}"
     python3 "${dataDestination}/server.py"
 }
 
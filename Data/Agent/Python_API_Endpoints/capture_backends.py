@@ -0,0 +1,174 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Agent/Python_API_Endpoints/capture_backends.py
+import os
+import sys
+import time
+import glob
+import threading
+
+from PIL import Image
+
+# ---------------------------------------------------------------------
+# Screen Capture Backends
+# ---------------------------------------------------------------------
+# Selected with "capture_backend" in agent_settings.json:
+#   "auto"      - mss when installed, otherwise ImageGrab
+#   "imagegrab" - PIL.ImageGrab (the original capture path)
+#   "mss"       - python-mss; noticeably faster for small regions at short intervals
+#   "synthetic" - no screen access: replays the images in "capture_replay_path"
+#                 (or generated test frames when it is empty), for headless testing
+# Every backend returns an RGB PIL image for a (left, top, right, bottom) bbox and
+# may be called from several executor threads at once.
+
+class CaptureBackend:
+    name = "base"
+
+    def grab(self, bbox) -> Image.Image:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class ImageGrabBackend(CaptureBackend):
+    name = "imagegrab"
+
+    def __init__(self):
+        from PIL import ImageGrab
+        self._grab = ImageGrab.grab
+
+    def grab(self, bbox):
+        return self._grab(bbox=bbox)
+
+class MSSBackend(CaptureBackend):
+    name = "mss"
+
+    def __init__(self):
+        import mss
+        self._mss = mss
+        # mss handles are bound to the thread that created them.
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+
+    def _handle(self):
+        handle = getattr(self._local, "handle", None)
+        if handle is None:
+            handle = self._local.handle = self._mss.mss()
+            with self._lock:
+                self._handles.append(handle)
+        return handle
+
+    def grab(self, bbox):
+        left, top, right, bottom = bbox
+        shot = self._handle().grab({"left": left, "top": top, "width": right - left, "height": bottom - top})
+        return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+
+    def close(self):
+        with self._lock:
+            handles, self._handles = self._handles, []
+        for handle in handles:
+            try:
+                handle.close()
+            except Exception:
+                pass
+
+class SyntheticBackend(CaptureBackend):
+    """
+    Replays image files (sorted by name, one per grab, looping) as if they were the
+    desktop; regions are cropped from them. With no replay path, frames are generated.
+    """
+    name = "synthetic"
+
+    def __init__(self, replay_path="", size=(1920, 1080)):
+        self._frames = []
+        self._index = 0
+        self._lock = threading.Lock()
+        if replay_path:
+            paths = [replay_path] if os.path.isfile(replay_path) else sorted(
+                p for ext in ("png", "jpg", "jpeg", "bmp") for p in glob.glob(os.path.join(replay_path, f"*.{ext}"))
+            )
+            self._frames = [Image.open(p).convert("RGB") for p in paths]
+            if not self._frames:
+                print(f"[capture] No replay images found at {replay_path}; using generated frames.")
+        if not self._frames:
+            self._frames = [self._generated_frame(size, step) for step in range(8)]
+
+    @staticmethod
+    def _generated_frame(size, step):
+        # Horizontal gradient with a moving block, so consecutive frames differ slightly.
+        width, height = size
+        gradient = Image.linear_gradient("L").resize(size).convert("RGB")
+        block = Image.new("RGB", (width // 8, height // 8), (255, 64, 0))
+        gradient.paste(block, ((step * width // 8) % width, height // 3))
+        return gradient
+
+    def grab(self, bbox):
+        with self._lock:
+            frame = self._frames[self._index]
+            self._index = (self._index + 1) % len(self._frames)
+        left, top, right, bottom = bbox
+        # Regions outside the replayed image come back black, like an unplugged monitor.
+        return frame.crop((left, top, right, bottom))
+
+CAPTURE_BACKENDS = {
+    "imagegrab": ImageGrabBackend,
+    "mss": MSSBackend,
+    "synthetic": SyntheticBackend
+}
+
+def create_backend(name="auto", replay_path="") -> CaptureBackend:
+    """Create the configured backend, falling back to ImageGrab when it is unavailable."""
+    name = (name or "auto").lower().strip()
+    if name == "synthetic":
+        return SyntheticBackend(replay_path)
+    candidates = ["mss", "imagegrab"] if name == "auto" else [name, "imagegrab"]
+    for candidate in candidates:
+        backend_cls = CAPTURE_BACKENDS.get(candidate)
+        if backend_cls is None:
+            print(f"[capture] Unknown capture backend '{candidate}'.")
+            continue
+        try:
+            return backend_cls()
+        except Exception as e:
+            if name != "auto":
+                print(f"[capture] Capture backend '{candidate}' unavailable: {e}")
+    raise RuntimeError("No screen capture backend is available on this system.")
+
+# ---------------------------------------------------------------------
+# Capture Benchmark
+# ---------------------------------------------------------------------
+# Run: python capture_backends.py [backend ...]   (defaults to every backend that loads)
+def benchmark(backends=None, sizes=((300, 200), (800, 600), (1920, 1080)), iterations=50):
+    results = []
+    for name in backends or list(CAPTURE_BACKENDS):
+        try:
+            backend = CAPTURE_BACKENDS[name]()
+            backend.grab((0, 0, 16, 16))
+        except Exception as e:
+            results.append({"backend": name, "error": str(e)})
+            continue
+        try:
+            for width, height in sizes:
+                timings = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    backend.grab((0, 0, width, height))
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                total_s = sum(timings) / 1000
+                results.append({
+                    "backend": name,
+                    "size": f"{width}x{height}",
+                    "captures_per_sec": round(iterations / total_s, 1) if total_s else None,
+                    "avg_ms": round(sum(timings) / len(timings), 2),
+                    "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2)
+                })
+        finally:
+            backend.close()
+    return results
+
+if __name__ == "__main__":
+    for row in benchmark(sys.argv[1:] or None):
+        if "error" in row:
+            print(f"{row['backend']:>10}  unavailable: {row['error']}")
+        else:
+            print(f"{row['backend']:>10}  {row['size']:>10}  {row['captures_per_sec']:>8} captures/s  avg {row['avg_ms']:>7.2f} ms  p95 {row['p95_ms']:>7.2f} ms")
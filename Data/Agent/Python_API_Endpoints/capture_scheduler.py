@@ -0,0 +1,157 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Agent/Python_API_Endpoints/capture_scheduler.py
+import math
+import time
+import asyncio
+import concurrent.futures
+
+import numpy as np
+from PIL import Image
+
+# ---------------------------------------------------------------------
+# Agent-Wide Capture Scheduler
+# ---------------------------------------------------------------------
+# One scheduler serves every screenshot role of the agent:
+# - Role ticks are phase-aligned to their interval on the monotonic clock, so roles
+#   with the same (or a multiple) interval become due at the same instant.
+# - capture() requests that arrive within coalesce_ms of each other are merged: one
+#   grab of their bounding box, then each region is cropped out with NumPy slicing.
+#   Regions far apart are grabbed separately when a shared box would mostly be waste.
+# - It owns the only capture/encode thread pool, which is shut down with the agent.
+# - get_backend() is only called on the event loop, once per flush, and the backend is
+#   handed to the grabs; one replaced by a settings change is closed by the scheduler
+#   once the grabs still running on it have finished.
+
+class CaptureScheduler:
+    def __init__(self, get_backend, max_workers=4, coalesce_ms=5, max_waste=2.0):
+        self._get_backend = get_backend
+        self._backend = None
+        self._grabs_in_flight = {}  # backend -> grabs still running on it
+        self.max_workers = max(1, int(max_workers))
+        self.coalesce_s = coalesce_ms / 1000.0
+        # A merged grab may cover at most this multiple of the regions' own area.
+        self.max_waste = max_waste
+        self._executor = None
+        self._pending = []
+        self._flush_handle = None
+        self.requests = 0
+        self.grabs = 0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="borealis-capture"
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        """Run CPU work (diffing, encoding) on the scheduler's pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def wait_tick(self, interval):
+        """Sleep until the next multiple of interval (seconds) on the monotonic clock."""
+        interval = max(0.001, interval)
+        now = time.monotonic()
+        await asyncio.sleep(math.ceil(now / interval + 1e-9) * interval - now)
+
+    def capture(self, bbox) -> asyncio.Future:
+        """Capture a (left, top, right, bottom) region; resolves to an RGB PIL image."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((tuple(int(v) for v in bbox), future))
+        self.requests += 1
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.coalesce_s, self._flush)
+        return future
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        backend = self._current_backend()
+        for group in self._group(pending):
+            self.grabs += 1
+            self._grabs_in_flight[backend] = self._grabs_in_flight.get(backend, 0) + 1
+            job = loop.run_in_executor(self.executor, self._grab_group, backend, [bbox for bbox, _ in group])
+            job.add_done_callback(lambda done, backend=backend: self._release(backend))
+            job.add_done_callback(lambda done, group=group: self._resolve(group, done))
+
+    def _current_backend(self):
+        backend = self._get_backend()
+        if backend is not self._backend:
+            retired, self._backend = self._backend, backend
+            if retired is not None and not self._grabs_in_flight.get(retired):
+                retired.close()
+        return backend
+
+    def _release(self, backend):
+        self._grabs_in_flight[backend] -= 1
+        if not self._grabs_in_flight[backend]:
+            del self._grabs_in_flight[backend]
+            if backend is not self._backend:
+                backend.close()
+
+    def _group(self, pending):
+        # Greedy: add each region to the first group whose merged box stays compact enough.
+        groups = []
+        for bbox, future in sorted(pending, key=lambda item: (item[0][1], item[0][0])):
+            for group in groups:
+                union = _union([bbox] + [b for b, _ in group["items"]])
+                if _area(union) <= self.max_waste * (group["area"] + _area(bbox)):
+                    group["items"].append((bbox, future))
+                    group["area"] += _area(bbox)
+                    break
+            else:
+                groups.append({"items": [(bbox, future)], "area": _area(bbox)})
+        return [group["items"] for group in groups]
+
+    def _grab_group(self, backend, boxes):
+        union = _union(boxes)
+        image = backend.grab(union)
+        if len(boxes) == 1:
+            return [image]
+        pixels = np.asarray(image)
+        left, top = union[0], union[1]
+        return [
+            Image.fromarray(np.ascontiguousarray(pixels[y0 - top:y1 - top, x0 - left:x1 - left]))
+            for x0, y0, x1, y1 in boxes
+        ]
+
+    @staticmethod
+    def _resolve(group, done):
+        error = done.exception()
+        images = None if error else done.result()
+        for index, (_, future) in enumerate(group):
+            if future.done():
+                continue  # The role was cancelled while the grab ran.
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(images[index])
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "grabs": self.grabs,
+            "coalesced": self.requests - self.grabs
+        }
+
+    def shutdown(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+def _union(boxes):
+    return (
+        min(b[0] for b in boxes), min(b[1] for b in boxes),
+        max(b[2] for b in boxes), max(b[3] for b in boxes)
+    )
+
+def _area(box):
+    return max(0, box[2] - box[0]) * max(0, box[3] - box[1])
@@ -0,0 +1,98 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Agent/Python_API_Endpoints/frame_diff.py
+import time
+
+import numpy as np
+
+# ---------------------------------------------------------------------
+# Frame Change Detection
+# ---------------------------------------------------------------------
+# Compares each capture of a screenshot role with the previous one, on a grid of
+# tile_size x tile_size tiles. Modes (role config "change_detection"):
+#   "off"   - every capture is sent in full
+#   "skip"  - unchanged captures are not sent at all
+#   "tiles" - unchanged captures are skipped and partly changed ones only send their
+#             dirty tiles, which the server pastes onto the previous frame
+# A full keyframe is still sent every keyframe_interval seconds, when the region
+# size changes, or when the server asks for one.
+
+CHANGE_DETECTION_MODES = ("off", "skip", "tiles")
+
+def dirty_tiles(previous: np.ndarray, current: np.ndarray, tile_size: int) -> list[tuple]:
+    """Return changed (x, y, w, h) rectangles; horizontally adjacent dirty tiles are merged."""
+    changed = np.any(previous != current, axis=2) if current.ndim == 3 else previous != current
+    height, width = changed.shape
+    rows, cols = -(-height // tile_size), -(-width // tile_size)
+    padded = np.zeros((rows * tile_size, cols * tile_size), dtype=bool)
+    padded[:height, :width] = changed
+    grid = padded.reshape(rows, tile_size, cols, tile_size).any(axis=(1, 3))
+
+    rects = []
+    for row in range(rows):
+        col = 0
+        while col < cols:
+            if not grid[row, col]:
+                col += 1
+                continue
+            start = col
+            while col < cols and grid[row, col]:
+                col += 1
+            x, y = start * tile_size, row * tile_size
+            rects.append((x, y, min(col * tile_size, width) - x, min(tile_size, height - y)))
+    return rects
+
+class FrameChangeDetector:
+    def __init__(self, mode="skip", tile_size=64, keyframe_interval=10.0, max_dirty_ratio=0.5):
+        self.mode = mode if mode in CHANGE_DETECTION_MODES else "skip"
+        self.tile_size = max(8, int(tile_size))
+        self.keyframe_interval = float(keyframe_interval)
+        # Above this share of dirty pixels a full frame is cheaper than tiles.
+        self.max_dirty_ratio = max_dirty_ratio
+        self._previous = None
+        self._last_keyframe = 0.0
+        self.force_keyframe = True
+        self.frames_seen = 0
+        self.frames_skipped = 0
+        self.frames_tiled = 0
+
+    def check(self, image):
+        """
+        Classify a capture as ("skip", None), ("full", None) or ("tiles", rects).
+        Safe to call from an executor thread; one detector belongs to one role.
+        """
+        self.frames_seen += 1
+        if self.mode == "off":
+            return "full", None
+
+        current = np.asarray(image)
+        previous, self._previous = self._previous, current
+        now = time.monotonic()
+        if (
+            self.force_keyframe
+            or previous is None
+            or previous.shape != current.shape
+            or now - self._last_keyframe >= self.keyframe_interval
+        ):
+            self.force_keyframe = False
+            self._last_keyframe = now
+            return "full", None
+
+        rects = dirty_tiles(previous, current, self.tile_size)
+        if not rects:
+            self.frames_skipped += 1
+            return "skip", None
+        if self.mode == "tiles":
+            dirty = sum(w * h for _, _, w, h in rects)
+            if dirty <= self.max_dirty_ratio * current.shape[0] * current.shape[1]:
+                self.frames_tiled += 1
+                return "tiles", rects
+        # Any full frame refreshes the server's copy, so it counts as a keyframe.
+        self._last_keyframe = now
+        return "full", None
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "frames_seen": self.frames_seen,
+            "frames_skipped": self.frames_skipped,
+            "frames_tiled": self.frames_tiled
+        }
@@ -0,0 +1,66 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Agent/Python_API_Endpoints/frame_encoding.py
+import time
+from io import BytesIO
+
+from PIL import Image, features
+
+# ---------------------------------------------------------------------
+# Screenshot Frame Encoding
+# ---------------------------------------------------------------------
+# Per-role codec options (screenshot role config):
+#   "encoding":  "png" (default), "jpeg" or "webp"
+#   "png_level": PNG compress level 0-9 (lower is faster, larger)
+#   "quality":   JPEG / WebP quality 1-100
+#   "scale":     downscale factor applied right after capture (0.1 - 1.0)
+# Everything here runs in the capture executor, never on the Qt / asyncio loop.
+
+FRAME_FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+
+class EncodingOptions:
+    def __init__(self, encoding="png", png_level=6, quality=80, scale=1.0):
+        encoding = str(encoding or "png").lower().replace("jpg", "jpeg")
+        if encoding not in FRAME_FORMATS:
+            print(f"[encoding] Unknown frame encoding '{encoding}', using png.")
+            encoding = "png"
+        if encoding == "webp" and not features.check("webp"):
+            print("[encoding] This Pillow build has no WebP support, using png.")
+            encoding = "png"
+        self.encoding = encoding
+        self.png_level = min(9, max(0, int(png_level)))
+        self.quality = min(100, max(1, int(quality)))
+        self.scale = min(1.0, max(0.1, float(scale)))
+
+    @classmethod
+    def from_role(cls, cfg):
+        return cls(
+            cfg.get("encoding", "png"),
+            cfg.get("png_level", 6),
+            cfg.get("quality", 80),
+            cfg.get("scale", 1.0)
+        )
+
+    @property
+    def mime_type(self):
+        return f"image/{self.encoding}"
+
+def downscale(image: Image.Image, options: EncodingOptions) -> Image.Image:
+    if options.scale >= 1.0:
+        return image
+    size = (max(1, round(image.width * options.scale)), max(1, round(image.height * options.scale)))
+    return image.resize(size, Image.BILINEAR)
+
+def encode_image(image: Image.Image, options: EncodingOptions) -> bytes:
+    buf = BytesIO()
+    if options.encoding == "png":
+        image.save(buf, format="PNG", compress_level=options.png_level)
+    elif options.encoding == "jpeg":
+        image.convert("RGB").save(buf, format="JPEG", quality=options.quality)
+    else:
+        image.save(buf, format="WEBP", quality=options.quality, method=0)
+    return buf.getvalue()
+
+def timed_encode(image, options):
+    """Encode and return (bytes, elapsed milliseconds)."""
+    started = time.perf_counter()
+    data = encode_image(image, options)
+    return data, (time.perf_counter() - started) * 1000
@@ -1,6 +1,8 @@
 #////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Agent/Python_API_Endpoints/macro_engines.py
 import os
+import time
 import platform
+import threading
 
 if platform.system().lower().startswith("win"):
     try:
@@ -18,49 +20,147 @@ else:
     AHK = None
     ahk = None
 
-def list_windows():
-    """List all visible windows with titles."""
-    if ahk is None:
+# ---------------------------------------------------------------------
+# Macro Backends
+# ---------------------------------------------------------------------
+# Selected with "macro_backend" in agent_settings.json:
+#   "auto"      - AutoHotKey when available (Windows), otherwise unsupported
+#   "ahk"       - AutoHotKey
+#   "recording" - no-op backend that records every call (with optional simulated
+#                 latency), for testing and benchmarking without AutoHotKey
+# Keys and text both use AutoHotKey Send syntax. Each send is passed to the backend
+# on its own: joining them would let a modifier (^ + ! #) apply to the next send.
+
+class MacroBackend:
+    name = "base"
+
+    def list_windows(self) -> list[dict]:
         return []
-    windows = []
-    try:
-        for win in ahk.windows():
-            title = getattr(win, "title", "")
-            handle = getattr(win, "id", None)
-            if title and str(title).strip():
-                windows.append({"title": title, "handle": int(handle)})
-    except Exception:
-        pass
-    return windows
 
-def _get_window(handle):
-    if ahk is None:
+    def get_window(self, handle):
+        """Resolve a window handle; returns None if the window does not exist."""
         raise RuntimeError("Macro engine not supported on this OS")
+
+    def activate(self, window):
+        raise NotImplementedError
+
+    def send(self, window, keys):
+        raise NotImplementedError
+
+class UnsupportedBackend(MacroBackend):
+    name = "unsupported"
+
+class AHKBackend(MacroBackend):
+    name = "ahk"
+
+    def __init__(self):
+        if ahk is None:
+            raise RuntimeError("Macro engine not supported on this OS")
+        self.ahk = ahk
+
+    def list_windows(self):
+        windows = []
+        try:
+            for win in self.ahk.windows():
+                title = getattr(win, "title", "")
+                handle = getattr(win, "id", None)
+                if title and str(title).strip():
+                    windows.append({"title": title, "handle": int(handle)})
+        except Exception:
+            pass
+        return windows
+
+    def get_window(self, handle):
+        try:
+            return self.ahk.win_get(id=int(handle))
+        except Exception:
+            return None
+
+    def activate(self, window):
+        window.activate()
+
+    def send(self, window, keys):
+        window.send(keys)
+
+class RecordingBackend(MacroBackend):
+    name = "recording"
+
+    def __init__(self, latency_ms=0.0, windows=None):
+        self.latency = latency_ms / 1000.0
+        self.windows = windows if windows is not None else [{"title": "Recording Window", "handle": 1}]
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, op, handle, payload=None):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((op, handle, payload, time.monotonic()))
+
+    def list_windows(self):
+        self._record("list_windows", None)
+        return list(self.windows)
+
+    def get_window(self, handle):
+        self._record("get_window", handle)
+        known = {int(w["handle"]) for w in self.windows}
+        try:
+            return int(handle) if int(handle) in known else None
+        except (TypeError, ValueError):
+            return None
+
+    def activate(self, window):
+        self._record("activate", window)
+
+    def send(self, window, keys):
+        self._record("send", window, keys)
+
+MACRO_BACKENDS = {
+    "ahk": AHKBackend,
+    "recording": RecordingBackend
+}
+
+def create_backend(name="auto") -> MacroBackend:
+    name = (name or "auto").lower().strip()
+    if name == "auto":
+        return AHKBackend() if ahk is not None else UnsupportedBackend()
+    backend_cls = MACRO_BACKENDS.get(name)
+    if backend_cls is None:
+        print(f"[macro_engines] Unknown macro backend '{name}'.")
+        return UnsupportedBackend()
     try:
-        return ahk.win_get(id=int(handle))
-    except Exception:
-        return None
+        return backend_cls()
+    except Exception as e:
+        print(f"[macro_engines] Macro backend '{name}' unavailable: {e}")
+        return UnsupportedBackend()
 
-def send_keypress_to_window(handle, key):
-    """Send a single keypress to the specified window handle."""
-    win = _get_window(handle)
+# ---------------------------------------------------------------------
+# Direct (blocking) helpers on the default backend
+# ---------------------------------------------------------------------
+# The agent goes through macro_executor.MacroExecutor instead; these stay for
+# scripts and as the per-call baseline in its benchmark.
+default_backend = create_backend("auto")
+
+def list_windows():
+    """List all visible windows with titles."""
+    return default_backend.list_windows()
+
+def _send_to_window(handle, keys, backend=None):
+    backend = backend or default_backend
+    win = backend.get_window(handle)
     if win is None:
         return False, "Window not found"
     try:
-        win.activate()
-        win.send(key)
+        backend.activate(win)
+        backend.send(win, keys)
         return True
     except Exception as e:
         return False, str(e)
 
+def send_keypress_to_window(handle, key):
+    """Send a single keypress to the specified window handle."""
+    return _send_to_window(handle, key)
+
 def type_text_to_window(handle, text):
     """Type a string into the window."""
-    win = _get_window(handle)
-    if win is None:
-        return False, "Window not found"
-    try:
-        win.activate()
-        win.send(text)
-        return True
-    except Exception as e:
-        return False, str(e)
+    return _send_to_window(handle, text)
@@ -0,0 +1,228 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Agent/Python_API_Endpoints/macro_executor.py
+import os
+import sys
+import time
+import queue
+import asyncio
+import threading
+import importlib.util
+import concurrent.futures
+
+# ---------------------------------------------------------------------
+# Macro Executor
+# ---------------------------------------------------------------------
+# Runs every macro backend call on one dedicated worker thread, so AutoHotKey
+# round trips never block the asyncio / Qt loop and calls are never issued
+# concurrently. The worker:
+# - caches resolved window objects per handle (window_ttl seconds); a failed
+#   activate/send drops the cached window and is retried once with a fresh lookup
+# - drains everything queued at once and activates the window only once for
+#   consecutive sends to it; each send stays its own backend call, so AutoHotKey
+#   modifiers never carry over into another job and a failure only fails its own job
+
+class MacroExecutor:
+    def __init__(self, backend, window_ttl=30.0):
+        self.backend = backend
+        self.window_ttl = window_ttl
+        self._windows = {}
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.sends = 0
+        self.batches = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.total_latency_ms = 0.0
+        self.last_latency_ms = None
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="borealis-macro", daemon=True)
+                self._thread.start()
+
+    def submit(self, handle, keys):
+        """Queue a send from any thread; returns a concurrent Future of (success, error)."""
+        future = concurrent.futures.Future()
+        self._jobs.put(("send", handle, keys, future, time.perf_counter()))
+        self._ensure_worker()
+        return future
+
+    async def send(self, handle, keys):
+        """Send keys / text (AutoHotKey Send syntax) to a window; returns (success, error)."""
+        return await asyncio.wrap_future(self.submit(handle, keys))
+
+    async def list_windows(self):
+        future = concurrent.futures.Future()
+        self._jobs.put(("list", None, None, future, time.perf_counter()))
+        self._ensure_worker()
+        return await asyncio.wrap_future(future)
+
+    def invalidate(self, handle=None):
+        # Only touched from the worker thread, or before it has started.
+        if handle is None:
+            self._windows.clear()
+        else:
+            self._windows.pop(str(handle), None)
+
+    # ---------------- Worker Thread ----------------
+    def _worker(self):
+        while True:
+            jobs = [self._jobs.get()]
+            if jobs[0] is None:
+                return
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._jobs.put(None)  # Finish this drain first, then stop.
+                    break
+                jobs.append(job)
+            self._run_jobs(jobs)
+
+    def _run_jobs(self, jobs):
+        index = 0
+        while index < len(jobs):
+            kind, handle = jobs[index][0], jobs[index][1]
+            if kind == "list":
+                self._complete([jobs[index]], self._call(self.backend.list_windows))
+                index += 1
+                continue
+            group = [jobs[index]]
+            index += 1
+            while index < len(jobs) and jobs[index][0] == "send" and jobs[index][1] == handle:
+                group.append(jobs[index])
+                index += 1
+            self._send_group(handle, group)
+            self.batches += 1
+
+    @staticmethod
+    def _call(fn):
+        try:
+            return fn()
+        except Exception as e:
+            return e
+
+    def _window(self, handle):
+        key = str(handle)
+        cached = self._windows.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.window_ttl:
+            self.cache_hits += 1
+            return cached[0]
+        self.cache_misses += 1
+        window = self.backend.get_window(handle)
+        if window is not None:
+            self._windows[key] = (window, time.monotonic())
+        return window
+
+    def _send_group(self, handle, group):
+        window, activated = None, False
+        for job in group:
+            result = (False, "Unknown macro engine failure")
+            for attempt in range(2):
+                if not activated:
+                    try:
+                        window = self._window(handle)
+                    except Exception as e:
+                        result = (False, str(e))
+                        break
+                    if window is None:
+                        self.invalidate(handle)
+                        result = (False, "Window not found")
+                        break
+                try:
+                    if not activated:
+                        self.backend.activate(window)
+                        activated = True
+                    self.backend.send(window, job[2])
+                    result = (True, "")
+                    break
+                except Exception as e:
+                    # The cached window may be stale (closed / recreated); look it up again once.
+                    self.invalidate(handle)
+                    activated = False
+                    result = (False, str(e))
+            self._complete([job], result)
+
+    def _complete(self, jobs, result):
+        finished = time.perf_counter()
+        for kind, _, _, future, submitted in jobs:
+            if kind == "send":
+                latency = (finished - submitted) * 1000
+                self.sends += 1
+                self.total_latency_ms += latency
+                self.last_latency_ms = round(latency, 2)
+            if future.set_running_or_notify_cancel():
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self):
+        return {
+            "backend": self.backend.name,
+            "sends": self.sends,
+            "batches": self.batches,
+            "window_cache_hits": self.cache_hits,
+            "window_cache_misses": self.cache_misses,
+            "avg_latency_ms": round(self.total_latency_ms / self.sends, 2) if self.sends else None,
+            "last_latency_ms": self.last_latency_ms
+        }
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join(timeout=2)
+            self._thread = None
+
+# ---------------------------------------------------------------------
+# Macro Benchmark (recording backend, no AutoHotKey needed)
+# ---------------------------------------------------------------------
+# Compares the old per-call path (resolve + activate + send for every key) with the
+# executor, for N roles sending keys concurrently to the same window.
+# Run: python macro_executor.py [simulated backend call latency in ms]
+def benchmark(latency_ms=2.0, roles=4, sends_per_role=50):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "macro_engines.py")
+    spec = importlib.util.spec_from_file_location("macro_engines", path)
+    macro_engines = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(macro_engines)
+
+    direct = macro_engines.RecordingBackend(latency_ms)
+    started = time.perf_counter()
+    for _ in range(roles * sends_per_role):
+        macro_engines._send_to_window(1, "a", backend=direct)
+    direct_s = time.perf_counter() - started
+
+    batched = macro_engines.RecordingBackend(latency_ms)
+    executor = MacroExecutor(batched)
+
+    async def role():
+        for _ in range(sends_per_role):
+            await executor.send(1, "a")
+
+    async def run_all():
+        await asyncio.gather(*[role() for _ in range(roles)])
+
+    started = time.perf_counter()
+    asyncio.run(run_all())
+    executor_s = time.perf_counter() - started
+    stats = executor.stats()
+    executor.shutdown()
+
+    total = roles * sends_per_role
+    return {
+        "sends": total,
+        "direct_sends_per_sec": round(total / direct_s, 1),
+        "direct_backend_calls": len(direct.calls),
+        "executor_sends_per_sec": round(total / executor_s, 1),
+        "executor_backend_calls": len(batched.calls),
+        "executor_avg_latency_ms": stats["avg_latency_ms"],
+        "executor_batches": stats["batches"]
+    }
+
+if __name__ == "__main__":
+    result = benchmark(float(sys.argv[1]) if len(sys.argv) > 1 else 2.0)
+    for key, value in result.items():
+        print(f"{key:>26}: {value}")
@@ -0,0 +1,106 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Agent/Python_API_Endpoints/rate_control.py
+import time
+from collections import deque
+
+# ---------------------------------------------------------------------
+# Adaptive Frame Rate / Backpressure
+# ---------------------------------------------------------------------
+# Every frame is emitted with a Socket.IO ack; the server answers once it has stored
+# and relayed the frame. The controller:
+# - keeps at most max_in_flight frames unacknowledged; while the link is saturated no
+#   new frame is captured, so the next one sent is always the freshest (drop-oldest
+#   with no queue at all) instead of frames piling up in the socket buffer
+# - stretches the interval (x1.5) when the round trip or the capture + encode time
+#   eats most of the interval, and eases it back (x0.9) once there is headroom
+# - stays within [1 / max_fps, 1 / min_fps]
+# An ack that never arrives counts as lost after ack_timeout seconds.
+
+class RateController:
+    def __init__(self, interval, min_fps=0.2, max_fps=None, max_in_flight=1, ack_timeout=5.0):
+        interval = max(0.01, float(interval))
+        max_fps = float(max_fps) if max_fps else 1.0 / interval
+        min_fps = min(float(min_fps) if min_fps else 0.2, max_fps)
+        self.min_interval = 1.0 / max_fps
+        self.max_interval = 1.0 / min_fps
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.ack_timeout = ack_timeout
+        self._in_flight = {}
+        self._next_seq = 0
+        self._sent = deque()
+        self.frames_sent = 0
+        self.frames_acked = 0
+        self.frames_dropped = 0
+        self.frames_lost = 0
+        self.last_rtt_ms = None
+        self.last_server_ms = None
+
+    def can_send(self):
+        now = time.monotonic()
+        for seq, sent_at in list(self._in_flight.items()):
+            if now - sent_at > self.ack_timeout:
+                del self._in_flight[seq]
+                self.frames_lost += 1
+                self._stretch()
+        if len(self._in_flight) >= self.max_in_flight:
+            self.frames_dropped += 1
+            return False
+        return True
+
+    def frame_sent(self):
+        """Register an emitted frame; returns the sequence number to acknowledge."""
+        now = time.monotonic()
+        seq = self._next_seq
+        self._next_seq += 1
+        self._in_flight[seq] = now
+        self._sent.append(now)
+        self.frames_sent += 1
+        return seq
+
+    def frame_acked(self, seq, ack=None):
+        sent_at = self._in_flight.pop(seq, None)
+        if sent_at is None:
+            return  # Already written off as lost.
+        self.frames_acked += 1
+        rtt = time.monotonic() - sent_at
+        self.last_rtt_ms = round(rtt * 1000, 2)
+        if isinstance(ack, dict):
+            self.last_server_ms = ack.get("server_ms")
+        self._adapt(rtt)
+
+    def frame_processed(self, elapsed):
+        """Report capture + diff + encode time of the last tick (seconds)."""
+        if elapsed > 0.8 * self.interval:
+            self._stretch()
+
+    def _adapt(self, rtt):
+        if rtt > 0.8 * self.interval:
+            self._stretch()
+        elif rtt < 0.3 * self.interval:
+            self.interval = max(self.min_interval, self.interval * 0.9)
+
+    def _stretch(self):
+        self.interval = min(self.max_interval, self.interval * 1.5)
+
+    @property
+    def effective_fps(self):
+        # Frames actually sent during the last 10 seconds.
+        now = time.monotonic()
+        while self._sent and now - self._sent[0] > 10.0:
+            self._sent.popleft()
+        if len(self._sent) < 2:
+            return 0.0
+        return round((len(self._sent) - 1) / max(now - self._sent[0], 1e-6), 2)
+
+    def stats(self):
+        return {
+            "interval_ms": round(self.interval * 1000, 1),
+            "effective_fps": self.effective_fps,
+            "in_flight": len(self._in_flight),
+            "frames_sent": self.frames_sent,
+            "frames_acked": self.frames_acked,
+            "frames_dropped": self.frames_dropped,
+            "frames_lost": self.frames_lost,
+            "rtt_ms": self.last_rtt_ms,
+            "server_ms": self.last_server_ms
+        }
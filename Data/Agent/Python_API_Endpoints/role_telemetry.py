@@ -0,0 +1,84 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Agent/Python_API_Endpoints/role_telemetry.py
+import time
+from collections import deque
+
+# ---------------------------------------------------------------------
+# Per-Role Performance Telemetry
+# ---------------------------------------------------------------------
+# Every role keeps rolling stats over its last `window` samples, e.g.
+#   screenshot: capture_ms, encode_ms, payload_bytes, emit_latency_ms (emit -> server ack)
+#   macro:      execution_ms, trigger_latency_ms
+# plus plain counters (frames_unchanged, sends_failed, ...) and gauges (rate controller
+# state). The agent reports snapshot() periodically over the "agent_stats" event, so
+# a slow stream can be pinned on capture, encode, network or the server.
+
+class RollingStat:
+    def __init__(self, window=120):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(float(value))
+        self.count += 1
+
+    def summary(self):
+        if not self.samples:
+            return {"count": self.count, "last": None, "avg": None, "p95": None, "max": None}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "last": round(self.samples[-1], 2),
+            "avg": round(sum(ordered) / len(ordered), 2),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            "max": round(ordered[-1], 2)
+        }
+
+class RoleTelemetry:
+    def __init__(self, role, window=120):
+        self.role = role
+        self.window = window
+        self.metrics = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.time()
+
+    def observe(self, name, value):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = RollingStat(self.window)
+        metric.add(value)
+
+    def increment(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauges(self, **values):
+        self.gauges.update(values)
+
+    def snapshot(self):
+        return {
+            "role": self.role,
+            "uptime_s": round(time.time() - self.started, 1),
+            "metrics": {name: metric.summary() for name, metric in self.metrics.items()},
+            "counters": dict(self.counters),
+            **self.gauges
+        }
+
+class TelemetryRegistry:
+    def __init__(self, window=120):
+        self.window = window
+        self.roles = {}
+
+    def role(self, node_id, role):
+        telemetry = self.roles.get(node_id)
+        if telemetry is None or telemetry.role != role:
+            telemetry = self.roles[node_id] = RoleTelemetry(role, self.window)
+        return telemetry
+
+    def discard(self, node_id):
+        self.roles.pop(node_id, None)
+
+    def clear(self):
+        self.roles.clear()
+
+    def snapshot(self):
+        return {node_id: telemetry.snapshot() for node_id, telemetry in self.roles.items()}
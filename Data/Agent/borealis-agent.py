@@ -3,21 +3,20 @@ import sys
 import uuid
 import socket
 import os
+import copy
 import json
 import asyncio
-import concurrent.futures
-from functools import partial
-from io import BytesIO
+import time
 import base64
 import traceback
 import random # Macro Randomization
+import threading
 import platform # OS Detection
 import importlib.util
 
 import socketio
 from qasync import QEventLoop
 from PyQt5 import QtCore, QtGui, QtWidgets
-from PIL import ImageGrab
 
 # //////////////////////////////////////////////////////////////////////////
 # CORE SECTION: CONFIG MANAGER
@@ -27,63 +26,172 @@ DEFAULT_CONFIG = {
     "borealis_server_url": "http://localhost:5000",
     "max_task_workers": 8,
     "config_file_watcher_interval": 2,
+    "config_save_debounce_ms": 250,
     "agent_id": "",
+    "frame_transport": "auto",
+    "capture_backend": "auto",
+    "capture_replay_path": "",
+    "macro_backend": "auto",
+    "telemetry_interval": 5,
     "regions": {}
 }
 
 class ConfigManager:
+    """
+    In-memory agent_settings.json, persisted with:
+    - save(): debounced by config_save_debounce_ms, so bursts of changes (dragging an
+      overlay, several new regions, disconnect cleanup) become a single write
+    - atomic writes (temp file + os.replace) executed off the event loop
+    - QFileSystemWatcher (inotify / ReadDirectoryChangesW / kqueue) instead of mtime
+      polling; the agent's own writes are recognized by their file signature and never
+      reloaded. Without a usable watcher, config_watcher() polls watch() instead.
+    """
     def __init__(self, path):
         self.path = path
-        self._last_mtime = None
         self.data = {}
+        self._signature = None  # (mtime_ns, size, inode) of the file as last loaded / written
+        self._write_lock = threading.Lock()
+        self._generation = 0  # Snapshot counter; an older snapshot never overwrites a newer one
+        self._written_generation = 0
+        self._dirty = False
+        self._loop = None
+        self._save_handle = None
+        self._watcher = None
+        self._check_pending = False
         self.load()
 
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            return None
+
     def load(self):
         print("[DEBUG] Loading config from disk.")
+        # External edits win over changes that were not written yet.
+        self._cancel_save()
+        self._dirty = False
         if not os.path.exists(self.path):
             print("[DEBUG] Config file not found. Creating default.")
-            self.data = DEFAULT_CONFIG.copy()
-            self._write()
+            self.data = copy.deepcopy(DEFAULT_CONFIG)
+            self._dirty = True
+            self.flush()
         else:
             try:
                 with open(self.path, 'r') as f:
                     loaded = json.load(f)
-                self.data = {**DEFAULT_CONFIG, **loaded}
+                self.data = {**copy.deepcopy(DEFAULT_CONFIG), **loaded}
                 print("[DEBUG] Config loaded:", self.data)
             except Exception as e:
                 print(f"[WARN] Failed to parse config: {e}")
-                self.data = DEFAULT_CONFIG.copy()
-        try:
-            self._last_mtime = os.path.getmtime(self.path)
-        except Exception:
-            self._last_mtime = None
-
-    def _write(self):
+                self.data = copy.deepcopy(DEFAULT_CONFIG)
+        self._signature = self._stat_signature()
+
+    # ---------------- Persistence ----------------
+    def save(self):
+        """Persist soon; repeated calls within the debounce window become one write."""
+        self._dirty = True
+        if self._loop is None or self._loop.is_closed():
+            return  # Before start(): written once by the flush in start().
+        if self._save_handle is None:
+            delay = self.data.get('config_save_debounce_ms', 250) / 1000.0
+            self._save_handle = self._loop.call_later(delay, self._flush_async)
+
+    def flush(self):
+        """Write pending changes right away, blocking (startup / shutdown)."""
+        self._cancel_save()
+        if self._dirty:
+            self._dirty = False
+            self._write_snapshot(*self._snapshot())
+
+    def _cancel_save(self):
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+
+    def _flush_async(self):
+        self._save_handle = None
+        if self._dirty:
+            self._dirty = False
+            # Serialized on the loop (the data is only mutated there), written in a thread.
+            self._loop.run_in_executor(None, self._write_snapshot, *self._snapshot())
+
+    def _snapshot(self):
+        self._generation += 1
+        return self._generation, json.dumps(self.data, indent=2)
+
+    def _write_snapshot(self, generation, text):
+        with self._write_lock:
+            if generation <= self._written_generation:
+                return
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                self._written_generation = generation
+                self._signature = self._stat_signature()
+                print("[DEBUG] Config written to disk.")
+            except Exception as e:
+                print(f"[ERROR] Could not write config: {e}")
+
+    # ---------------- Change Detection ----------------
+    def start(self, loop):
+        """Attach to the running event loop, write startup changes and watch the file.
+        Returns False if no file system watcher is available (poll watch() instead)."""
+        self._loop = loop
+        self.flush()
         try:
-            with open(self.path, 'w') as f:
-                json.dump(self.data, f, indent=2)
-            print("[DEBUG] Config written to disk.")
+            self._watcher = QtCore.QFileSystemWatcher()
+            # The directory is watched as well: an atomic replace (ours or an editor's)
+            # swaps the file's inode, which drops the file watch on most platforms.
+            failed = self._watcher.addPaths([self.path, os.path.dirname(os.path.abspath(self.path))])
+            if failed:
+                raise RuntimeError(f"cannot watch {', '.join(failed)}")
+            self._watcher.fileChanged.connect(self._on_file_event)
+            self._watcher.directoryChanged.connect(self._on_file_event)
+            print("[DEBUG] Watching config file for changes.")
+            return True
         except Exception as e:
-            print(f"[ERROR] Could not write config: {e}")
+            print(f"[WARN] Config file watcher unavailable ({e}), polling instead.")
+            self._watcher = None
+            return False
+
+    def _on_file_event(self, _path):
+        # Editors and our own replace produce several events in a row; check once.
+        if not self._check_pending:
+            self._check_pending = True
+            QtCore.QTimer.singleShot(100, self._check_file)
+
+    def _check_file(self):
+        self._check_pending = False
+        if self._watcher is not None and self.path not in self._watcher.files() and os.path.exists(self.path):
+            self._watcher.addPath(self.path)
+        self.watch()
 
     def watch(self):
+        """Reload if the file was changed by someone else; returns True if reloaded."""
+        if not self._write_lock.acquire(blocking=False):
+            return False  # Our own write is in progress.
         try:
-            mtime = os.path.getmtime(self.path)
-            if self._last_mtime is None or mtime != self._last_mtime:
-                print("[CONFIG] Detected config change, reloading.")
-                self.load()
-                return True
-        except Exception:
-            pass
-        return False
+            signature = self._stat_signature()
+        finally:
+            self._write_lock.release()
+        if signature is None or signature == self._signature:
+            return False
+        print("[CONFIG] Detected config change, reloading.")
+        self.load()
+        return True
 
 CONFIG = ConfigManager(CONFIG_PATH)
-CONFIG.load()
 
 def init_agent_id():
     if not CONFIG.data.get('agent_id'):
         CONFIG.data['agent_id'] = f"{socket.gethostname().lower()}-agent-{uuid.uuid4().hex[:8]}"
-        CONFIG._write()
+        CONFIG.save()
     return CONFIG.data['agent_id']
 
 AGENT_ID = init_agent_id()
@@ -91,7 +199,7 @@ print(f"[DEBUG] Using AGENT_ID: {AGENT_ID}")
 
 def clear_regions_only():
     CONFIG.data['regions'] = CONFIG.data.get('regions', {})
-    CONFIG._write()
+    CONFIG.save()
 
 clear_regions_only()
 
@@ -110,15 +218,49 @@ def detect_agent_os():
         return 'unknown'
 
 CONFIG.data['agent_operating_system'] = detect_agent_os()
-CONFIG._write()
+CONFIG.save()
 
 # //////////////////////////////////////////////////////////////////////////       
 # CORE SECTION: MACRO AUTOMATION
 # //////////////////////////////////////////////////////////////////////////
-MACRO_ENGINE_PATH = os.path.join(os.path.dirname(__file__), "Python_API_Endpoints", "macro_engines.py")
-spec = importlib.util.spec_from_file_location("macro_engines", MACRO_ENGINE_PATH)
-macro_engines = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(macro_engines)
+def load_agent_module(name):
+    path = os.path.join(os.path.dirname(__file__), "Python_API_Endpoints", f"{name}.py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+macro_engines = load_agent_module("macro_engines")
+macro_executor = load_agent_module("macro_executor")
+# All macro engine calls go through one worker thread (see macro_executor.py).
+macro_runner = macro_executor.MacroExecutor(macro_engines.create_backend(CONFIG.data.get('macro_backend', 'auto')))
+
+# //////////////////////////////////////////////////////////////////////////
+# CORE SECTION: SCREEN CAPTURE
+# //////////////////////////////////////////////////////////////////////////
+capture_backends = load_agent_module("capture_backends")
+frame_diff = load_agent_module("frame_diff")
+frame_encoding = load_agent_module("frame_encoding")
+rate_control = load_agent_module("rate_control")
+role_telemetry = load_agent_module("role_telemetry")
+telemetry = role_telemetry.TelemetryRegistry()
+_capture_backend = None
+
+def get_capture_backend():
+    # Recreated whenever "capture_backend" / "capture_replay_path" change in agent_settings.json.
+    # Called by the scheduler on the event loop; it closes the previous backend once the
+    # grabs still running on it have finished.
+    global _capture_backend
+    wanted = (CONFIG.data.get('capture_backend', 'auto'), CONFIG.data.get('capture_replay_path', ''))
+    if _capture_backend is None or _capture_backend[0] != wanted:
+        backend = capture_backends.create_backend(*wanted)
+        print(f"[CAPTURE] Using '{backend.name}' screen capture backend.")
+        _capture_backend = (wanted, backend)
+    return _capture_backend[1]
+
+# One scheduler (and one capture / encode thread pool) shared by every screenshot role.
+capture_scheduler = load_agent_module("capture_scheduler")
+scheduler = capture_scheduler.CaptureScheduler(get_capture_backend, CONFIG.data.get('max_task_workers', 8))
 
 # //////////////////////////////////////////////////////////////////////////       
 # CORE SECTION: ASYNC TASK / WEBSOCKET
@@ -128,6 +270,23 @@ sio = socketio.AsyncClient(reconnection=True, reconnection_attempts=0, reconnect
 role_tasks = {}
 overlay_widgets = {}
 background_tasks = []
+server_capabilities = {}
+frame_detectors = {}
+role_configs = {}     # node_id -> live role config dict shared with the running task
+role_revisions = {}   # node_id -> bumped whenever role_configs[node_id] is patched in place
+role_events = {}      # node_id -> asyncio.Event that wakes the role's task (config patch / trigger)
+role_triggers = {}    # node_id -> {'edges': rising edges seen, 'changed_at': monotonic time of last change}
+
+def wake_role(nid):
+    event = role_events.get(nid)
+    if event:
+        event.set()
+
+def record_trigger_latency(nid, latency_ms):
+    # Trigger received -> macro sent
+    telemetry.role(nid, 'macro').observe('trigger_latency_ms', latency_ms)
+
+applied_config = {'version': None}
 
 async def stop_all_roles():
     print("[DEBUG] Stopping all roles.")
@@ -135,6 +294,12 @@ async def stop_all_roles():
         print(f"[DEBUG] Cancelling task for node: {task}")
         task.cancel()
     role_tasks.clear()
+    role_configs.clear()
+    role_revisions.clear()
+    role_events.clear()
+    role_triggers.clear()
+    telemetry.clear()
+    applied_config['version'] = None
     for node_id, widget in overlay_widgets.items():
         print(f"[DEBUG] Closing overlay widget: {node_id}")
         try:
@@ -146,65 +311,153 @@ async def stop_all_roles():
 @sio.event
 async def connect():
     print(f"[WebSocket] Connected to Borealis Server with Agent ID: {AGENT_ID}")
+    server_capabilities.clear()
     await sio.emit('connect_agent', {"agent_id": AGENT_ID})
     await sio.emit('request_config', {"agent_id": AGENT_ID})
 
+@sio.on('server_capabilities')
+async def on_server_capabilities(caps):
+    server_capabilities.update(caps or {})
+
+def binary_frames_enabled():
+    # "auto" sends raw PNG bytes once the server has announced support; "base64" forces the legacy payload.
+    return CONFIG.data.get('frame_transport', 'auto') != 'base64' and server_capabilities.get('binary_frames', False)
+
+def frame_payload(data):
+    if binary_frames_enabled():
+        return {'image_bytes': data}
+    return {'image_base64': base64.b64encode(data).decode('utf-8')}
+
+@sio.on('request_keyframe')
+async def on_request_keyframe(data):
+    # The server lost the frame that dirty tiles would be pasted onto.
+    detector = frame_detectors.get(data.get('node_id'))
+    if detector:
+        detector.force_keyframe = True
+
 @sio.event
 async def disconnect():
     print("[WebSocket] Disconnected from Borealis server.")
     await stop_all_roles()
     CONFIG.data['regions'].clear()
-    CONFIG._write()
+    CONFIG.save()
 
 # //////////////////////////////////////////////////////////////////////////       
 # CORE SECTION: AGENT CONFIG MANAGEMENT / WINDOW MANAGEMENT
 # //////////////////////////////////////////////////////////////////////////
+ROLE_TASKS = {
+    'screenshot': lambda cfg: screenshot_task(cfg),
+    'macro': lambda cfg: macro_task(cfg)
+}
+
+def start_role(nid, role_cfg):
+    old = role_tasks.pop(nid, None)
+    if old:
+        old.cancel()
+    factory = ROLE_TASKS.get(role_cfg.get('role'))
+    if factory is None:
+        return
+    print(f"[DEBUG] Starting {role_cfg.get('role')} task for {nid}")
+    live = dict(role_cfg)
+    role_configs[nid] = live
+    role_revisions[nid] = 0
+    role_events[nid] = asyncio.Event()
+    # A role provisioned with its trigger already at 1 counts that as its first rising edge,
+    # as if the trigger had gone 0 -> 1 when the role started.
+    try:
+        triggered = int(role_cfg.get('trigger', 0) or 0) == 1
+    except (TypeError, ValueError):
+        triggered = False
+    role_triggers[nid] = {'edges': int(triggered), 'changed_at': time.monotonic() if triggered else None}
+    role_tasks[nid] = asyncio.create_task(factory(live))
+
+def stop_role(nid):
+    print(f"[DEBUG] Removing node {nid} from regions/overlays.")
+    task = role_tasks.pop(nid, None)
+    if task:
+        task.cancel()
+    role_configs.pop(nid, None)
+    role_revisions.pop(nid, None)
+    role_events.pop(nid, None)
+    role_triggers.pop(nid, None)
+    telemetry.discard(nid)
+    CONFIG.data['regions'].pop(nid, None)
+    w = overlay_widgets.pop(nid, None)
+    if w:
+        try:
+            w.close()
+        except:
+            pass
+
+def set_trigger(nid, value):
+    live = role_configs.get(nid)
+    if live is None:
+        return
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = 0
+    previous = int(live.get('trigger', 0) or 0)
+    live['trigger'] = value
+    if value != previous:
+        state = role_triggers.setdefault(nid, {'edges': 0, 'changed_at': None})
+        state['changed_at'] = time.monotonic()
+        if previous == 0 and value == 1:
+            state['edges'] += 1
+        wake_role(nid)
+
+@sio.on('macro_trigger')
+async def on_macro_trigger(data):
+    # Pushed by the server as soon as a macro node's trigger input changes.
+    nid = data.get('node_id')
+    if 'active' in data and nid in role_configs:
+        role_configs[nid]['active'] = data['active']
+        wake_role(nid)
+    if 'trigger' in data:
+        set_trigger(nid, data['trigger'])
+
 @sio.on('agent_config')
 async def on_agent_config(cfg):
     print("[DEBUG] agent_config event received.")
+    version = cfg.get('version')
+    if version is not None and version == applied_config['version']:
+        print(f"[CONFIG] Config version {version} already applied.")
+        return
+
     roles = cfg.get('roles', [])
     if not roles:
         print("[CONFIG] Config Reset by Borealis Server Operator - Awaiting New Config...")
         await stop_all_roles()
+        applied_config['version'] = version
         return
 
     print(f"[CONFIG] Received New Agent Config with {len(roles)} Role(s).")
 
-    new_ids = {r.get('node_id') for r in roles if r.get('node_id')}
-    old_ids = set(role_tasks.keys())
-    removed = old_ids - new_ids
-
+    # Reconcile by node_id: untouched roles keep running, changed ones are patched in place.
+    new_roles = {r.get('node_id'): r for r in roles if r.get('node_id')}
+    removed = set(role_tasks) - set(new_roles)
     for rid in removed:
-        print(f"[DEBUG] Removing node {rid} from regions/overlays.")
-        CONFIG.data['regions'].pop(rid, None)
-        w = overlay_widgets.pop(rid, None)
-        if w:
-            try:
-                w.close()
-            except:
-                pass
+        stop_role(rid)
     if removed:
-        CONFIG._write()
-
-    for task in list(role_tasks.values()):
-        task.cancel()
-    role_tasks.clear()
-
-    for role_cfg in roles:
-        nid = role_cfg.get('node_id')
-        role = role_cfg.get('role')
-        if role == 'screenshot':
-            print(f"[DEBUG] Starting screenshot task for {nid}")
-            task = asyncio.create_task(screenshot_task(role_cfg))
-            role_tasks[nid] = task
-        elif role == 'macro':
-            print(f"[DEBUG] Starting macro task for {nid}")
-            task = asyncio.create_task(macro_task(role_cfg))
-            role_tasks[nid] = task
+        CONFIG.save()
+
+    for nid, role_cfg in new_roles.items():
+        live = role_configs.get(nid)
+        task = role_tasks.get(nid)
+        if task is None or task.done() or live is None or live.get('role') != role_cfg.get('role'):
+            start_role(nid, role_cfg)
+        elif live != role_cfg:
+            print(f"[CONFIG] Updating {role_cfg.get('role')} role {nid} in place.")
+            set_trigger(nid, role_cfg.get('trigger', live.get('trigger', 0)))
+            live.clear()
+            live.update(role_cfg)
+            role_revisions[nid] += 1
+            wake_role(nid)
+    applied_config['version'] = version
 
 @sio.on('list_agent_windows')
 async def handle_list_agent_windows(data):
-    windows = macro_engines.list_windows()
+    windows = await macro_runner.list_windows()
     await sio.emit('agent_window_list', {
         'agent_id': AGENT_ID,
         'windows': windows
@@ -332,7 +585,7 @@ class ScreenshotRegion(QtWidgets.QWidget):
         self._start_pos=None
         x,y,w,h=self.get_geometry()
         CONFIG.data['regions'][self.node_id]={'x':x,'y':y,'w':w,'h':h}
-        CONFIG._write()
+        CONFIG.save()
         asyncio.create_task(sio.emit('agent_screenshot_task',{ 'agent_id':AGENT_ID,'node_id':self.node_id,'image_base64':'','x':x,'y':y,'w':w,'h':h}))
 
 # ---------------- Screenshot Task ----------------
@@ -345,42 +598,123 @@ async def screenshot_task(cfg):
     else:
         region=(cfg.get('x',100),cfg.get('y',100),cfg.get('w',300),cfg.get('h',200))
         CONFIG.data['regions'][nid]={'x':region[0],'y':region[1],'w':region[2],'h':region[3]}
-        CONFIG._write()
+        CONFIG.save()
     if nid not in overlay_widgets:
         widget=ScreenshotRegion(nid,*region,alias=alias)
         overlay_widgets[nid]=widget; widget.show()
     await sio.emit('agent_screenshot_task',{'agent_id':AGENT_ID,'node_id':nid,'image_base64':'','x':region[0],'y':region[1],'w':region[2],'h':region[3]})
-    interval=cfg.get('interval',1000)/1000.0
-    loop=asyncio.get_event_loop()
-    executor=concurrent.futures.ThreadPoolExecutor(max_workers=CONFIG.data.get('max_task_workers',8))
+    def configure():
+        # (Re)built at start and whenever the server patches this role's config.
+        mode=cfg.get('change_detection','skip')
+        if mode=='tiles' and not server_capabilities.get('frame_tiles',False):
+            mode='skip'
+        detector=frame_diff.FrameChangeDetector(mode,cfg.get('tile_size',64),cfg.get('keyframe_interval',10))
+        frame_detectors[nid]=detector
+        encoding=frame_encoding.EncodingOptions.from_role(cfg)
+        rate=rate_control.RateController(cfg.get('interval',1000)/1000.0,cfg.get('min_fps',0.2),cfg.get('max_fps'))
+        if nid in overlay_widgets:
+            overlay_widgets[nid].alias=cfg.get('alias','')
+            overlay_widgets[nid].update()
+        return detector,encoding,rate
+    def process_frame(img,detector,encoding):
+        # Diff and encode on the scheduler's pool; the loop (Qt GUI thread) only emits.
+        img=frame_encoding.downscale(img,encoding)
+        change,rects=detector.check(img)
+        if change=='skip':
+            return None
+        encode_ms=0.0
+        if change=='tiles':
+            tiles=[]; payload_bytes=0
+            for tx,ty,tw,th in rects:
+                data,ms=frame_encoding.timed_encode(img.crop((tx,ty,tx+tw,ty+th)),encoding); encode_ms+=ms
+                tiles.append({'x':tx,'y':ty,'w':tw,'h':th,**frame_payload(data)}); payload_bytes+=len(data)
+            frame={'tiles':tiles,'frame_w':img.width,'frame_h':img.height}
+        else:
+            data,encode_ms=frame_encoding.timed_encode(img,encoding); payload_bytes=len(data)
+            frame={**frame_payload(data),'keyframe':True}
+        return {**frame,'format':encoding.mime_type,'encode_ms':round(encode_ms,2),'payload_bytes':payload_bytes}
+    def frame_acked(controller,seq,sent_at,ack):
+        stats.observe('emit_latency_ms',(time.monotonic()-sent_at)*1000)
+        controller.frame_acked(seq,ack)
+    revision=role_revisions.get(nid,0)
+    detector,encoding,rate=configure()
+    stats=telemetry.role(nid,'screenshot')
     try:
         while True:
+            if role_revisions.get(nid,0)!=revision:
+                revision=role_revisions.get(nid,0)
+                detector,encoding,rate=configure()
+            await scheduler.wait_tick(rate.interval)
+            stats.set_gauges(**rate.stats(),encoding=encoding.encoding,change_detection=detector.mode)
+            if not rate.can_send():
+                continue  # Previous frame not acknowledged yet: skip this tick rather than queue
+            started=time.monotonic()
             x,y,w,h=overlay_widgets[nid].get_geometry()
-            grab=partial(ImageGrab.grab,bbox=(x,y,x+w,y+h))
-            img=await loop.run_in_executor(executor,grab)
-            buf=BytesIO(); img.save(buf,format='PNG'); encoded=base64.b64encode(buf.getvalue()).decode('utf-8')
-            await sio.emit('agent_screenshot_task',{'agent_id':AGENT_ID,'node_id':nid,'image_base64':encoded,'x':x,'y':y,'w':w,'h':h})
-            await asyncio.sleep(interval)
+            img=await scheduler.capture((x,y,x+w,y+h))
+            captured=time.monotonic()
+            stats.observe('capture_ms',(captured-started)*1000)
+            frame=await scheduler.run(process_frame,img,detector,encoding)
+            rate.frame_processed(time.monotonic()-started)
+            if frame is None:
+                stats.increment('frames_unchanged')
+                continue
+            stats.observe('encode_ms',frame['encode_ms'])
+            stats.observe('payload_bytes',frame.pop('payload_bytes'))
+            stats.increment('tile_frames' if 'tiles' in frame else 'keyframes')
+            seq=rate.frame_sent(); sent_at=time.monotonic()
+            await sio.emit(
+                'agent_screenshot_task',
+                {'agent_id':AGENT_ID,'node_id':nid,**frame,'x':x,'y':y,'w':w,'h':h,
+                 'fps':rate.effective_fps,'interval_ms':round(rate.interval*1000,1)},
+                callback=lambda *ack,rc=rate,seq=seq,sent_at=sent_at: frame_acked(rc,seq,sent_at,ack[0] if ack else None)
+            )
     except asyncio.CancelledError:
         print(f"[TASK] Screenshot role {nid} cancelled.")
     except Exception as e:
         print(f"[ERROR] Screenshot task {nid} failed: {e}")
         traceback.print_exc()
+    finally:
+        if frame_detectors.get(nid) is detector:
+            frame_detectors.pop(nid,None)
 
 # ---------------- Macro Task ----------------
 async def macro_task(cfg):
     """
-    Improved macro_task supporting all operation modes, live config, error reporting, and UI feedback.
+    Macro role supporting all operation modes, live config, error reporting, and UI feedback.
+    Sleeps on its wake event between actions: trigger pushes and config patches wake it
+    immediately, and repeated sends follow absolute monotonic deadlines.
     """
     nid = cfg.get('node_id')
+    wake = role_events.setdefault(nid, asyncio.Event())
+    trigger_state = role_triggers.setdefault(nid, {'edges': 0, 'changed_at': None})
+    stats = telemetry.role(nid, 'macro')
 
-    # Track trigger state for edge/level changes
-    last_trigger_value = 0
+    # Track trigger state for edge/level changes; edges counted since start_role() (including
+    # one for a trigger that was already 1) are all still to be handled
+    edges_consumed = 0
     has_run_once = False
+    idle = True
+    next_deadline = time.monotonic()
+
+    async def emit_macro_status(success, message="", latency_ms=None):
+        await sio.emit('macro_status', {
+            "agent_id": AGENT_ID,
+            "node_id": nid,
+            "success": success,
+            "message": message,
+            "trigger_latency_ms": latency_ms,
+            "timestamp": int(time.time() * 1000)
+        })
+
+    async def sleep_until_woken(timeout=None):
+        try:
+            await asyncio.wait_for(wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
 
     while True:
-        # Always re-fetch config (hot reload support)
-        # (In reality, you might want to deep-copy or re-provision on config update, but for MVP we refetch each tick)
+        # Cleared before reading cfg, so a wake-up arriving after the read is never lost
+        wake.clear()
         window_handle = cfg.get('window_handle')
         macro_type = cfg.get('macro_type', 'keypress')  # Now matches UI config
         operation_mode = cfg.get('operation_mode', 'Continuous')
@@ -393,99 +727,131 @@ async def macro_task(cfg):
         active = cfg.get('active', True)
         trigger = int(cfg.get('trigger', 0))  # For trigger modes; default 0 if not set
 
-        # Define helper for error reporting
-        async def emit_macro_status(success, message=""):
-            await sio.emit('macro_status', {
-                "agent_id": AGENT_ID,
-                "node_id": nid,
-                "success": success,
-                "message": message,
-                "timestamp": int(asyncio.get_event_loop().time() * 1000)
-            })
-
-        # Stopped state (paused from UI)
+        # Stopped state (paused from UI): nothing to do until the config changes
         if not (active is True or str(active).lower() == "true"):
-            await asyncio.sleep(0.2)
+            await sleep_until_woken()
+            next_deadline = time.monotonic()
             continue
 
         try:
-            send_macro = False
+            triggered_at = None
 
             # Operation Mode Logic
             if operation_mode == "Run Once":
-                if not has_run_once:
-                    send_macro = True
-                    has_run_once = True  # Only run once, then stop
-            elif operation_mode == "Continuous":
-                send_macro = True  # Always run every interval
+                send_macro = not has_run_once
+                has_run_once = True  # Only run once, then stop
+            elif operation_mode == "Trigger-Once":
+                # Run only on rising edges (0->1); counted by the trigger handler so none are missed
+                send_macro = trigger_state['edges'] > edges_consumed
+                edges_consumed = trigger_state['edges']
+                triggered_at = trigger_state['changed_at']
             elif operation_mode == "Trigger-Continuous":
                 # Only run while trigger is "1"
-                if trigger == 1:
-                    send_macro = True
-                else:
-                    send_macro = False
-            elif operation_mode == "Trigger-Once":
-                # Run only on rising edge: 0->1
-                if last_trigger_value == 0 and trigger == 1:
-                    send_macro = True
-                else:
-                    send_macro = False
-                last_trigger_value = trigger
+                send_macro = trigger == 1
             else:
-                # Unknown mode: default to "Continuous"
+                # "Continuous" (and unknown modes): always run every interval
                 send_macro = True
 
-            if send_macro:
-                # Actually perform macro
-                if macro_type == 'keypress' and key:
-                    result = macro_engines.send_keypress_to_window(window_handle, key)
-                elif macro_type == 'typed_text' and text:
-                    result = macro_engines.type_text_to_window(window_handle, text)
-                else:
-                    await emit_macro_status(False, "Invalid macro type or missing key/text")
-                    await asyncio.sleep(0.2)
+            if not send_macro:
+                idle = True
+                await sleep_until_woken()
+                next_deadline = time.monotonic()
+                continue
+
+            repeating = operation_mode not in ("Run Once", "Trigger-Once")
+            if repeating:
+                now = time.monotonic()
+                if now < next_deadline:
+                    # Not due yet; a trigger / config change re-evaluates right away
+                    await sleep_until_woken(next_deadline - now)
                     continue
-
-                # Result may be True or (False, error)
-                if isinstance(result, tuple):
-                    success, err = result
-                else:
-                    success, err = bool(result), ""
-
-                if success:
-                    await emit_macro_status(True, f"Macro sent: {macro_type}")
-                else:
-                    await emit_macro_status(False, err or "Unknown macro engine failure")
+                if operation_mode == "Trigger-Continuous" and idle:
+                    triggered_at = trigger_state['changed_at']
+            idle = False
+
+            # Actually perform macro
+            if macro_type == 'keypress' and key:
+                payload = key
+            elif macro_type == 'typed_text' and text:
+                payload = text
             else:
-                # No macro to send this cycle, just idle
-                await asyncio.sleep(0.05)
-
-            # Timing: only wait if we did send macro this tick
-            if send_macro:
-                if randomize:
-                    ms = random.randint(random_min, random_max)
-                else:
-                    ms = interval_ms
-                await asyncio.sleep(ms / 1000.0)
+                await emit_macro_status(False, "Invalid macro type or missing key/text")
+                await sleep_until_woken()
+                continue
+            started = time.monotonic()
+            result = await macro_runner.send(window_handle, payload)
+            stats.observe('execution_ms', (time.monotonic() - started) * 1000)
+
+            latency_ms = None
+            if triggered_at is not None:
+                latency_ms = round((time.monotonic() - triggered_at) * 1000, 2)
+                record_trigger_latency(nid, latency_ms)
+
+            # Result may be True or (False, error)
+            if isinstance(result, tuple):
+                success, err = result
+            else:
+                success, err = bool(result), ""
+
+            if success:
+                stats.increment('sends')
+                await emit_macro_status(True, f"Macro sent: {macro_type}", latency_ms)
             else:
-                await asyncio.sleep(0.1)  # No macro action: check again soon
+                stats.increment('sends_failed')
+                await emit_macro_status(False, err or "Unknown macro engine failure", latency_ms)
+
+            # Timing: the next send is due one interval after this one was *due*, not after it finished
+            if repeating:
+                ms = random.randint(random_min, random_max) if randomize else interval_ms
+                # After a stall, resume from now instead of firing a burst of missed sends
+                next_deadline = max(next_deadline + ms / 1000.0, time.monotonic())
 
         except asyncio.CancelledError:
             print(f"[TASK] Macro role {nid} cancelled.")
             break
         except Exception as e:
             print(f"[ERROR] Macro task {nid} failed: {e}")
-            import traceback
             traceback.print_exc()
             await emit_macro_status(False, str(e))
             await asyncio.sleep(0.5)
 
 # ---------------- Config Watcher ----------------
 async def config_watcher():
-    print("[DEBUG] Starting config watcher")
+    # Fallback for platforms where QFileSystemWatcher cannot watch the config file.
+    print("[DEBUG] Starting config watcher (polling)")
     while True:
         CONFIG.watch(); await asyncio.sleep(CONFIG.data.get('config_file_watcher_interval',2))
 
+# ---------------- Heartbeat ----------------
+async def heartbeat_task():
+    # Keeps this agent listed as online; the server announces the interval in server_capabilities.
+    while True:
+        await asyncio.sleep(max(1, server_capabilities.get('heartbeat_interval', 10)))
+        if not sio.connected:
+            continue
+        try:
+            await sio.emit('agent_heartbeat', {'agent_id': AGENT_ID})
+        except Exception as e:
+            print(f"[WARN] Failed to send heartbeat: {e}")
+
+# ---------------- Telemetry Reporter ----------------
+async def telemetry_reporter():
+    # One small event per interval with every role's rolling stats (see role_telemetry.py).
+    while True:
+        await asyncio.sleep(max(1, CONFIG.data.get('telemetry_interval', 5)))
+        if not sio.connected or not telemetry.roles:
+            continue
+        try:
+            await sio.emit('agent_stats', {
+                'agent_id': AGENT_ID,
+                'timestamp': int(time.time() * 1000),
+                'roles': telemetry.snapshot(),
+                'capture': scheduler.stats(),
+                'macro': macro_runner.stats()
+            })
+        except Exception as e:
+            print(f"[WARN] Failed to report telemetry: {e}")
+
 # ---------------- Persistent Idle Task ----------------
 async def idle_task():
     print("[Agent] Entering idle state. Awaiting instructions...")
@@ -527,12 +893,18 @@ if __name__=='__main__':
     dummy_window=PersistentWindow(); dummy_window.show()
     print("[DEBUG] Dummy window shown to prevent Qt exit")
     try:
-        background_tasks.append(loop.create_task(config_watcher()))
+        if not CONFIG.start(loop):
+            background_tasks.append(loop.create_task(config_watcher()))
         background_tasks.append(loop.create_task(connect_loop()))
+        background_tasks.append(loop.create_task(heartbeat_task()))
+        background_tasks.append(loop.create_task(telemetry_reporter()))
         background_tasks.append(loop.create_task(idle_task()))
         loop.run_forever()
     except Exception as e:
         print(f"[FATAL] Event loop crashed: {e}")
         traceback.print_exc()
     finally:
+        CONFIG.flush()
+        scheduler.shutdown()
+        macro_runner.shutdown()
         print("[FATAL] Agent exited unexpectedly.")
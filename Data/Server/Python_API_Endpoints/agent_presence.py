@@ -0,0 +1,396 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/agent_presence.py
+
+import os
+import time
+import uuid
+import heapq
+import threading
+
+from Python_API_Endpoints.shared_state import MemoryBackend, DELETE, modify
+
+# ---------------------------------------------------------------------
+# Agent Presence Configuration (overridable via environment variables)
+# ---------------------------------------------------------------------
+# BOREALIS_AGENT_HEARTBEAT:  Seconds between agent heartbeats (announced to agents on connect).
+# BOREALIS_AGENT_TIMEOUT:    Seconds without a heartbeat before a connected agent counts as offline.
+# BOREALIS_AGENT_RETENTION:  Seconds an offline agent stays listed before it is removed.
+AGENT_HEARTBEAT_INTERVAL = float(os.environ.get("BOREALIS_AGENT_HEARTBEAT", 10))
+AGENT_TIMEOUT = float(os.environ.get("BOREALIS_AGENT_TIMEOUT", AGENT_HEARTBEAT_INTERVAL * 3))
+AGENT_RETENTION = float(os.environ.get("BOREALIS_AGENT_RETENTION", 300))
+AGENT_DELTA_HISTORY = 1024
+
+# Fields sent in "agents_changed" deltas and /api/agents?since= (telemetry stays out).
+PRESENCE_FIELDS = ("agent_id", "hostname", "status", "last_seen", "connected_at")
+
+# ---------------------------------------------------------------------
+# Agent Presence Tracking
+# ---------------------------------------------------------------------
+class AgentPresence:
+    """
+    Owns the registered_agents dict:
+    - a sid <-> agent_id index, so a disconnect marks its agent offline in O(1)
+    - heartbeats only refresh last_seen; expiry runs off a min-heap of deadlines with at
+      most one entry per agent (an entry that fires early is pushed back to the agent's
+      real deadline), so a sweep only touches agents that are actually due
+    - every status change is published as a numbered delta
+      {"seq", "upserted": {agent_id: {...}}, "removed": [...]} through `emit(delta)`, and
+      the last AGENT_DELTA_HISTORY deltas are kept so pollers can catch up with since=seq
+    Agents that never sent a heartbeat (older builds) are only taken offline by a disconnect.
+    `status_of(agent_id)` gives the status of an online agent ("provisioned" / "orphaned").
+    Agents, the delta log and seq live in `backend` (see shared_state.py), so with several
+    workers every one of them lists all agents; the sid index and deadlines stay with the
+    worker the agent is connected to. On a shared backend each worker also renews a lease
+    (every timeout / 3) and records stamp the `owner` worker, so when a worker dies, the
+    others take its agents offline once its lease has run out. worker_agents lists the
+    agents each worker has connected, so that only touches the dead worker's agents.
+    """
+    def __init__(self, status_of, emit, timeout=AGENT_TIMEOUT, retention=AGENT_RETENTION,
+                 history=AGENT_DELTA_HISTORY, backend=None):
+        self.status_of = status_of
+        self._emit = emit
+        self.timeout = timeout
+        self.retention = retention
+        self.history = history
+        self._backend = backend or MemoryBackend()
+        self.agents = self._backend.mapping("agents")
+        self._log = self._backend.mapping("agent_deltas")
+        self._sid_agent = {}
+        self._agent_sid = {}
+        self._heartbeating = set()
+        self._deadlines = []
+        self._scheduled = {}
+        self._touched = {}
+        self._lock = threading.Lock()
+        self.owner = uuid.uuid4().hex[:12]
+        self._leases = self._backend.mapping("worker_leases")
+        self._owned = self._backend.mapping("worker_agents")
+        self._next_lease_check = 0.0
+        if self._backend.shared:
+            self._leases[self.owner] = time.time() + self.timeout
+        self.expired = 0
+        self.removed = 0
+
+    # ---------------- Agent Events ----------------
+    # Every change to an agent goes through _modify() (an atomic read-modify-write on a
+    # shared backend), so a worker never reverts what another worker wrote in between.
+    # Each record carries the sid of its connection; a late disconnect or expiry from a
+    # worker the agent has since left no longer matches it and changes nothing.
+    def _modify(self, agent_id, change):
+        return modify(self.agents, agent_id, change)
+
+    def connect(self, agent_id, sid, hostname="unknown"):
+        now = time.time()
+        previous = {}
+
+        def change(agent):
+            previous["owner"] = agent.get("owner") if agent else None
+            agent = agent or {"agent_id": agent_id}
+            agent.update({
+                "hostname": hostname,
+                "status": self.status_of(agent_id),
+                "last_seen": now,
+                "connected_at": now,
+                "sid": sid,
+                "owner": self.owner
+            })
+            agent.pop("offline_since", None)
+            return agent
+
+        with self._lock:
+            previous_sid = self._agent_sid.get(agent_id)
+            if previous_sid is not None:
+                self._sid_agent.pop(previous_sid, None)
+            self._sid_agent[sid] = agent_id
+            self._agent_sid[agent_id] = sid
+            self._modify(agent_id, change)
+            if self._backend.shared and previous["owner"] != self.owner:
+                self._index_agent(self.owner, agent_id, True)
+                if previous["owner"]:
+                    self._index_agent(previous["owner"], agent_id, False)
+            delta = self._publish(upserted=[agent_id])
+        self._emit(delta)
+
+    def _index_agent(self, owner, agent_id, owned):
+        def change(agent_ids):
+            agent_ids = agent_ids or []
+            if (agent_id in agent_ids) == owned:
+                return None
+            agent_ids = agent_ids + [agent_id] if owned else [a for a in agent_ids if a != agent_id]
+            return agent_ids or DELETE
+
+        modify(self._owned, owner, change)
+
+    @property
+    def seq(self):
+        return self._backend.counter("agent_presence", "seq")
+
+    def heartbeat(self, agent_id, sid=None, hostname=None):
+        """Refresh an agent; re-registers it when it was expired or the server restarted."""
+        now = time.time()
+        found = {}
+
+        def change(agent):
+            found.clear()
+            if agent is None:
+                return None
+            found["hostname"] = agent.get("hostname")
+            if sid is not None and (self._agent_sid.get(agent_id) != sid or agent.get("sid") != sid):
+                return None
+            found["known"] = True
+            agent["last_seen"] = now
+            if agent["status"] == "offline":
+                agent.pop("offline_since", None)
+                agent["status"] = self.status_of(agent_id)
+                found["revived"] = True
+            return agent
+
+        delta = None
+        with self._lock:
+            self._modify(agent_id, change)
+            if found.get("known"):
+                self._heartbeating.add(agent_id)
+                self._schedule(agent_id, now + self.timeout)
+                if found.get("revived"):
+                    delta = self._publish(upserted=[agent_id])
+        if delta:
+            self._emit(delta)
+        elif not found.get("known") and sid is not None:
+            self.connect(agent_id, sid, hostname or found.get("hostname") or "unknown")
+            with self._lock:
+                self._heartbeating.add(agent_id)
+                self._schedule(agent_id, time.time() + self.timeout)
+
+    def touch(self, agent_id):
+        # Frames and telemetry prove an agent is alive as well; no delta for last_seen alone,
+        # and a shared backend is written at most once per second per agent.
+        now = time.time()
+        if self._touched.get(agent_id, 0) > now - 1:
+            return
+        self._touched[agent_id] = now
+
+        def change(agent):
+            if agent is None or agent["status"] == "offline":
+                return None
+            agent["last_seen"] = now
+            return agent
+
+        self._modify(agent_id, change)
+
+    def update(self, agent_id, **fields):
+        """Attach extra fields (e.g. telemetry) to a listed agent; False if it is not listed."""
+        def change(agent):
+            if agent is None:
+                return None
+            agent.update(fields)
+            return agent
+
+        with self._lock:
+            return self._modify(agent_id, change) is not None
+
+    def disconnect(self, sid):
+        """Returns the agent_id that went offline, or None if sid was not an agent."""
+        with self._lock:
+            agent_id = self._sid_agent.pop(sid, None)
+            if agent_id is None:
+                return None
+            self._agent_sid.pop(agent_id, None)
+            self._heartbeating.discard(agent_id)
+            delta = self._set_offline(agent_id, time.time(), sid)
+        if delta:
+            self._emit(delta)
+        return agent_id
+
+    def refresh_status(self, agent_id):
+        """Re-evaluate status_of() for an online agent, e.g. after it was provisioned."""
+        def change(agent):
+            if agent is None or agent["status"] == "offline" or agent["status"] == self.status_of(agent_id):
+                return None
+            agent["status"] = self.status_of(agent_id)
+            return agent
+
+        with self._lock:
+            if self._modify(agent_id, change) is None:
+                return
+            delta = self._publish(upserted=[agent_id])
+        self._emit(delta)
+
+    def is_agent(self, sid):
+        return sid in self._sid_agent
+
+    # ---------------- Expiry ----------------
+    def _schedule(self, agent_id, deadline):
+        # Only an earlier deadline needs a new heap entry; later ones are handled when the
+        # current entry fires.
+        current = self._scheduled.get(agent_id)
+        if current is None or deadline < current:
+            self._scheduled[agent_id] = deadline
+            heapq.heappush(self._deadlines, (deadline, agent_id))
+
+    def _due(self, agent_id, agent):
+        if agent["status"] == "offline":
+            return agent.get("offline_since", agent["last_seen"]) + self.retention
+        if agent_id in self._heartbeating and agent.get("sid") == self._agent_sid.get(agent_id):
+            return agent["last_seen"] + self.timeout
+        return None  # Connected without heartbeats, or now connected to another worker.
+
+    def _set_offline(self, agent_id, now, sid):
+        def change(agent):
+            if agent is None or agent["status"] == "offline" or agent.get("sid") != sid:
+                return None
+            agent["status"] = "offline"
+            agent["offline_since"] = now
+            return agent
+
+        if self._modify(agent_id, change) is None:
+            return None
+        self._schedule(agent_id, now + self.retention)
+        return self._publish(upserted=[agent_id])
+
+    def expire(self, now=None):
+        """Take timed-out agents offline and drop expired offline ones; returns the delta or None."""
+        now = time.time() if now is None else now
+        offline, removed = [], []
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                deadline, agent_id = heapq.heappop(self._deadlines)
+                if self._scheduled.get(agent_id) != deadline:
+                    continue  # Superseded by an earlier entry.
+                del self._scheduled[agent_id]
+                outcome = {}
+
+                def change(agent):
+                    outcome.clear()
+                    if agent is None:
+                        return None
+                    due = self._due(agent_id, agent)
+                    if due is None:
+                        return None
+                    if due > now:
+                        outcome["due"] = due
+                        return None
+                    if agent["status"] == "offline":
+                        outcome["removed"] = True
+                        outcome["owner"] = agent.get("owner")
+                        return DELETE
+                    agent["status"] = "offline"
+                    agent["offline_since"] = now
+                    outcome["offline"] = True
+                    return agent
+
+                self._modify(agent_id, change)
+                if "due" in outcome:
+                    self._schedule(agent_id, outcome["due"])
+                elif outcome.get("offline"):
+                    self._schedule(agent_id, now + self.retention)
+                    offline.append(agent_id)
+                    self.expired += 1
+                elif outcome.get("removed"):
+                    self._heartbeating.discard(agent_id)
+                    self._touched.pop(agent_id, None)
+                    sid = self._agent_sid.pop(agent_id, None)
+                    if sid is not None:
+                        self._sid_agent.pop(sid, None)
+                    if self._backend.shared and outcome["owner"]:
+                        self._index_agent(outcome["owner"], agent_id, False)
+                    removed.append(agent_id)
+                    self.removed += 1
+            orphaned = self._check_leases(now)
+            offline.extend(orphaned)
+            self.expired += len(orphaned)
+            delta = self._publish(upserted=offline, removed=removed) if offline or removed else None
+        if delta:
+            self._emit(delta)
+        return delta
+
+    def _check_leases(self, now):
+        """Renew this worker's lease; take agents of workers whose lease ran out offline."""
+        if not self._backend.shared or now < self._next_lease_check:
+            return []
+        self._next_lease_check = now + self.timeout / 3
+        self._leases[self.owner] = now + self.timeout
+        leases = dict(self._leases.items())
+        offline = []
+        for owner in list(self._owned):
+            if owner == self.owner or leases.get(owner, 0) > now:
+                continue
+
+            def change(agent, owner=owner):
+                if agent is None or agent["status"] == "offline" or agent.get("owner") != owner:
+                    return None  # Reconnected (to a live worker) in the meantime.
+                agent["status"] = "offline"
+                agent["offline_since"] = now
+                return agent
+
+            for agent_id in self._owned.get(owner) or []:
+                if self._modify(agent_id, change) is not None:
+                    self._schedule(agent_id, now + self.retention)
+                    offline.append(agent_id)
+            self._owned.pop(owner, None)
+        for owner, expires in leases.items():
+            if expires < now - self.retention:
+                modify(self._leases, owner, lambda current, expires=expires: DELETE if current == expires else None)
+        return offline
+
+    def next_deadline(self):
+        return self._deadlines[0][0] if self._deadlines else None
+
+    # ---------------- Deltas ----------------
+    @staticmethod
+    def public(agent):
+        return {field: agent.get(field) for field in PRESENCE_FIELDS}
+
+    def _publish(self, upserted=(), removed=()):
+        seq = self._backend.incr("agent_presence", "seq")
+        agents = {agent_id: self.agents.get(agent_id) for agent_id in upserted}
+        delta = {
+            "seq": seq,
+            "upserted": {agent_id: self.public(agent) for agent_id, agent in agents.items() if agent is not None},
+            "removed": list(removed)
+        }
+        self._log[str(seq)] = delta
+        self._log.pop(str(seq - self.history), None)
+        return delta
+
+    def snapshot(self):
+        with self._lock:
+            seq = self.seq
+            return {"seq": seq, "full": True, "agents": {aid: self.public(a) for aid, a in self.agents.items()}}
+
+    def changes_since(self, seq):
+        """Merged delta from seq to now, or a full snapshot if the history no longer reaches back."""
+        with self._lock:
+            current = self.seq
+            if seq == current:
+                return {"seq": current, "full": False, "upserted": {}, "removed": []}
+            if 0 <= current - seq <= self.history:
+                upserted, removed = {}, set()
+                for number in range(seq + 1, current + 1):
+                    delta = self._log.get(str(number))
+                    if delta is None:
+                        break  # Trimmed (or a worker has not written it yet): send a snapshot.
+                    for agent_id in delta["removed"]:
+                        upserted.pop(agent_id, None)
+                        removed.add(agent_id)
+                    for agent_id, info in delta["upserted"].items():
+                        removed.discard(agent_id)
+                        upserted[agent_id] = info
+                else:
+                    return {"seq": current, "full": False, "upserted": upserted, "removed": sorted(removed)}
+        return self.snapshot()
+
+    def stats(self):
+        with self._lock:
+            statuses = {}
+            for _, agent in self.agents.items():
+                statuses[agent["status"]] = statuses.get(agent["status"], 0) + 1
+            return {
+                "seq": self.seq,
+                "state_backend": self._backend.describe()["backend"],
+                "agents": len(self.agents),
+                "statuses": statuses,
+                "connected": len(self._agent_sid),
+                "heartbeating": len(self._heartbeating),
+                "scheduled_deadlines": len(self._deadlines),
+                "expired": self.expired,
+                "removed": self.removed
+            }
@@ -0,0 +1,335 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/api_proxy.py
+
+import os
+import time
+import threading
+from itertools import chain
+from http.cookiejar import CookiePolicy
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ---------------------------------------------------------------------
+# API Proxy Configuration (overridable via environment variables)
+# ---------------------------------------------------------------------
+# BOREALIS_PROXY_CACHE_TTL:       Seconds a GET response may be served from cache (0 = no cache).
+#                                 An upstream Cache-Control max-age shorter than this wins.
+# BOREALIS_PROXY_CACHE_BYTES:     Largest body that is cached / shared; bigger ones are streamed.
+# BOREALIS_PROXY_CACHE_ENTRIES:   Upper bound on cached responses (least recently used go first).
+# BOREALIS_PROXY_POOL_SIZE:       Keep-alive connections kept per upstream host.
+# BOREALIS_PROXY_TIMEOUT:         Upstream connect / read timeout in seconds.
+PROXY_CACHE_TTL = float(os.environ.get("BOREALIS_PROXY_CACHE_TTL", 0))
+PROXY_CACHE_MAX_BYTES = int(os.environ.get("BOREALIS_PROXY_CACHE_BYTES", 1024 * 1024))
+PROXY_CACHE_MAX_ENTRIES = int(os.environ.get("BOREALIS_PROXY_CACHE_ENTRIES", 256))
+PROXY_POOL_SIZE = int(os.environ.get("BOREALIS_PROXY_POOL_SIZE", 16))
+PROXY_TIMEOUT = float(os.environ.get("BOREALIS_PROXY_TIMEOUT", 10))
+CHUNK_SIZE = 64 * 1024
+
+# Never forwarded in either direction. accept-encoding is left to requests, which
+# decodes gzip / deflate itself (the body is passed on decoded, without content-encoding).
+HOP_BY_HOP_HEADERS = {
+    "host", "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade", "content-length", "accept-encoding"
+}
+EXCLUDED_RESPONSE_HEADERS = HOP_BY_HOP_HEADERS | {"content-encoding"}
+# Request headers that can change the upstream response, so they are part of the cache key.
+CACHE_KEY_HEADERS = ("accept", "authorization", "cookie")
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip().strip('"')
+    return directives
+
+def is_private(headers):
+    """A response meant for one client only: it sets a cookie or says Cache-Control: private."""
+    found = {k.lower() for k, _ in headers}
+    cache_control = ", ".join(v for k, v in headers if k.lower() == "cache-control")
+    return "set-cookie" in found or "private" in parse_cache_control(cache_control)
+
+class RejectAllCookies(CookiePolicy):
+    # Pooled sessions are shared by every client: an upstream Set-Cookie is passed on to
+    # the client that caused it, but never stored and replayed for anyone else.
+    netscape = True
+    rfc2965 = False
+    hide_cookie2 = False
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+    def domain_return_ok(self, domain, request):
+        return False
+
+    def path_return_ok(self, path, request):
+        return False
+
+class ProxyResult:
+    """What the endpoint sends back: a complete body (bytes) or a chunk iterator."""
+    def __init__(self, status, headers, body, cache):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.cache = cache
+
+class CachedResponse:
+    __slots__ = ("status", "headers", "body", "etag", "last_modified", "expires_at", "cache_state", "private")
+
+    def __init__(self, status, headers, body, ttl, cache_state="MISS"):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        found = {k.lower(): v for k, v in headers}
+        self.etag = found.get("etag")
+        self.last_modified = found.get("last-modified")
+        self.expires_at = time.monotonic() + ttl
+        self.cache_state = cache_state
+        self.private = is_private(headers)
+
+class PendingFetch:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None  # CachedResponse, or None if the response could not / may not be shared
+
+# ---------------------------------------------------------------------
+# Pooled, Streaming, Caching Upstream Proxy
+# ---------------------------------------------------------------------
+class UpstreamProxy:
+    """
+    Backs /api/proxy. Upstream connections are kept alive in one requests.Session per
+    scheme + host. Bodies are streamed through in chunks rather than buffered whole.
+    Identical GETs that arrive while one is already in flight wait for it and share its
+    response, so many nodes polling one URL cost a single upstream request per interval.
+    With a cache TTL, GET responses are also served from cache for up to the TTL (or
+    the upstream max-age) and revalidated with If-None-Match / If-Modified-Since once stale.
+    """
+    def __init__(self, cache_ttl=PROXY_CACHE_TTL, max_bytes=PROXY_CACHE_MAX_BYTES,
+                 max_entries=PROXY_CACHE_MAX_ENTRIES, pool_size=PROXY_POOL_SIZE, timeout=PROXY_TIMEOUT):
+        self.cache_ttl = cache_ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._sessions = {}
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.upstream_requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.coalesced = 0
+        self.streamed = 0
+
+    def session(self, url):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise ValueError(f"Unsupported proxy URL '{url}'.")
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                session.cookies.set_policy(RejectAllCookies())
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[origin] = session
+        return session
+
+    def _request(self, method, url, headers, data):
+        self.upstream_requests += 1
+        return self.session(url).request(
+            method, url, headers=headers, data=data or None,
+            timeout=self.timeout, stream=True, allow_redirects=True
+        )
+
+    @staticmethod
+    def response_headers(upstream):
+        return [(k, v) for k, v in upstream.raw.headers.items() if k.lower() not in EXCLUDED_RESPONSE_HEADERS]
+
+    def forward(self, method, url, headers, data=b""):
+        """Proxy one request; raises requests.RequestException / ValueError on failure."""
+        headers = {k: v for k, v in headers if k.lower() not in HOP_BY_HOP_HEADERS}
+        if method != "GET":
+            return self._stream(self._request(method, url, headers, data))
+
+        lowered = {k.lower(): v for k, v in headers.items()}
+        key = (url,) + tuple(lowered.get(name, "") for name in CACHE_KEY_HEADERS)
+        client_etag = lowered.get("if-none-match")
+        # The proxy does its own revalidation; a client's validators only apply to its copy.
+        headers = {k: v for k, v in headers.items() if k.lower() not in ("if-none-match", "if-modified-since")}
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._from_entry(entry, "HIT", client_etag)
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = PendingFetch()
+
+        if not leader:
+            pending.done.wait(self.timeout * 2)
+            if pending.result is not None:
+                self.coalesced += 1
+                return self._from_entry(pending.result, "COALESCED", client_etag)
+            return self._stream(self._request(method, url, headers, data))
+
+        try:
+            result = self._fetch(key, url, headers, entry)
+            if isinstance(result, CachedResponse):
+                if not result.private:
+                    pending.result = result  # Waiters make their own request instead of getting this client's cookies.
+                return self._from_entry(result, result.cache_state, client_etag)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.done.set()
+
+    def _fetch(self, key, url, headers, stale):
+        if stale is not None:
+            if stale.etag:
+                headers = {**headers, "If-None-Match": stale.etag}
+            if stale.last_modified:
+                headers = {**headers, "If-Modified-Since": stale.last_modified}
+        upstream = self._request("GET", url, headers, None)
+
+        if stale is not None and upstream.status_code == 304:
+            upstream.close()
+            self.revalidated += 1
+            fresh = CachedResponse(stale.status, stale.headers, stale.body, self._ttl(upstream), "REVALIDATED")
+            self._store(key, fresh)
+            return fresh
+
+        self.misses += 1
+        length = upstream.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            return self._stream(upstream)
+        chunks = upstream.iter_content(CHUNK_SIZE)
+        buffered, size = [], 0
+        for chunk in chunks:
+            buffered.append(chunk)
+            size += len(chunk)
+            if size > self.max_bytes:
+                # Too large to share: stream what was read so far plus the rest.
+                return self._stream(upstream, chain(buffered, chunks))
+        upstream.close()
+
+        entry = CachedResponse(upstream.status_code, self.response_headers(upstream), b"".join(buffered), self._ttl(upstream))
+        if self._cacheable(upstream):
+            self._store(key, entry)
+        return entry
+
+    def _ttl(self, upstream):
+        directives = parse_cache_control(upstream.headers.get("Cache-Control"))
+        if "no-cache" in directives:
+            return 0
+        for name in ("s-maxage", "max-age"):
+            if directives.get(name, "").isdigit():
+                return min(self.cache_ttl, float(directives[name]))
+        return self.cache_ttl
+
+    def _cacheable(self, upstream):
+        if self.cache_ttl <= 0 or upstream.status_code != 200:
+            return False
+        if "no-store" in parse_cache_control(upstream.headers.get("Cache-Control")):
+            return False
+        if is_private(self.response_headers(upstream)):
+            return False
+        return upstream.headers.get("Vary", "").strip() != "*"
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _from_entry(entry, cache_state, client_etag=None):
+        if client_etag and entry.etag and client_etag == entry.etag:
+            return ProxyResult(304, [("ETag", entry.etag)], b"", cache_state)
+        return ProxyResult(entry.status, entry.headers, entry.body, cache_state)
+
+    def _stream(self, upstream, chunks=None):
+        self.streamed += 1
+        chunks = chunks if chunks is not None else upstream.iter_content(CHUNK_SIZE)
+
+        def generate():
+            try:
+                yield from chunks
+            finally:
+                upstream.close()  # Returns the connection to the pool once fully read.
+
+        return ProxyResult(upstream.status_code, self.response_headers(upstream), generate(), "BYPASS")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cache_ttl": self.cache_ttl,
+                "cached_responses": len(self._cache),
+                "upstream_hosts": len(self._sessions),
+                "upstream_requests": self.upstream_requests,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "coalesced": self.coalesced,
+                "streamed": self.streamed
+            }
+
+# ---------------------------------------------------------------------
+# Self-Check: Per-Client Responses are never Shared
+# ---------------------------------------------------------------------
+# Run from Data/Server: python -m Python_API_Endpoints.api_proxy
+def check_private_responses():
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Upstream(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(0.2)  # Long enough for concurrent requests to find this one in flight.
+            self.send_response(200)
+            if self.path == "/cookie":
+                self.send_header("Set-Cookie", "session=client-a")
+            elif self.path == "/private":
+                self.send_header("Cache-Control", "private, max-age=60")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for path, shared in (("/public", True), ("/cookie", False), ("/private", False)):
+            proxy = UpstreamProxy(cache_ttl=60)
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(proxy.forward("GET", base + path, [])))
+                       for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results.append(proxy.forward("GET", base + path, []))
+            assert all(result.status == 200 for result in results), path
+            expected = 1 if shared else len(results)
+            assert proxy.upstream_requests == expected, (path, proxy.stats())
+            assert (proxy.coalesced > 0 and proxy.hits > 0) == shared, (path, proxy.stats())
+            print(f"{path:>8}: {proxy.upstream_requests} upstream request(s) for {len(results)} clients")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    check_private_responses()
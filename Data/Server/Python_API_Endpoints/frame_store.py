@@ -0,0 +1,204 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/frame_store.py
+
+import os
+import time
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+
+# ---------------------------------------------------------------------
+# Frame Store Configuration (overridable via environment variables)
+# ---------------------------------------------------------------------
+# BOREALIS_FRAME_TTL:           Seconds a frame is kept after it was last updated.
+# BOREALIS_FRAME_STORE_BYTES:   Memory budget for all stored frames; least recently used go first.
+# BOREALIS_FRAME_STORE_ENTRIES: Upper bound on stored streams.
+FRAME_TTL = float(os.environ.get("BOREALIS_FRAME_TTL", 300))
+FRAME_STORE_MAX_BYTES = int(os.environ.get("BOREALIS_FRAME_STORE_BYTES", 64 * 1024 * 1024))
+FRAME_STORE_MAX_ENTRIES = int(os.environ.get("BOREALIS_FRAME_STORE_ENTRIES", 1024))
+
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"RIFF", "image/webp")
+)
+
+def sniff_content_type(data) -> str:
+    for signature, content_type in IMAGE_SIGNATURES:
+        if data[:len(signature)] == signature:
+            return content_type
+    return "application/octet-stream"
+
+class Frame:
+    __slots__ = ("image_bytes", "timestamp", "etag", "content_type", "stored_at")
+
+    def __init__(self, image_bytes, timestamp):
+        self.image_bytes = image_bytes
+        self.timestamp = timestamp
+        self.etag = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+        self.content_type = sniff_content_type(image_bytes)
+        self.stored_at = time.monotonic()
+
+# ---------------------------------------------------------------------
+# Bounded Latest-Frame Store
+# ---------------------------------------------------------------------
+class FrameStore:
+    """
+    Latest frame per stream key ("agent_id:node_id", or "agent_id" for legacy whole-screen
+    screenshots). Entries expire FRAME_TTL seconds after their last update and the
+    least recently used are evicted once the byte or entry budget is exceeded.
+    With `shared` (a raw mapping of a shared state backend, see shared_state.py), frames
+    are also published there, so workers that are not connected to the agent can serve them.
+    Open it with ttl=FRAME_TTL: the backend expires published frames, and frames this store
+    evicts or expires are deleted there as well.
+    """
+    def __init__(self, ttl=FRAME_TTL, max_bytes=FRAME_STORE_MAX_BYTES, max_entries=FRAME_STORE_MAX_ENTRIES, shared=None):
+        self.ttl = ttl
+        self.shared = shared
+        self._remote = {}  # key -> Frame last read from shared, reused while unchanged
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._frames = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._next_sweep = 0.0
+        self._next_shared_sweep = 0.0
+
+    def _expired(self, frame, now):
+        return self.ttl > 0 and now - frame.stored_at > self.ttl
+
+    def _remove(self, key):
+        frame = self._frames.pop(key)
+        self._bytes -= len(frame.image_bytes)
+        return frame
+
+    def put(self, key, image_bytes, timestamp=None):
+        frame = Frame(image_bytes, timestamp or time.time())
+        size = len(image_bytes)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return frame
+        with self._lock:
+            if key in self._frames:
+                self._remove(key)
+            self._frames[key] = frame
+            self._bytes += size
+            dropped = self._sweep_locked(frame.stored_at)
+            while len(self._frames) > self.max_entries or self._bytes > self.max_bytes:
+                dropped.append(next(iter(self._frames)))
+                self._remove(dropped[-1])
+                self.evictions += 1
+            for old in dropped:
+                self._remote.pop(old, None)
+        if self.shared is not None:
+            self.shared[key] = struct.pack("<d", frame.timestamp) + image_bytes
+            self._drop_shared(dropped, frame.stored_at)
+        return frame
+
+    def _drop_shared(self, keys, now):
+        # Runs outside the lock: these are backend round trips. A stream whose frame is
+        # dropped here is published again with its next frame.
+        for key in keys:
+            try:
+                del self.shared[key]
+            except KeyError:
+                pass
+        if now >= self._next_shared_sweep:
+            self._next_shared_sweep = now + 1.0
+            self.shared.expire()
+
+    def get(self, key):
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None and self._expired(frame, time.monotonic()):
+                self._remove(key)
+                self.expirations += 1
+                frame = None
+            if frame is None and self.shared is not None:
+                frame = self._get_shared(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            if key in self._frames:
+                self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def _get_shared(self, key):
+        data = self.shared.get(key)
+        if data is None or len(data) < 8:
+            self._remote.pop(key, None)
+            return None
+        timestamp = struct.unpack("<d", data[:8])[0]
+        if self.ttl > 0 and time.time() - timestamp > self.ttl:
+            return None
+        frame = self._remote.get(key)
+        if frame is None or frame.timestamp != timestamp:
+            frame = self._remote[key] = Frame(data[8:], timestamp)
+        return frame
+
+    def delete(self, key):
+        with self._lock:
+            if self.shared is not None:
+                self._remote.pop(key, None)
+                self.shared.pop(key, None)
+            if key not in self._frames:
+                return False
+            self._remove(key)
+            return True
+
+    def delete_agent(self, agent_id, keep_nodes=None):
+        """Drop an agent's frames, except those of the node_ids in keep_nodes."""
+        keep = {f"{agent_id}:{node_id}" for node_id in (keep_nodes or ())}
+        prefix = f"{agent_id}:"
+        matches = lambda k: (k == agent_id or k.startswith(prefix)) and k not in keep
+        with self._lock:
+            keys = [k for k in self._frames if matches(k)]
+            for key in keys:
+                self._remove(key)
+            if self.shared is not None:
+                for key in [k for k in self.shared if matches(k)]:
+                    self._remote.pop(key, None)
+                    self.shared.pop(key, None)
+        return len(keys)
+
+    def _sweep_locked(self, now, force=False):
+        # Entries are kept in LRU order, not expiry order, so a sweep checks them all;
+        # writes trigger one at most once per second. Returns the expired keys.
+        if not force and now < self._next_sweep:
+            return []
+        self._next_sweep = now + 1.0
+        expired = [key for key, frame in self._frames.items() if self._expired(frame, now)]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return expired
+
+    def sweep(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = self._sweep_locked(now, force=True)
+            for key in expired:
+                self._remote.pop(key, None)
+        if self.shared is not None:
+            self._next_shared_sweep = 0.0
+            self._drop_shared(expired, now)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._frames),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
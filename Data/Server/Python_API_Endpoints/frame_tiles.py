@@ -0,0 +1,90 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/frame_tiles.py
+
+import io
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+# ---------------------------------------------------------------------
+# Dirty Tile Reassembly
+# ---------------------------------------------------------------------
+# Agents running with "change_detection": "tiles" only send the parts of a region
+# that changed since their last frame. The assembler pastes those tiles onto the
+# stream's latest frame and re-encodes it, so every consumer still sees full frames.
+# The decoded canvas of each stream is kept between updates; it is only reused while
+# the frame store still holds the exact bytes this assembler produced for it.
+
+class TileAssembler:
+    """
+    `run(fn, *args)` executes the decode / paste / encode work and returns its result;
+    the server passes eventlet's thread pool so PNG coding never blocks the hub. The
+    default calls fn directly.
+    """
+    def __init__(self, max_canvases=64, run=None):
+        self.max_canvases = max_canvases
+        self._run = run or (lambda fn, *args: fn(*args))
+        self._canvases = OrderedDict()  # stream key -> (frame bytes, PIL image)
+        self._stream_locks = {}
+        self._lock = threading.Lock()
+        self.assembled = 0
+        self.canvas_misses = 0
+
+    def lock(self, key):
+        """
+        Tiles are deltas against the stream's previous frame, so reading the base frame,
+        apply() and storing the result must not interleave with another update of the
+        same stream while apply() waits for `run`.
+        """
+        with self._lock:
+            return self._stream_locks.setdefault(key, threading.Lock())
+
+    def apply(self, key, base_bytes, tiles, size):
+        """
+        Paste tiles [(x, y, png_bytes), ...] onto base_bytes and return the new frame
+        as PNG bytes, or None if the base frame does not have the announced size.
+        """
+        with self._lock:
+            cached = self._canvases.pop(key, None)
+        canvas = cached[1] if cached is not None and cached[0] is base_bytes else None
+        if canvas is None:
+            self.canvas_misses += 1
+
+        result = self._run(self._compose, canvas, base_bytes, tiles, tuple(size))
+        if result is None:
+            return None
+        frame, canvas = result
+        with self._lock:
+            self._canvases[key] = (frame, canvas)
+            while len(self._canvases) > self.max_canvases:
+                self._canvases.popitem(last=False)
+            self.assembled += 1
+        return frame
+
+    @staticmethod
+    def _compose(canvas, base_bytes, tiles, size):
+        if canvas is None:
+            canvas = Image.open(io.BytesIO(base_bytes)).convert("RGB")
+        if canvas.size != size:
+            return None
+
+        for x, y, tile_bytes in tiles:
+            canvas.paste(Image.open(io.BytesIO(tile_bytes)).convert("RGB"), (int(x), int(y)))
+
+        buf = io.BytesIO()
+        # Fast compression: this runs for every tiled update of every stream.
+        canvas.save(buf, format="PNG", compress_level=1)
+        return buf.getvalue(), canvas
+
+    def discard(self, key):
+        with self._lock:
+            self._canvases.pop(key, None)
+            self._stream_locks.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "canvases": len(self._canvases),
+                "assembled": self.assembled,
+                "canvas_misses": self.canvas_misses
+            }
@@ -0,0 +1,217 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/image_preprocessing.py
+
+import io
+import json
+import time
+import base64
+import numpy as np
+from PIL import Image
+
+# ---------------------------------------------------------------------
+# OCR Image Preprocessing Pipeline
+# ---------------------------------------------------------------------
+# A pipeline is a list of steps applied in order to one decoded image, e.g.
+#   [{"op": "crop", "x": 0, "y": 0, "w": 200, "h": 40},
+#    {"op": "scale", "factor": 2},
+#    {"op": "grayscale"},
+#    {"op": "contrast", "value": 60},
+#    {"op": "threshold", "value": 140}]
+# The grayscale / threshold / contrast math matches the browser image-processing
+# nodes, so a chain built from those nodes can be moved server-side unchanged.
+
+RESAMPLE_FILTERS = {
+    "nearest": Image.NEAREST,
+    "bilinear": Image.BILINEAR,
+    "bicubic": Image.BICUBIC,
+    "lanczos": Image.LANCZOS
+}
+
+def _number(step, key, default, minimum=None, maximum=None):
+    try:
+        value = float(step.get(key, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"Preprocessing step '{step.get('op')}' has a non-numeric '{key}'.")
+    if minimum is not None:
+        value = max(minimum, value)
+    if maximum is not None:
+        value = min(maximum, value)
+    return float(value)
+
+def parse_pipeline(spec) -> list[dict]:
+    """Validate a preprocessing spec and return it with defaults filled in."""
+    if not spec:
+        return []
+    if not isinstance(spec, list):
+        raise ValueError("Preprocessing pipeline must be a list of steps.")
+
+    steps = []
+    for step in spec:
+        if not isinstance(step, dict):
+            raise ValueError("Each preprocessing step must be an object with an 'op'.")
+        op = str(step.get("op", "")).lower().strip()
+        if op == "crop":
+            steps.append({
+                "op": "crop",
+                "x": int(_number(step, "x", 0, minimum=0)),
+                "y": int(_number(step, "y", 0, minimum=0)),
+                "w": int(_number(step, "w", 0, minimum=0)),
+                "h": int(_number(step, "h", 0, minimum=0))
+            })
+        elif op == "scale":
+            resample = str(step.get("resample", "bilinear")).lower()
+            if resample not in RESAMPLE_FILTERS:
+                raise ValueError(f"Unknown resample filter '{resample}'.")
+            parsed = {"op": "scale", "resample": resample}
+            if "width" in step or "height" in step:
+                parsed["width"] = int(_number(step, "width", 0, minimum=0))
+                parsed["height"] = int(_number(step, "height", 0, minimum=0))
+            else:
+                parsed["factor"] = _number(step, "factor", 1.0, minimum=0.05, maximum=8.0)
+            steps.append(parsed)
+        elif op == "grayscale":
+            steps.append({"op": "grayscale", "level": _number(step, "level", 100, 0, 100)})
+        elif op == "threshold":
+            steps.append({"op": "threshold", "value": _number(step, "value", 128, 0, 255)})
+        elif op == "contrast":
+            steps.append({"op": "contrast", "value": _number(step, "value", 0, -255, 255)})
+        else:
+            raise ValueError(f"Unknown preprocessing step '{op}'.")
+    return steps
+
+def pipeline_key(steps) -> str:
+    return json.dumps(steps, sort_keys=True, separators=(",", ":")) if steps else ""
+
+# ---------------------------------------------------------------------
+# Array Operations
+# ---------------------------------------------------------------------
+# Arrays are HxWx3 uint8 (RGB) until a grayscale/threshold step collapses them to HxW.
+
+def _channel_mean(arr):
+    if arr.ndim == 2:
+        return arr.astype(np.float32)
+    return arr.astype(np.float32).mean(axis=2)
+
+def _crop(arr, step):
+    height, width = arr.shape[:2]
+    x0 = min(step["x"], width)
+    y0 = min(step["y"], height)
+    x1 = width if step["w"] == 0 else min(width, x0 + step["w"])
+    y1 = height if step["h"] == 0 else min(height, y0 + step["h"])
+    if x1 <= x0 or y1 <= y0:
+        raise ValueError("Crop region lies outside the image.")
+    return arr[y0:y1, x0:x1]
+
+def _scale(arr, step):
+    height, width = arr.shape[:2]
+    if "factor" in step:
+        size = (max(1, round(width * step["factor"])), max(1, round(height * step["factor"])))
+    else:
+        new_w, new_h = step["width"], step["height"]
+        # A zero dimension keeps the aspect ratio of the other one.
+        if new_w == 0 and new_h == 0:
+            return arr
+        if new_w == 0:
+            new_w = max(1, round(width * new_h / height))
+        if new_h == 0:
+            new_h = max(1, round(height * new_w / width))
+        size = (new_w, new_h)
+    if size == (width, height):
+        return arr
+    return np.asarray(Image.fromarray(arr).resize(size, RESAMPLE_FILTERS[step["resample"]]))
+
+def _grayscale(arr, step):
+    if arr.ndim == 2:
+        return arr
+    mean = _channel_mean(arr)
+    alpha = step["level"] / 100.0
+    if alpha >= 1.0:
+        return np.rint(mean).astype(np.uint8)
+    blended = arr.astype(np.float32) * (1.0 - alpha) + mean[..., None] * alpha
+    return np.clip(np.rint(blended), 0, 255).astype(np.uint8)
+
+def _threshold(arr, step):
+    return np.where(_channel_mean(arr) < step["value"], 0, 255).astype(np.uint8)
+
+def _contrast(arr, step):
+    value = step["value"]
+    factor = (259.0 * (value + 255.0)) / (255.0 * (259.0 - value))
+    # Lookup table: one pass over the pixels instead of float math per pixel.
+    lut = np.clip(np.rint(factor * (np.arange(256, dtype=np.float32) - 128.0) + 128.0), 0, 255).astype(np.uint8)
+    return lut[arr]
+
+STEP_FUNCTIONS = {
+    "crop": _crop,
+    "scale": _scale,
+    "grayscale": _grayscale,
+    "threshold": _threshold,
+    "contrast": _contrast
+}
+
+def preprocess_array(arr: np.ndarray, steps) -> np.ndarray:
+    for step in steps:
+        arr = STEP_FUNCTIONS[step["op"]](arr, step)
+    return arr
+
+def preprocess_image(image: Image.Image, steps) -> Image.Image:
+    """Apply a parsed pipeline to a PIL image; returns an "L" image once it has been reduced to one channel."""
+    if not steps:
+        return image
+    arr = preprocess_array(np.asarray(image.convert("RGB")), steps)
+    return Image.fromarray(np.ascontiguousarray(arr))
+
+# ---------------------------------------------------------------------
+# Benchmark: browser node chain vs. single-decode NumPy pipeline
+# ---------------------------------------------------------------------
+# The browser chain decodes a base64 PNG, transforms pixels, then re-encodes a
+# base64 PNG at every node. This reproduces those per-node round trips in Python
+# (pixel math uses NumPy on both sides, so the gap is the repeated encode/decode)
+# and compares them with one decode followed by the NumPy pipeline.
+# Run: python image_preprocessing.py
+def _png_b64(image):
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+def _b64_png(image_b64):
+    return Image.open(io.BytesIO(base64.b64decode(image_b64))).convert("RGB")
+
+def benchmark(sizes=((300, 200), (800, 600), (1920, 1080)), iterations=20):
+    steps = parse_pipeline([
+        {"op": "grayscale"},
+        {"op": "contrast", "value": 60},
+        {"op": "threshold", "value": 140}
+    ])
+    rng = np.random.default_rng(0)
+    results = []
+    for width, height in sizes:
+        source = _png_b64(Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)))
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            value = source
+            for step in steps:
+                # One browser node: decode -> transform (kept RGB like canvas) -> encode
+                arr = np.asarray(_b64_png(value))
+                out = preprocess_array(arr, [step])
+                if out.ndim == 2:
+                    out = np.repeat(out[..., None], 3, axis=2)
+                value = _png_b64(Image.fromarray(out))
+            _b64_png(value)
+        chain_ms = (time.perf_counter() - started) * 1000 / iterations
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            preprocess_image(_b64_png(source), steps)
+        pipeline_ms = (time.perf_counter() - started) * 1000 / iterations
+
+        results.append({
+            "size": f"{width}x{height}",
+            "node_chain_ms": round(chain_ms, 2),
+            "pipeline_ms": round(pipeline_ms, 2),
+            "speedup": round(chain_ms / pipeline_ms, 1) if pipeline_ms else None
+        })
+    return results
+
+if __name__ == "__main__":
+    for row in benchmark():
+        print(f"{row['size']:>10}  node chain: {row['node_chain_ms']:>8.2f} ms  pipeline: {row['pipeline_ms']:>8.2f} ms  ({row['speedup']}x)")
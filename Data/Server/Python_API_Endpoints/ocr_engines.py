@@ -3,14 +3,19 @@
 import os
 import io
 import sys
+import time
+import json
 import base64
-import torch
-import pytesseract
-import easyocr
-import numpy as np
+import hashlib
+import threading
+import importlib.util
+from collections import OrderedDict
 import platform
 from PIL import Image
 
+# torch, easyocr, numpy and pytesseract are imported on first use of the engine
+# that needs them, so importing this module (and starting the server) stays cheap.
+
 # ---------------------------------------------------------------------
 # Configure cross-platform Tesseract path
 # ---------------------------------------------------------------------
@@ -26,79 +31,428 @@ def get_tesseract_folder():
         base_dir = os.path.dirname(os.path.abspath(__file__))
         return os.path.join(base_dir, "Tesseract-OCR")
 
-if SYSTEM == "Windows":
-    TESSERACT_FOLDER = get_tesseract_folder()
-    TESSERACT_EXE = os.path.join(TESSERACT_FOLDER, "tesseract.exe")
-    TESSDATA_DIR = os.path.join(TESSERACT_FOLDER, "tessdata")
+def _import_pytesseract():
+    import pytesseract
+
+    if SYSTEM == "Windows":
+        tesseract_folder = get_tesseract_folder()
+        tesseract_exe = os.path.join(tesseract_folder, "tesseract.exe")
+        tessdata_dir = os.path.join(tesseract_folder, "tessdata")
 
-    if not os.path.isfile(TESSERACT_EXE):
-        raise EnvironmentError(f"Missing tesseract.exe at expected path: {TESSERACT_EXE}")
+        if not os.path.isfile(tesseract_exe):
+            raise EnvironmentError(f"Missing tesseract.exe at expected path: {tesseract_exe}")
 
-    pytesseract.pytesseract.tesseract_cmd = TESSERACT_EXE
-    os.environ["TESSDATA_PREFIX"] = TESSDATA_DIR
-else:
-    # Assume Linux/macOS with system-installed Tesseract
-    pytesseract.pytesseract.tesseract_cmd = "tesseract"
+        pytesseract.pytesseract.tesseract_cmd = tesseract_exe
+        os.environ["TESSDATA_PREFIX"] = tessdata_dir
+    else:
+        # Assume Linux/macOS with system-installed Tesseract
+        pytesseract.pytesseract.tesseract_cmd = "tesseract"
+    return pytesseract
 
 # ---------------------------------------------------------------------
-# EasyOCR Global Instances
+# Lazy OCR Engine Registry
 # ---------------------------------------------------------------------
-easyocr_reader_cpu = None
-easyocr_reader_gpu = None
+# Engines are built once per (engine, backend) on first use or on warm-up, and
+# each one reports its readiness as cold -> warming -> ready (or failed).
+_engines = {}
+_engine_status = {}
+_engine_locks = {}
+_registry_lock = threading.Lock()
+_status_listener = None
+
+def _load_tesseract(backend):
+    pytesseract = _import_pytesseract()
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        raise RuntimeError("Tesseract binary not found or not available on this platform.")
+    return pytesseract
+
+class PersistentTesseract:
+    """
+    In-process Tesseract (via the optional tesserocr binding) that keeps the
+    traineddata loaded and reads raw RGB buffers, instead of spawning a
+    tesseract process and writing a temp image for every call.
+    """
+    def __init__(self):
+        import tesserocr
+        options = {"lang": "eng", "psm": tesserocr.PSM.SINGLE_BLOCK, "oem": tesserocr.OEM.LSTM_ONLY}
+        if SYSTEM == "Windows":
+            options["path"] = os.path.join(get_tesseract_folder(), "tessdata")
+        self._api = tesserocr.PyTessBaseAPI(**options)
+        # TessBaseAPI is not thread-safe; workers are single-threaded, direct callers may not be.
+        self._lock = threading.Lock()
+
+    def image_to_string(self, image: Image.Image) -> str:
+        rgb = image if image.mode == "RGB" else image.convert("RGB")
+        with self._lock:
+            self._api.SetImageBytes(rgb.tobytes(), rgb.width, rgb.height, 3, rgb.width * 3)
+            return self._api.GetUTF8Text()
+
+    def close(self):
+        self._api.End()
+
+def _load_tesseract_persistent(backend):
+    return PersistentTesseract()
 
-def initialize_ocr_engines():
-    global easyocr_reader_cpu, easyocr_reader_gpu
-    if easyocr_reader_cpu is None:
-        easyocr_reader_cpu = easyocr.Reader(['en'], gpu=False)
-    if easyocr_reader_gpu is None:
-        easyocr_reader_gpu = easyocr.Reader(['en'], gpu=torch.cuda.is_available())
+def _load_easyocr(backend):
+    import torch
+    import easyocr
+    return easyocr.Reader(['en'], gpu=(backend == "gpu" and torch.cuda.is_available()))
+
+ENGINE_LOADERS = {
+    "tesseract": _load_tesseract,
+    "tesseract_persistent": _load_tesseract_persistent,
+    "easyocr": _load_easyocr
+}
+
+def engine_available(engine: str, backend: str = "cpu") -> bool:
+    """Whether an engine can be loaded here at all: EasyOCR needs easyocr + torch, gpu needs CUDA."""
+    if engine != "easyocr":
+        return True
+    if importlib.util.find_spec("easyocr") is None or importlib.util.find_spec("torch") is None:
+        return False
+    if backend == "gpu":
+        import torch
+        return torch.cuda.is_available()
+    return True
+
+def set_engine_status_listener(listener):
+    """Register a callable(engine_key, status) invoked whenever an engine changes state."""
+    global _status_listener
+    _status_listener = listener
+
+def _set_engine_status(key, **status):
+    _engine_status[key] = status
+    if _status_listener is not None:
+        try:
+            _status_listener(key, dict(status))
+        except Exception:
+            pass
+
+def engine_key(engine: str, backend: str) -> str:
+    return f"{engine}:{backend}"
+
+def load_ocr_engine(engine: str, backend: str = "cpu"):
+    """Return the engine instance for (engine, backend), building it on first use."""
+    engine = engine.lower().strip()
+    backend = backend.lower().strip()
+    if engine == "tesseractocr":
+        engine = "tesseract"
+    if engine.startswith("tesseract"):
+        # Tesseract has no GPU path; share one instance for every backend.
+        backend = "cpu"
+    key = engine_key(engine, backend)
+    instance = _engines.get(key)
+    if instance is not None:
+        return instance
+
+    loader = ENGINE_LOADERS.get(engine)
+    if loader is None:
+        raise ValueError(f"OCR engine '{engine}' not recognized.")
+
+    with _registry_lock:
+        lock = _engine_locks.setdefault(key, threading.Lock())
+    with lock:
+        instance = _engines.get(key)
+        if instance is not None:
+            return instance
+        _set_engine_status(key, state="warming", load_ms=None, error=None)
+        started = time.perf_counter()
+        try:
+            instance = loader(backend)
+        except Exception as e:
+            _set_engine_status(key, state="failed", load_ms=None, error=str(e))
+            raise
+        _engines[key] = instance
+        _set_engine_status(key, state="ready", load_ms=round((time.perf_counter() - started) * 1000, 1), error=None)
+        return instance
+
+def _persistent_tesseract():
+    # Only try to build the in-process engine once; after a failure (usually tesserocr
+    # not being installed) callers go straight to the subprocess fallback.
+    key = engine_key("tesseract_persistent", "cpu")
+    if _engine_status.get(key, {}).get("state") == "failed":
+        return None
+    try:
+        return load_ocr_engine("tesseract_persistent")
+    except Exception as e:
+        print(f"[OCR] Persistent Tesseract unavailable ({e}); falling back to the tesseract subprocess engine.")
+        return None
+
+def ocr_engine_status() -> dict:
+    status = {engine_key(engine, "cpu"): {"state": "cold", "load_ms": None, "error": None} for engine in ENGINE_LOADERS}
+    status.update({key: dict(value) for key, value in _engine_status.items()})
+    return status
+
+# ---------------------------------------------------------------------
+# OCR Result Cache (content-addressed on the encoded image)
+# ---------------------------------------------------------------------
+# The key is a hash of the received PNG / JPEG bytes plus engine, backend and pipeline,
+# so a lookup never decodes pixels; an unchanged frame encodes to the same bytes.
+OCR_CACHE_MAX_ENTRIES = int(os.environ.get("BOREALIS_OCR_CACHE_ENTRIES", 512))
+OCR_CACHE_MAX_BYTES = int(os.environ.get("BOREALIS_OCR_CACHE_BYTES", 4 * 1024 * 1024))
+
+TESSERACT_CONFIG = "--psm 6 --oem 1"
+EASYOCR_LINE_THRESHOLD = 10
+
+class OCRResultCache:
+    """LRU cache of OCR text lines bounded by entry count and approximate byte size."""
+    def __init__(self, max_entries=OCR_CACHE_MAX_ENTRIES, max_bytes=OCR_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_size(key, lines):
+        # Rough footprint: key + encoded text + per-line list/str overhead.
+        return len(key) + sum(len(line.encode("utf-8")) + 56 for line in lines) + 64
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def put(self, key, lines):
+        size = self._entry_size(key, lines)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (list(lines), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+ocr_result_cache = OCRResultCache()
+
+def ocr_cache_key(image_bytes: bytes, engine: str, backend: str, preprocess=None) -> str:
+    if engine == "easyocr":
+        config = f"line_threshold={EASYOCR_LINE_THRESHOLD}"
+    else:
+        config = TESSERACT_CONFIG
+    # A hit skips decoding, the preprocessing pipeline and the engine.
+    pipeline = json.dumps(preprocess, sort_keys=True, separators=(",", ":")) if preprocess else ""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{engine}|{backend}|{config}|{pipeline}|".encode("utf-8"))
+    digest.update(image_bytes)
+    return digest.hexdigest()
 
 # ---------------------------------------------------------------------
 # Main OCR Handler
 # ---------------------------------------------------------------------
-def run_ocr_on_base64(image_b64: str, engine: str = "tesseract", backend: str = "cpu") -> list[str]:
+def decode_base64_image(image_b64: str) -> Image.Image:
     if not image_b64:
         raise ValueError("No base64 image data provided.")
 
     try:
         raw_bytes = base64.b64decode(image_b64)
-        image = Image.open(io.BytesIO(raw_bytes)).convert("RGB")
+        return Image.open(io.BytesIO(raw_bytes)).convert("RGB")
     except Exception as e:
         raise ValueError(f"Invalid base64 image input: {e}")
 
+def encoded_image_bytes(data) -> bytes:
+    """
+    Raw encoded bytes of an image given as bytes or a base64 string. Only the header is
+    parsed (to reject non-images early); the pixels are decoded later, by the OCR worker.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        raw_bytes = bytes(data)
+    else:
+        if not data:
+            raise ValueError("No base64 image data provided.")
+        try:
+            raw_bytes = base64.b64decode(data)
+        except Exception as e:
+            raise ValueError(f"Invalid base64 image input: {e}")
+    if not raw_bytes:
+        raise ValueError("No image data provided.")
+    try:
+        Image.open(io.BytesIO(raw_bytes))
+    except Exception as e:
+        raise ValueError(f"Invalid image input: {e}")
+    return raw_bytes
+
+def decode_image(data) -> Image.Image:
+    """Decode raw image bytes (binary frames / uploads) or a base64 string."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        if not data:
+            raise ValueError("No image data provided.")
+        try:
+            return Image.open(io.BytesIO(data)).convert("RGB")
+        except Exception as e:
+            raise ValueError(f"Invalid image input: {e}")
+    return decode_base64_image(data)
+
+def parse_preprocess(spec) -> list[dict]:
+    """Validate a preprocessing pipeline spec (see image_preprocessing.py); raises ValueError."""
+    if not spec:
+        return []
+    from Python_API_Endpoints.image_preprocessing import parse_pipeline
+    return parse_pipeline(spec)
+
+def normalize_ocr_engine(engine):
+    engine = (engine or "tesseract").lower().strip()
+    if engine in ["tesseractocr", "tesseract"]:
+        return "tesseract"
+    if engine in ["tesseractocr-persistent", "tesseract-persistent", "tesseract_persistent", "tesserocr"]:
+        return "tesseract_persistent"
+    if engine == "easyocr":
+        return "easyocr"
+    return None
+
+def parse_ocr_options(payload):
+    """
+    Returns (engine, backend, use_cache, preprocess, error). `error` is a message for a
+    400 response when the engine or preprocessing pipeline is invalid.
+    """
+    engine = normalize_ocr_engine(payload.get("engine", "tesseract"))
+    backend = payload.get("backend", "cpu").lower().strip()
+    use_cache = payload.get("cache", True) not in [False, "false", "False", 0]
+    if engine is None:
+        return None, backend, use_cache, None, f"OCR engine '{payload.get('engine')}' not recognized."
+    try:
+        preprocess = parse_preprocess(payload.get("preprocess"))
+    except ValueError as e:
+        return engine, backend, use_cache, None, str(e)
+    return engine, backend, use_cache, preprocess, None
+
+def apply_preprocessing(image: Image.Image, steps) -> Image.Image:
+    if not steps:
+        return image
+    from Python_API_Endpoints.image_preprocessing import preprocess_image
+    return preprocess_image(image, steps)
+
+def _group_easyocr_lines(result) -> str:
+    # Group by Y position (line-aware sorting)
+    result = sorted(result, key=lambda r: r[0][0][1])
+    lines = []
+    current_line = []
+    last_y = None
+    line_threshold = EASYOCR_LINE_THRESHOLD
+
+    for (bbox, text, _) in result:
+        y = bbox[0][1]
+        if last_y is None or abs(y - last_y) < line_threshold:
+            current_line.append(text)
+        else:
+            lines.append(" ".join(current_line))
+            current_line = [text]
+        last_y = y
+
+    if current_line:
+        lines.append(" ".join(current_line))
+    return "\n".join(lines)
+
+def _split_lines(text: str) -> list[str]:
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+def run_ocr_on_image(image: Image.Image, engine: str = "tesseract", backend: str = "cpu") -> list[str]:
     engine = engine.lower().strip()
     backend = backend.lower().strip()
 
+    if engine == "tesseract_persistent":
+        api = _persistent_tesseract()
+        if api is not None:
+            return _split_lines(api.image_to_string(image))
+        engine = "tesseract"
+
     if engine in ["tesseract", "tesseractocr"]:
+        pytesseract = load_ocr_engine("tesseract", backend)
         try:
-            text = pytesseract.image_to_string(image, config="--psm 6 --oem 1")
+            text = pytesseract.image_to_string(image, config=TESSERACT_CONFIG)
         except pytesseract.TesseractNotFoundError:
             raise RuntimeError("Tesseract binary not found or not available on this platform.")
     elif engine == "easyocr":
-        initialize_ocr_engines()
-        reader = easyocr_reader_gpu if backend == "gpu" else easyocr_reader_cpu
+        import numpy as np
+        reader = load_ocr_engine("easyocr", backend)
         result = reader.readtext(np.array(image), detail=1)
-
-        # Group by Y position (line-aware sorting)
-        result = sorted(result, key=lambda r: r[0][0][1])
-        lines = []
-        current_line = []
-        last_y = None
-        line_threshold = 10
-
-        for (bbox, text, _) in result:
-            y = bbox[0][1]
-            if last_y is None or abs(y - last_y) < line_threshold:
-                current_line.append(text)
-            else:
-                lines.append(" ".join(current_line))
-                current_line = [text]
-            last_y = y
-
-        if current_line:
-            lines.append(" ".join(current_line))
-        text = "\n".join(lines)
+        text = _group_easyocr_lines(result)
     else:
         raise ValueError(f"OCR engine '{engine}' not recognized.")
 
-    return [line.strip() for line in text.splitlines() if line.strip()]
+    return _split_lines(text)
+
+def run_ocr_on_images(images: list[Image.Image], engine: str = "tesseract", backend: str = "cpu") -> list[list[str]]:
+    """
+    OCR several images in one call. EasyOCR runs same-sized images through the
+    reader's batched path; other engines fall back to one image at a time.
+    """
+    engine = engine.lower().strip()
+    backend = backend.lower().strip()
+    if engine != "easyocr" or len(images) < 2:
+        return [run_ocr_on_image(image, engine=engine, backend=backend) for image in images]
+
+    import numpy as np
+    reader = load_ocr_engine("easyocr", backend)
+
+    # readtext_batched needs a common input size, so batch per distinct region size.
+    groups = {}
+    for index, image in enumerate(images):
+        groups.setdefault(image.size, []).append(index)
+
+    results = [None] * len(images)
+    for (width, height), indexes in groups.items():
+        if len(indexes) == 1:
+            results[indexes[0]] = run_ocr_on_image(images[indexes[0]], engine=engine, backend=backend)
+            continue
+        batch = reader.readtext_batched(
+            [np.array(images[i]) for i in indexes],
+            n_width=width,
+            n_height=height,
+            batch_size=len(indexes),
+            detail=1
+        )
+        for i, result in zip(indexes, batch):
+            results[i] = _split_lines(_group_easyocr_lines(result))
+    return results
+
+def run_ocr_on_base64(image_b64: str, engine: str = "tesseract", backend: str = "cpu", use_cache: bool = True, preprocess=None) -> list[str]:
+    """
+    Decode, optionally preprocess (crop / scale / grayscale / threshold / contrast,
+    see image_preprocessing.py) and OCR a base64 image in a single decode.
+    """
+    steps = parse_preprocess(preprocess)
+    raw_bytes = encoded_image_bytes(image_b64)
+    if not use_cache:
+        return run_ocr_on_image(apply_preprocessing(decode_image(raw_bytes), steps), engine=engine, backend=backend)
+
+    key = ocr_cache_key(raw_bytes, engine.lower().strip(), backend.lower().strip(), steps)
+    lines = ocr_result_cache.get(key)
+    if lines is None:
+        lines = run_ocr_on_image(apply_preprocessing(decode_image(raw_bytes), steps), engine=engine, backend=backend)
+        ocr_result_cache.put(key, lines)
+    return lines
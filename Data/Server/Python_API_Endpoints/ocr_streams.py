@@ -0,0 +1,198 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/ocr_streams.py
+
+import json
+import time
+import hashlib
+import threading
+
+from Python_API_Endpoints.ocr_workers import OCRQueueFull
+
+# ---------------------------------------------------------------------
+# Server-Side OCR on Agent Screenshot Streams
+# ---------------------------------------------------------------------
+# A stream job is attached to an "agent_id:node_id" screenshot stream and is fed
+# every new frame as the server receives it from the agent. While a frame is being
+# OCR'd, newer frames replace each other in a single pending slot, so a slow engine
+# always works on the most recent frame instead of building up a backlog.
+# Every attach of the same job (e.g. one OCR node open in several tabs) holds a
+# reference, and the job only stops once each of them has detached again.
+
+def preprocess_digest(preprocess):
+    """Short stable digest of a parsed preprocessing pipeline, part of the job id."""
+    pipeline = json.dumps(preprocess or [], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(pipeline.encode("utf-8")).hexdigest()[:12]
+
+class OCRStreamJob:
+    def __init__(self, agent_id, node_id, engine, backend, use_cache=True, preprocess=None):
+        self.agent_id = agent_id
+        self.node_id = node_id
+        self.engine = engine
+        self.backend = backend
+        self.use_cache = use_cache
+        self.preprocess = preprocess or []
+        # Nodes with different pipelines on one stream are different jobs.
+        self.job_id = f"{agent_id}:{node_id}:{engine}:{backend}:{preprocess_digest(self.preprocess)}"
+        self.references = 0
+        self.running = False
+        self.pending = None
+        self.frames_seen = 0
+        self.frames_processed = 0
+        self.frames_coalesced = 0
+        self.frames_rejected = 0
+        self.last_lines = None
+        self.last_frame_timestamp = None
+        self.last_ocr_ms = None
+        self.last_error = None
+        self.created = time.time()
+
+    @property
+    def stream_key(self):
+        return f"{self.agent_id}:{self.node_id}"
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "agent_id": self.agent_id,
+            "node_id": self.node_id,
+            "engine": self.engine,
+            "backend": self.backend,
+            "cache": self.use_cache,
+            "preprocess": self.preprocess,
+            "references": self.references,
+            "running": self.running,
+            "frames_seen": self.frames_seen,
+            "frames_processed": self.frames_processed,
+            "frames_coalesced": self.frames_coalesced,
+            "frames_rejected": self.frames_rejected,
+            "last_lines": self.last_lines,
+            "last_frame_timestamp": self.last_frame_timestamp,
+            "last_ocr_ms": self.last_ocr_ms,
+            "last_error": self.last_error,
+            "created": self.created
+        }
+
+class OCRStreamManager:
+    """
+    Runs OCR jobs against agent screenshot streams. `spawn(fn, *args)` starts a
+    background task and `emit(payload)` publishes an "ocr_result" event; both are
+    supplied by the server so this module stays independent of Flask-SocketIO.
+    """
+    def __init__(self, ocr_pool, spawn, emit):
+        self.ocr_pool = ocr_pool
+        self._spawn = spawn
+        self._emit = emit
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._by_stream = {}
+
+    def attach(self, agent_id, node_id, engine, backend="cpu", use_cache=True, preprocess=None):
+        job = OCRStreamJob(agent_id, node_id, engine, backend, use_cache, preprocess)
+        with self._lock:
+            existing = self._jobs.get(job.job_id)
+            if existing is not None:
+                existing.use_cache = use_cache
+                existing.references += 1
+                return existing
+            job.references = 1
+            self._jobs[job.job_id] = job
+            self._by_stream.setdefault(job.stream_key, []).append(job)
+        return job
+
+    def detach(self, job_id):
+        """Drop one reference; returns the references left, or None if there is no such job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.references -= 1
+            if job.references > 0:
+                return job.references
+            del self._jobs[job_id]
+            jobs = self._by_stream.get(job.stream_key, [])
+            if job in jobs:
+                jobs.remove(job)
+            if not jobs:
+                self._by_stream.pop(job.stream_key, None)
+            return 0
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def jobs(self):
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def on_frame(self, agent_id, node_id, frame, timestamp=None):
+        """Feed a newly received frame to every job attached to its stream."""
+        timestamp = timestamp or time.time()
+        with self._lock:
+            jobs = list(self._by_stream.get(f"{agent_id}:{node_id}", ()))
+            to_start = [job for job in jobs if self._feed_locked(job, frame, timestamp)]
+        for job in to_start:
+            self._spawn(self._run_job, job, frame, timestamp)
+
+    def prime(self, job, frame, timestamp=None):
+        """Feed the stream's current frame to one job that has not seen a frame yet (on attach)."""
+        timestamp = timestamp or time.time()
+        with self._lock:
+            if job.frames_seen or job.job_id not in self._jobs:
+                return
+            start = self._feed_locked(job, frame, timestamp)
+        if start:
+            self._spawn(self._run_job, job, frame, timestamp)
+
+    def _feed_locked(self, job, frame, timestamp):
+        # Returns True when the job is idle and has to be started with this frame.
+        job.frames_seen += 1
+        if job.running:
+            if job.pending is not None:
+                job.frames_coalesced += 1
+            job.pending = (frame, timestamp)
+            return False
+        job.running = True
+        return True
+
+    def _run_job(self, job, frame, timestamp):
+        while True:
+            started = time.perf_counter()
+            lines = None
+            try:
+                lines = self.ocr_pool.run(
+                    frame,
+                    engine=job.engine,
+                    backend=job.backend,
+                    use_cache=job.use_cache,
+                    preprocess=job.preprocess
+                )
+                job.last_error = None
+            except OCRQueueFull:
+                job.frames_rejected += 1
+            except Exception as e:
+                job.last_error = str(e)
+
+            if lines is not None:
+                job.frames_processed += 1
+                job.last_ocr_ms = round((time.perf_counter() - started) * 1000, 2)
+                job.last_frame_timestamp = timestamp
+                # Only text that actually changed is pushed to clients.
+                if lines != job.last_lines:
+                    job.last_lines = lines
+                    self._emit({
+                        "job_id": job.job_id,
+                        "agent_id": job.agent_id,
+                        "node_id": job.node_id,
+                        "engine": job.engine,
+                        "backend": job.backend,
+                        "lines": lines,
+                        "timestamp": timestamp,
+                        "ocr_ms": job.last_ocr_ms
+                    })
+
+            with self._lock:
+                pending, job.pending = job.pending, None
+                if pending is None or job.job_id not in self._jobs:
+                    job.running = False
+                    return
+            frame, timestamp = pending
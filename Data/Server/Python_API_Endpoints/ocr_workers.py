@@ -0,0 +1,438 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/ocr_workers.py
+
+import os
+import sys
+import json
+import math
+import time
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from Python_API_Endpoints import ocr_engines
+
+# ---------------------------------------------------------------------
+# OCR Worker Pool Configuration (overridable via environment variables)
+# ---------------------------------------------------------------------
+# BOREALIS_OCR_WORKERS:      Number of OCR worker processes.
+# BOREALIS_OCR_QUEUE_SIZE:   Jobs allowed to wait for a free worker before new jobs are rejected.
+# BOREALIS_OCR_TIMEOUT:      Seconds a request waits for its OCR result.
+# BOREALIS_OCR_WARM_ENGINES: Comma-separated "engine:backend" pairs each worker loads at startup
+#                            (default "tesseract:cpu"; opt in with e.g. "tesseract:cpu,easyocr:cpu").
+#                            A missing backend means cpu, so a GPU reader is only built when a pair
+#                            names it; pairs this machine cannot run (EasyOCR not installed, no CUDA)
+#                            are skipped. Empty to load nothing up front.
+# BOREALIS_OCR_WARMUP:       "1" (default) to start the workers in the background once the server is
+#                            listening, "0" to start them on the first OCR request instead.
+# BOREALIS_OCR_BATCH_WINDOW_MS: How long EasyOCR requests wait for others to share a batch.
+# BOREALIS_OCR_BATCH_SIZE:   Upper bound on images per micro-batch.
+OCR_WORKERS = max(1, int(os.environ.get("BOREALIS_OCR_WORKERS", max(1, (os.cpu_count() or 2) // 2))))
+OCR_QUEUE_SIZE = max(0, int(os.environ.get("BOREALIS_OCR_QUEUE_SIZE", OCR_WORKERS * 4)))
+OCR_TIMEOUT = float(os.environ.get("BOREALIS_OCR_TIMEOUT", 30))
+OCR_BATCH_WINDOW_MS = float(os.environ.get("BOREALIS_OCR_BATCH_WINDOW_MS", 5))
+OCR_BATCH_SIZE = max(1, int(os.environ.get("BOREALIS_OCR_BATCH_SIZE", 16)))
+OCR_WARM_ENGINES = [
+    item.strip() for item in os.environ.get("BOREALIS_OCR_WARM_ENGINES", "tesseract:cpu").split(",") if item.strip()
+]
+OCR_WARMUP = os.environ.get("BOREALIS_OCR_WARMUP", "1").strip().lower() in ["1", "true", "yes"]
+
+class OCRQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is at capacity."""
+    def __init__(self, retry_after):
+        super().__init__(f"OCR queue is full, retry in {retry_after}s.")
+        self.retry_after = retry_after
+
+# ---------------------------------------------------------------------
+# Worker Process Side
+# ---------------------------------------------------------------------
+def _parse_engine_spec(spec):
+    engine, _, backend = spec.partition(":")
+    return engine.lower().strip(), (backend or "cpu").lower().strip()
+
+def _worker_init(warm_engines, status_queue):
+    # Runs once per worker process so each worker keeps its own warm engine instance.
+    # Engine state changes are forwarded to the server process for /health.
+    pid = os.getpid()
+    ocr_engines.set_engine_status_listener(lambda key, status: status_queue.put((pid, key, status)))
+    status_queue.put((pid, None, None))
+    for spec in warm_engines:
+        engine, backend = _parse_engine_spec(spec)
+        if not ocr_engines.engine_available(engine, backend):
+            print(f"[OCR Worker {pid}] Not warming {engine}:{backend}: unavailable on this machine.")
+            continue
+        try:
+            ocr_engines.load_ocr_engine(engine, backend)
+        except Exception as e:
+            print(f"[OCR Worker {pid}] Failed to warm {engine}:{backend}: {e}")
+
+def _ping_job():
+    # Only used to make the executor start its workers; carries no timing data.
+    return None
+
+def _run_ocr_job(image_bytes, engine, backend, submitted_at, preprocess=None):
+    # Receives the encoded image (a few KB to pickle instead of the decoded pixels) and
+    # decodes it here, off the server's event loop.
+    started_at = time.time()
+    image = ocr_engines.apply_preprocessing(ocr_engines.decode_image(image_bytes), preprocess)
+    lines = ocr_engines.run_ocr_on_image(image, engine=engine, backend=backend)
+    return {
+        "lines": lines,
+        "wait_ms": max(0.0, (started_at - submitted_at) * 1000),
+        "run_ms": (time.time() - started_at) * 1000
+    }
+
+def _run_ocr_batch_job(images, engine, backend, submitted_at, preprocess=None):
+    started_at = time.time()
+    images = [ocr_engines.apply_preprocessing(ocr_engines.decode_image(data), preprocess) for data in images]
+    results = ocr_engines.run_ocr_on_images(images, engine=engine, backend=backend)
+    return {
+        "results": results,
+        "wait_ms": max(0.0, (started_at - submitted_at) * 1000),
+        "run_ms": (time.time() - started_at) * 1000
+    }
+
+# ---------------------------------------------------------------------
+# Worker Process Spawning
+# ---------------------------------------------------------------------
+# A spawned child normally re-runs the parent's __main__ (server.py: Flask app, state
+# backends, stores) before it unpickles its target. Workers only need this module, so
+# the main module is hidden while a worker starts, which is multiprocessing's "leave it
+# alone" path (as for an interactive parent); sys.path is still passed on.
+class _WorkerProcess(multiprocessing.get_context("spawn").Process):
+    def start(self):
+        main = sys.modules.get("__main__")
+        main_file = getattr(main, "__file__", None)
+        if main_file is None:
+            return super().start()
+        main_spec = getattr(main, "__spec__", None)
+        del main.__file__
+        main.__spec__ = None
+        try:
+            return super().start()
+        finally:
+            main.__file__ = main_file
+            main.__spec__ = main_spec
+
+class _WorkerContext(type(multiprocessing.get_context("spawn"))):
+    Process = _WorkerProcess
+
+# ---------------------------------------------------------------------
+# Server Process Side
+# ---------------------------------------------------------------------
+class OCRWorkerPool:
+    """
+    Bounded pool of OCR worker processes. Jobs beyond workers + queue_size are
+    rejected with OCRQueueFull instead of piling up behind the busy workers.
+    """
+    def __init__(self, workers=OCR_WORKERS, queue_size=OCR_QUEUE_SIZE, timeout=OCR_TIMEOUT, warm_engines=None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.warm_engines = list(OCR_WARM_ENGINES if warm_engines is None else warm_engines)
+        self._executor = None
+        self._status_queue = None
+        self._worker_status = {}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._total_run_ms = 0.0
+        self.batcher = OCRMicroBatcher(self)
+
+    def _ensure_executor(self):
+        # Spawned lazily so merely importing the server never forks workers.
+        if self._executor is None:
+            context = _WorkerContext()
+            self._status_queue = context.Queue()
+            self._worker_status = {}
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_worker_init,
+                initargs=(self.warm_engines, self._status_queue)
+            )
+        return self._executor
+
+    def _retry_after(self):
+        avg_run_s = (self._total_run_ms / self._completed / 1000) if self._completed else 1.0
+        backlog = max(1, self._in_flight - self.workers)
+        return max(1, math.ceil(avg_run_s * backlog / self.workers))
+
+    def _on_done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+                return
+            result = future.result()
+            if result is None:
+                return
+            self._completed += 1
+            self._total_wait_ms += result["wait_ms"]
+            self._max_wait_ms = max(self._max_wait_ms, result["wait_ms"])
+            self._total_run_ms += result["run_ms"]
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_size:
+                self._rejected += 1
+                raise OCRQueueFull(self._retry_after())
+            try:
+                future = self._ensure_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM inside torch); start over with a fresh pool.
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                future = self._ensure_executor().submit(fn, *args)
+            self._in_flight += 1
+            self._submitted += 1
+        future.add_done_callback(self._on_done)
+        return future
+
+    def warm_up(self):
+        """Start every worker now (loading BOREALIS_OCR_WARM_ENGINES) instead of on the first request."""
+        futures = []
+        for _ in range(self.workers):
+            try:
+                futures.append(self.submit(_ping_job))
+            except Exception as e:
+                print(f"[OCR] Warm-up failed: {e}")
+                break
+        for future in futures:
+            try:
+                future.result(timeout=max(self.timeout, 300))
+            except Exception as e:
+                print(f"[OCR] Warm-up failed: {e}")
+
+    def engine_status(self):
+        """
+        Per engine:backend readiness across workers. An engine is "ready" only once
+        every started worker has loaded it; until then it reports "warming".
+        """
+        with self._lock:
+            queue = self._status_queue
+            while queue is not None:
+                try:
+                    pid, key, status = queue.get_nowait()
+                except Exception:
+                    break
+                worker = self._worker_status.setdefault(pid, {})
+                if key is not None:
+                    worker[key] = status
+            workers = {pid: dict(engines) for pid, engines in self._worker_status.items()}
+
+        engines = {}
+        for key, status in ocr_engines.ocr_engine_status().items():
+            if status["state"] == "cold":
+                engines[key] = {"state": "cold", "load_ms": None, "workers": {}}
+        for pid_status in workers.values():
+            for key, status in pid_status.items():
+                entry = engines.setdefault(key, {"state": "cold", "load_ms": None, "workers": {}})
+                entry["workers"][status["state"]] = entry["workers"].get(status["state"], 0) + 1
+                if status.get("load_ms") is not None:
+                    entry["load_ms"] = max(entry["load_ms"] or 0, status["load_ms"])
+                if status.get("error"):
+                    entry["error"] = status["error"]
+
+        for entry in engines.values():
+            counts = entry["workers"]
+            if counts and counts.get("ready", 0) == len(workers):
+                entry["state"] = "ready"
+            elif counts.get("warming") or counts.get("ready"):
+                entry["state"] = "warming"
+            elif counts.get("failed"):
+                entry["state"] = "failed"
+        return {"workers_started": len(workers), "engines": engines}
+
+    def _dispatch(self, images, engine, backend, preprocess):
+        # EasyOCR benefits from batched inference; Tesseract is spread across workers instead.
+        if engine == "easyocr":
+            return self.batcher.submit(images, engine, backend, preprocess)
+
+        submitted_at = time.time()
+        futures = []
+        for image in images:
+            try:
+                futures.append(self.submit(_run_ocr_job, image, engine, backend, submitted_at, preprocess))
+            except OCRQueueFull as e:
+                rejected = Future()
+                rejected.set_exception(e)
+                futures.append(rejected)
+        return futures
+
+    def _wait_lines(self, future):
+        result = future.result(timeout=self.timeout)
+        return result["lines"] if isinstance(result, dict) else result
+
+    def run(self, image, engine="tesseract", backend="cpu", use_cache=True, preprocess=None):
+        """
+        Run a single OCR job on the pool and return its text lines. Unchanged frames
+        are answered from the result cache without touching a worker.
+        """
+        return self.run_batch([image], engine=engine, backend=backend, use_cache=use_cache,
+                              preprocess=preprocess, raise_errors=True)[0]
+
+    def run_batch(self, images, engine="tesseract", backend="cpu", use_cache=True, preprocess=None, raise_errors=False):
+        """
+        OCR a list of images (raw bytes or base64 strings). Returns one entry per image: its text lines, or
+        the exception raised for that image when raise_errors is False. `preprocess`
+        is a pipeline spec applied by the worker before OCR.
+        """
+        preprocess = ocr_engines.parse_preprocess(preprocess)
+        results = [None] * len(images)
+        pending = []
+        for index, data in enumerate(images):
+            try:
+                image_bytes = ocr_engines.encoded_image_bytes(data)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                results[index] = e
+                continue
+            key = ocr_engines.ocr_cache_key(image_bytes, engine, backend, preprocess) if use_cache else None
+            lines = ocr_engines.ocr_result_cache.get(key) if key else None
+            if lines is not None:
+                results[index] = lines
+            else:
+                pending.append((index, image_bytes, key))
+
+        if pending:
+            # Workers get the encoded bytes and decode them themselves.
+            futures = self._dispatch([image_bytes for _, image_bytes, _ in pending], engine, backend, preprocess)
+            for (index, _, key), future in zip(pending, futures):
+                try:
+                    lines = self._wait_lines(future)
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    results[index] = e
+                    continue
+                if key is not None:
+                    ocr_engines.ocr_result_cache.put(key, lines)
+                results[index] = lines
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self._in_flight,
+                "running": min(self._in_flight, self.workers),
+                "queued": max(0, self._in_flight - self.workers),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait_ms / self._completed, 2) if self._completed else 0.0,
+                "max_wait_ms": round(self._max_wait_ms, 2),
+                "avg_run_ms": round(self._total_run_ms / self._completed, 2) if self._completed else 0.0,
+                "cache": ocr_engines.ocr_result_cache.stats(),
+                "batching": self.batcher.stats()
+            }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._status_queue = None
+            self._worker_status = {}
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+class OCRMicroBatcher:
+    """
+    Collects EasyOCR images from concurrent requests for a short window and sends
+    them to a worker as one batch job, so the reader runs them through its batched path.
+    """
+    def __init__(self, pool, window_ms=OCR_BATCH_WINDOW_MS, max_batch=OCR_BATCH_SIZE):
+        self.pool = pool
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._open = {}
+        self._batches = 0
+        self._images = 0
+        self._max_size = 0
+        self._total_latency_ms = 0.0
+        self._recent = deque(maxlen=50)
+
+    def submit(self, images, engine, backend, preprocess=None):
+        """Queue images for the next (engine, backend, preprocess) batch; returns one Future per image."""
+        key = (engine, backend, json.dumps(preprocess, sort_keys=True) if preprocess else "")
+        futures = []
+        ready = []
+        with self._lock:
+            for image in images:
+                batch = self._open.get(key)
+                if batch is None:
+                    batch = self._open[key] = []
+                    timer = threading.Timer(self.window, self._flush_expired, args=(key, batch))
+                    timer.daemon = True
+                    timer.start()
+                future = Future()
+                batch.append((image, future))
+                futures.append(future)
+                if len(batch) >= self.max_batch:
+                    ready.append(self._open.pop(key))
+        for batch in ready:
+            self._dispatch(key, batch)
+        return futures
+
+    def _flush_expired(self, key, batch):
+        with self._lock:
+            # The batch may already have been sent early because it filled up.
+            if self._open.get(key) is not batch:
+                return
+            del self._open[key]
+        self._dispatch(key, batch)
+
+    def _dispatch(self, key, batch):
+        engine, backend, pipeline = key
+        preprocess = json.loads(pipeline) if pipeline else None
+        images = [image for image, _ in batch]
+        started = time.time()
+        try:
+            job = self.pool.submit(_run_ocr_batch_job, images, engine, backend, started, preprocess)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        def distribute(job_future):
+            error = job_future.exception()
+            if error is None:
+                for (_, future), lines in zip(batch, job_future.result()["results"]):
+                    future.set_result(lines)
+            else:
+                for _, future in batch:
+                    future.set_exception(error)
+            self._record(len(batch), (time.time() - started) * 1000)
+
+        job.add_done_callback(distribute)
+
+    def _record(self, size, latency_ms):
+        with self._lock:
+            self._batches += 1
+            self._images += size
+            self._max_size = max(self._max_size, size)
+            self._total_latency_ms += latency_ms
+            self._recent.append({"size": size, "latency_ms": round(latency_ms, 2)})
+
+    def stats(self):
+        with self._lock:
+            return {
+                "window_ms": self.window * 1000,
+                "max_batch": self.max_batch,
+                "batches": self._batches,
+                "images": self._images,
+                "avg_batch_size": round(self._images / self._batches, 2) if self._batches else 0.0,
+                "max_batch_size": self._max_size,
+                "avg_batch_latency_ms": round(self._total_latency_ms / self._batches, 2) if self._batches else 0.0,
+                "recent_batches": list(self._recent)
+            }
@@ -0,0 +1,406 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/shared_state.py
+
+import os
+import copy
+import time
+import json
+import pickle
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+
+import socketio
+
+# ---------------------------------------------------------------------
+# Shared Server State Configuration (overridable via environment variables)
+# ---------------------------------------------------------------------
+# BOREALIS_STATE_BACKEND:  Where agent / config / frame state lives:
+#                            "memory"                  one process (default)
+#                            "sqlite:///<path>.db"     every worker process on this machine
+#                            "redis://host:6379/0"     every worker on any machine (needs redis)
+# BOREALIS_MESSAGE_QUEUE:  How workers relay Socket.IO emits to each other's clients:
+#                            "sqlite:///<path>.db"     local stand-in, polled by each worker
+#                            "redis://...", "amqp://...", "kafka://...", "zmq+tcp://..."
+#                                                      handled by Flask-SocketIO itself
+# BOREALIS_WORKERS:        Worker processes sharing the listening port (see server.py).
+STATE_BACKEND_URL = os.environ.get("BOREALIS_STATE_BACKEND", "memory")
+MESSAGE_QUEUE_URL = os.environ.get("BOREALIS_MESSAGE_QUEUE", "")
+SERVER_WORKERS = int(os.environ.get("BOREALIS_WORKERS", 1))
+
+SQLITE_PREFIX = "sqlite:///"
+
+def run_inline(fn, *args):
+    return fn(*args)
+
+def thread_lock():
+    # SQLite calls that run in a thread pool (run=eventlet.tpool.execute) need a lock that
+    # works across OS threads; eventlet's monkey-patched threading.Lock only works across
+    # green threads.
+    try:
+        from eventlet.patcher import original
+        return original("threading").Lock()
+    except ImportError:
+        return threading.Lock()
+
+# ---------------------------------------------------------------------
+# State Backends
+# ---------------------------------------------------------------------
+# Every backend stores bytes under (namespace, key) and has an atomic counter.
+# mapping(namespace) is what the server uses: a plain dict for MemoryBackend (nothing
+# changes for a single process), a JSON-encoded SharedMapping for shared backends.
+# Values read from a shared mapping are copies: mutate, then assign them back.
+# Entries that several workers change use modify(), an atomic read-modify-write built on
+# the backend's compare_and_set(), so one worker's update never reverts another's.
+# mapping(namespace, ttl=seconds) makes each write expire: Redis drops the entry itself,
+# SQLite deletes it when the owner calls expire() on its cleanup path. Memory mappings
+# ignore ttl; the single process that owns them expires entries itself.
+
+DELETE = object()  # Returned by a modify() change function to remove the entry.
+
+class MemoryBackend:
+    shared = False
+
+    def __init__(self):
+        self._mappings = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def mapping(self, namespace, raw=False, ttl=None):
+        return self._mappings.setdefault((namespace, raw), {})
+
+    def incr(self, namespace, key):
+        with self._lock:
+            value = self._counters[(namespace, key)] = self._counters.get((namespace, key), 0) + 1
+            return value
+
+    def counter(self, namespace, key):
+        return self._counters.get((namespace, key), 0)
+
+    def describe(self):
+        return {"backend": "memory", "shared": False}
+
+class SQLiteBackend:
+    """
+    One SQLite file (WAL mode) shared by the worker processes of one machine. Every query
+    goes through `run(fn, *args)`; the server passes eventlet's thread pool, so disk I/O
+    and waiting on another worker's write lock never block the hub.
+    """
+    shared = True
+
+    def __init__(self, path, run=None):
+        self.path = path
+        self._run = run or run_inline
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS kv (ns TEXT, key TEXT, value BLOB, expires REAL, PRIMARY KEY (ns, key)) WITHOUT ROWID"
+        )
+        if "expires" not in [row[1] for row in self._db.execute("PRAGMA table_info(kv)")]:
+            try:
+                self._db.execute("ALTER TABLE kv ADD COLUMN expires REAL")
+            except sqlite3.OperationalError:
+                pass  # Another worker added it first.
+        self._lock = thread_lock() if run else threading.Lock()
+
+    def _query(self, sql, args, rowcount):
+        with self._lock:
+            cursor = self._db.execute(sql, args)
+            return cursor.rowcount if rowcount else cursor.fetchall()
+
+    def _execute(self, sql, args=(), rowcount=False):
+        return self._run(self._query, sql, args, rowcount)
+
+    def mapping(self, namespace, raw=False, ttl=None):
+        return SharedMapping(self, namespace, raw, ttl)
+
+    def get(self, namespace, key):
+        rows = self._execute("SELECT value FROM kv WHERE ns = ? AND key = ?", (namespace, key))
+        return rows[0][0] if rows else None
+
+    def set(self, namespace, key, value, ttl=None):
+        self._execute(
+            "INSERT OR REPLACE INTO kv (ns, key, value, expires) VALUES (?, ?, ?, ?)",
+            (namespace, key, value, time.time() + ttl if ttl else None)
+        )
+
+    def expire(self, namespace):
+        """Delete the namespace's entries whose ttl has run out; returns how many."""
+        return self._execute("DELETE FROM kv WHERE ns = ? AND expires <= ?", (namespace, time.time()), rowcount=True)
+
+    def delete(self, namespace, key):
+        return self._execute("DELETE FROM kv WHERE ns = ? AND key = ?", (namespace, key), rowcount=True) > 0
+
+    def keys(self, namespace):
+        return [row[0] for row in self._execute("SELECT key FROM kv WHERE ns = ?", (namespace,))]
+
+    def items(self, namespace):
+        return self._execute("SELECT key, value FROM kv WHERE ns = ?", (namespace,))
+
+    def compare_and_set(self, namespace, key, expected, value):
+        """Store value (None = delete) only if the current value is still expected (None = absent)."""
+        if expected is None and value is None:
+            return self.get(namespace, key) is None
+        if expected is None:
+            sql, args = "INSERT OR IGNORE INTO kv (ns, key, value) VALUES (?, ?, ?)", (namespace, key, value)
+        elif value is None:
+            sql, args = "DELETE FROM kv WHERE ns = ? AND key = ? AND value = ?", (namespace, key, expected)
+        else:
+            sql, args = "UPDATE kv SET value = ? WHERE ns = ? AND key = ? AND value = ?", (value, namespace, key, expected)
+        return self._execute(sql, args, rowcount=True) == 1
+
+    def incr(self, namespace, key):
+        rows = self._execute(
+            "INSERT INTO kv (ns, key, value) VALUES (?, ?, 1) "
+            "ON CONFLICT (ns, key) DO UPDATE SET value = value + 1 RETURNING value",
+            (f"counter:{namespace}", key)
+        )
+        return int(rows[0][0])
+
+    def counter(self, namespace, key):
+        rows = self._execute("SELECT value FROM kv WHERE ns = ? AND key = ?", (f"counter:{namespace}", key))
+        return int(rows[0][0]) if rows else 0
+
+    def describe(self):
+        return {"backend": "sqlite", "shared": True, "path": self.path}
+
+_REDIS_COMPARE_AND_SET = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if ARGV[2] == '1' then
+    if current ~= ARGV[3] then return 0 end
+elseif current then
+    return 0
+end
+if ARGV[4] == '1' then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[5])
+else
+    redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+class RedisBackend:
+    """
+    One Redis hash per namespace; needs the optional redis package. Namespaces opened with
+    a ttl store one key per entry instead ("<prefix>:<namespace>:<key>"), since Redis
+    expires keys but not hash fields.
+    """
+    shared = True
+
+    def __init__(self, url, prefix="borealis"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("BOREALIS_STATE_BACKEND=redis:// needs the redis package (pip install redis).")
+        self.url = url
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+        self._compare_and_set = self._redis.register_script(_REDIS_COMPARE_AND_SET)
+        self._expiring = set()  # Namespaces stored as one key per entry
+
+    def _name(self, namespace):
+        return f"{self.prefix}:{namespace}"
+
+    def _entry_keys(self, namespace):
+        return list(self._redis.scan_iter(match=f"{self._name(namespace)}:*", count=500))
+
+    def mapping(self, namespace, raw=False, ttl=None):
+        if ttl:
+            self._expiring.add(namespace)
+        return SharedMapping(self, namespace, raw, ttl)
+
+    def get(self, namespace, key):
+        if namespace in self._expiring:
+            return self._redis.get(f"{self._name(namespace)}:{key}")
+        return self._redis.hget(self._name(namespace), key)
+
+    def set(self, namespace, key, value, ttl=None):
+        if namespace in self._expiring:
+            self._redis.set(f"{self._name(namespace)}:{key}", value, px=int(ttl * 1000) if ttl else None)
+        else:
+            self._redis.hset(self._name(namespace), key, value)
+
+    def delete(self, namespace, key):
+        if namespace in self._expiring:
+            return self._redis.delete(f"{self._name(namespace)}:{key}") > 0
+        return self._redis.hdel(self._name(namespace), key) > 0
+
+    def expire(self, namespace):
+        return 0  # Redis expires the keys itself.
+
+    def keys(self, namespace):
+        if namespace in self._expiring:
+            start = len(self._name(namespace)) + 1
+            return [key.decode("utf-8")[start:] for key in self._entry_keys(namespace)]
+        return [key.decode("utf-8") for key in self._redis.hkeys(self._name(namespace))]
+
+    def items(self, namespace):
+        if namespace in self._expiring:
+            names = self._entry_keys(namespace)
+            start = len(self._name(namespace)) + 1
+            values = self._redis.mget(names) if names else []
+            return [(name.decode("utf-8")[start:], value) for name, value in zip(names, values) if value is not None]
+        return [(key.decode("utf-8"), value) for key, value in self._redis.hgetall(self._name(namespace)).items()]
+
+    def compare_and_set(self, namespace, key, expected, value):
+        if namespace in self._expiring:
+            raise ValueError(f"Namespace '{namespace}' expires its entries and has no compare_and_set().")
+        return self._compare_and_set(keys=[self._name(namespace)], args=[
+            key, int(expected is not None), expected or b"", int(value is not None), value or b""
+        ]) == 1
+
+    def incr(self, namespace, key):
+        return int(self._redis.hincrby(self._name(f"counter:{namespace}"), key, 1))
+
+    def counter(self, namespace, key):
+        return int(self._redis.hget(self._name(f"counter:{namespace}"), key) or 0)
+
+    def describe(self):
+        return {"backend": "redis", "shared": True, "url": self.url}
+
+class SharedMapping(MutableMapping):
+    """dict-like view of one backend namespace; values are JSON (or bytes if raw)."""
+    def __init__(self, backend, namespace, raw=False, ttl=None):
+        self.backend = backend
+        self.namespace = namespace
+        self.raw = raw
+        self.ttl = ttl
+
+    def _decode(self, value):
+        return bytes(value) if self.raw else json.loads(value)
+
+    def _encode(self, value):
+        return bytes(value) if self.raw else json.dumps(value)
+
+    def __getitem__(self, key):
+        value = self.backend.get(self.namespace, str(key))
+        if value is None:
+            raise KeyError(key)
+        return self._decode(value)
+
+    def __setitem__(self, key, value):
+        self.backend.set(self.namespace, str(key), self._encode(value), self.ttl)
+
+    def __delitem__(self, key):
+        if not self.backend.delete(self.namespace, str(key)):
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.backend.keys(self.namespace))
+
+    def __len__(self):
+        return len(self.backend.keys(self.namespace))
+
+    def __contains__(self, key):
+        return self.backend.get(self.namespace, str(key)) is not None
+
+    def items(self):
+        # One round trip instead of a lookup per key.
+        return [(key, self._decode(value)) for key, value in self.backend.items(self.namespace)]
+
+    def copy(self):
+        return dict(self.items())
+
+    def expire(self):
+        return self.backend.expire(self.namespace)
+
+    def modify(self, key, change):
+        key = str(key)
+        while True:
+            current = self.backend.get(self.namespace, key)
+            value = change(None if current is None else self._decode(current))
+            if value is None:
+                return None
+            if self.backend.compare_and_set(self.namespace, key, current, None if value is DELETE else self._encode(value)):
+                return value
+            # Another worker changed the entry in between: run change() again on its value.
+
+def modify(mapping, key, change):
+    """
+    Atomic read-modify-write of mapping[key]: change(current value or None) returns the
+    new value, DELETE to remove the entry, or None to leave it as it is. Returns what
+    change() returned last. change() may run more than once and gets its own copy.
+    """
+    if isinstance(mapping, SharedMapping):
+        return mapping.modify(key, change)
+    value = change(copy.deepcopy(mapping.get(key)))
+    if value is DELETE:
+        mapping.pop(key, None)
+    elif value is not None:
+        mapping[key] = value
+    return value
+
+def open_state_backend(url=STATE_BACKEND_URL, run=None):
+    """`run` executes blocking SQLite calls (e.g. eventlet.tpool.execute); Redis uses green sockets."""
+    if not url or url == "memory":
+        return MemoryBackend()
+    if url.startswith(SQLITE_PREFIX):
+        return SQLiteBackend(url[len(SQLITE_PREFIX):], run)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported BOREALIS_STATE_BACKEND '{url}'.")
+
+# ---------------------------------------------------------------------
+# Local Socket.IO Message Queue
+# ---------------------------------------------------------------------
+class SQLiteManager(socketio.PubSubManager):
+    """
+    Stand-in for a Redis message queue on a single machine: every worker appends its
+    emits to a SQLite table and polls for the others'. Payloads are pickled like
+    socketio.RedisManager does, so binary frame attachments pass through unchanged.
+    """
+    name = "sqlite"
+
+    def __init__(self, url="sqlite:///borealis-queue.db", channel="flask-socketio", write_only=False,
+                 logger=None, json=None, poll_interval=0.01, retention=60, run=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.path = url[len(SQLITE_PREFIX):]
+        self._run = run or run_inline
+        self.poll_interval = poll_interval
+        self.retention = retention
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT, created REAL, data BLOB)"
+        )
+        self._lock = thread_lock() if run else threading.Lock()
+        self._published = 0
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def _publish(self, data):
+        self._published += 1
+        self._run(self._query, "INSERT INTO messages (channel, created, data) VALUES (?, ?, ?)",
+                  (self.channel, time.time(), pickle.dumps(data)))
+        if self._published % 500 == 0:
+            self._run(self._query, "DELETE FROM messages WHERE created < ?", (time.time() - self.retention,))
+
+    def _listen(self):
+        last_id = self._run(self._query, "SELECT COALESCE(MAX(id), 0) FROM messages")[0][0]
+        while True:
+            rows = self._run(
+                self._query,
+                "SELECT id, data FROM messages WHERE id > ? AND channel = ? ORDER BY id",
+                (last_id, self.channel)
+            )
+            for message_id, data in rows:
+                last_id = message_id
+                yield pickle.loads(data)
+            if not rows:
+                self.server.sleep(self.poll_interval)
+
+def socketio_queue_options(url=MESSAGE_QUEUE_URL, run=None):
+    """SocketIO(...) keyword arguments for the configured message queue (none = single process)."""
+    if not url:
+        return {}
+    if url.startswith(SQLITE_PREFIX):
+        return {"client_manager": SQLiteManager(url, run=run)}
+    return {"message_queue": url}
@@ -0,0 +1,344 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/workflow_engine.py
+
+import time
+import heapq
+import threading
+
+from Python_API_Endpoints.workflow_nodes import NODE_HANDLERS, NodeInputs
+from Python_API_Endpoints.ocr_engines import parse_ocr_options
+from Python_API_Endpoints.shared_state import run_inline
+
+# ---------------------------------------------------------------------
+# Headless Workflow Execution Engine
+# ---------------------------------------------------------------------
+# Runs saved workflows (the WebUI's {"nodes": [...], "edges": [...]} JSON) on the
+# server, so they keep working without a browser tab:
+# - The graph is ordered topologically once when it is loaded.
+# - Values only move when something changes. A new agent frame (or another source
+#   value) marks the nodes directly downstream as dirty, and one pass evaluates the
+#   dirty nodes in topological order. A node whose output did not change does not
+#   dirty its children, so e.g. identical OCR text stops the pass right there.
+# - There are no per-node timers: each workflow has at most one pass running, and
+#   sources that change during a pass are picked up by the next one.
+
+# Node types whose value is pushed in from outside instead of computed.
+SOURCE_TYPES = {"Agent_Role_Screenshot"}
+AGENT_ROLE_TYPES = {"Agent_Role_Screenshot", "Macro_KeyPress"}
+
+class WorkflowError(ValueError):
+    pass
+
+class WorkflowNode:
+    def __init__(self, node):
+        self.id = node["id"]
+        self.type = node.get("type")
+        self.data = node.get("data") or {}
+        self.agent_id = None
+        self.inputs = []  # (source node id, target handle)
+        self.children = []
+
+class Workflow:
+    def __init__(self, workflow_id, graph):
+        if not isinstance(graph, dict) or not isinstance(graph.get("nodes"), list):
+            raise WorkflowError("Workflow JSON must contain a nodes[] list.")
+        self.workflow_id = workflow_id
+        self.name = graph.get("tab_name") or workflow_id
+        self.nodes = {}
+        for node in graph["nodes"]:
+            if not isinstance(node, dict) or "id" not in node:
+                raise WorkflowError("Every node needs an id.")
+            self.nodes[node["id"]] = WorkflowNode(node)
+
+        for edge in graph.get("edges") or []:
+            source, target = self.nodes.get(edge.get("source")), self.nodes.get(edge.get("target"))
+            if source is None or target is None:
+                continue
+            if source.type == "Borealis_Agent" and target.type in AGENT_ROLE_TYPES:
+                # Provisioner edge: the role runs on this agent; it carries no value.
+                target.agent_id = source.data.get("agent_id") or None
+                continue
+            target.inputs.append((source.id, edge.get("targetHandle")))
+            source.children.append(target.id)
+
+        self.order = self._topological_order()
+        self.rank = {node_id: index for index, node_id in enumerate(self.order)}
+        self.streams = {
+            f"{node.agent_id}:{node.id}": node.id
+            for node in self.nodes.values() if node.type in SOURCE_TYPES and node.agent_id
+        }
+        self.unsupported = sorted({
+            node.type for node in self.nodes.values()
+            if node.type not in NODE_HANDLERS and node.type not in SOURCE_TYPES
+        })
+
+        self.values = {}
+        self.errors = {}
+        self.dirty = set(self.nodes)  # Everything is evaluated once on load.
+        self.lock = threading.Lock()
+        self.running = False
+        self.loaded = True
+        self.passes = 0
+        self.evaluations = 0
+        self.skipped = 0
+        self.last_pass_ms = None
+        self.last_pass_at = None
+        self.created = time.time()
+
+    def _topological_order(self):
+        # Kahn's algorithm; ties keep the saved node order so passes are deterministic.
+        position = {node_id: index for index, node_id in enumerate(self.nodes)}
+        indegree = {node_id: len(node.inputs) for node_id, node in self.nodes.items()}
+        ready = [(position[n], n) for n, degree in indegree.items() if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, node_id = heapq.heappop(ready)
+            order.append(node_id)
+            for child in self.nodes[node_id].children:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(ready, (position[child], child))
+        if len(order) != len(self.nodes):
+            cyclic = sorted(n for n, degree in indegree.items() if degree > 0)
+            raise WorkflowError(f"Workflow contains a cycle through: {', '.join(cyclic)}")
+        return order
+
+    def set_source(self, node_id, value):
+        """Push a new value into a source node; returns True if downstream became dirty."""
+        with self.lock:
+            if node_id in self.values and self.values[node_id] == value:
+                return False
+            self.values[node_id] = value
+            self.dirty.update(self.nodes[node_id].children)
+            return True
+
+    def evaluate(self, services):
+        """One pass over the dirty nodes; returns {node_id: new value} for outputs that changed."""
+        started = time.perf_counter()
+        with self.lock:
+            queued = set(self.dirty)
+            self.dirty.clear()
+        heap = [self.rank[node_id] for node_id in queued]
+        heapq.heapify(heap)
+        changed = {}
+        evaluated = 0
+        while heap:
+            node = self.nodes[self.order[heapq.heappop(heap)]]
+            if node.type in SOURCE_TYPES:
+                continue
+            handler = NODE_HANDLERS.get(node.type)
+            if handler is None:
+                continue
+            inputs = {}
+            for source, handle in node.inputs:
+                inputs.setdefault(handle, []).append(self.values.get(source))
+            evaluated += 1
+            try:
+                value = handler(node, NodeInputs(inputs), services)
+                self.errors.pop(node.id, None)
+            except Exception as e:
+                self.errors[node.id] = str(e)
+                continue
+            if node.id in self.values and self.values[node.id] == value:
+                continue
+            self.values[node.id] = value
+            changed[node.id] = value
+            for child in node.children:
+                if child not in queued:
+                    queued.add(child)
+                    heapq.heappush(heap, self.rank[child])
+
+        self.passes += 1
+        self.evaluations += evaluated
+        self.skipped += len(self.nodes) - evaluated
+        self.last_pass_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.last_pass_at = time.time()
+        return changed
+
+    def to_dict(self, include_values=False):
+        info = {
+            "workflow_id": self.workflow_id,
+            "name": self.name,
+            "nodes": len(self.nodes),
+            "order": self.order,
+            "streams": sorted(self.streams),
+            "unsupported_types": self.unsupported,
+            "running": self.running,
+            "passes": self.passes,
+            "evaluations": self.evaluations,
+            "skipped_evaluations": self.skipped,
+            "last_pass_ms": self.last_pass_ms,
+            "last_pass_at": self.last_pass_at,
+            "errors": dict(self.errors),
+            "created": self.created
+        }
+        if include_values:
+            info["values"] = {node_id: preview_value(value) for node_id, value in self.values.items()}
+        return info
+
+def preview_value(value):
+    # Images stay on the server; clients fetch frames from the frame endpoints instead.
+    if isinstance(value, (bytes, bytearray)):
+        return {"image_bytes": len(value)}
+    return value
+
+class WorkflowServices:
+    """
+    What node handlers may call on the server (OCR, pushing macro triggers to agents).
+    `run(fn, *args)` executes CPU-bound node work such as image thresholding; the server
+    passes eventlet.tpool.execute so it stays off the hub.
+    """
+    def __init__(self, ocr, macro_trigger, run=run_inline):
+        self.ocr = ocr
+        self.macro_trigger = macro_trigger
+        self.run = run
+
+def ocr_service(run):
+    """
+    The `ocr` service around `run(image, engine=, backend=, use_cache=, preprocess=)`
+    (OCRWorkerPool.run). Nodes carry the WebUI's labels ("TesseractOCR-Persistent", "GPU"),
+    which are parsed exactly like a Socket.IO / REST OCR request, so headless runs get the
+    same engines, EasyOCR micro-batching and cache keys.
+    """
+    def ocr(image, engine, backend, preprocess):
+        engine, backend, use_cache, preprocess, error = parse_ocr_options(
+            {"engine": engine, "backend": backend, "preprocess": preprocess}
+        )
+        if error:
+            raise WorkflowError(error)
+        return run(image, engine=engine, backend=backend, use_cache=use_cache, preprocess=preprocess)
+    return ocr
+
+class WorkflowEngine:
+    """
+    Keeps loaded workflows and feeds them agent frames. `spawn(fn, *args)` starts a
+    background task and `emit(payload)` publishes changed values ("workflow_values");
+    both are supplied by the server, like OCRStreamManager.
+    """
+    def __init__(self, services, spawn, emit):
+        self.services = services
+        self._spawn = spawn
+        self._emit = emit
+        self._lock = threading.Lock()
+        self._workflows = {}
+        self._by_stream = {}
+
+    def load(self, workflow_id, graph, frames=None):
+        """Load (or replace) a workflow; `frames(stream_key)` seeds screenshot nodes."""
+        workflow = Workflow(workflow_id, graph)
+        with self._lock:
+            self._remove(workflow_id)
+            self._workflows[workflow_id] = workflow
+            for key, node_id in workflow.streams.items():
+                self._by_stream.setdefault(key, []).append((workflow, node_id))
+        if frames is not None:
+            for key, node_id in workflow.streams.items():
+                frame = frames(key)
+                if frame is not None:
+                    workflow.set_source(node_id, frame)
+        self._schedule(workflow)
+        return workflow
+
+    def unload(self, workflow_id):
+        with self._lock:
+            return self._remove(workflow_id)
+
+    def _remove(self, workflow_id):
+        workflow = self._workflows.pop(workflow_id, None)
+        if workflow is None:
+            return False
+        workflow.loaded = False
+        for key in workflow.streams:
+            bound = [entry for entry in self._by_stream.get(key, []) if entry[0] is not workflow]
+            if bound:
+                self._by_stream[key] = bound
+            else:
+                self._by_stream.pop(key, None)
+        return True
+
+    def get(self, workflow_id, include_values=True):
+        with self._lock:
+            workflow = self._workflows.get(workflow_id)
+        return workflow.to_dict(include_values) if workflow else None
+
+    def workflows(self):
+        with self._lock:
+            return [workflow.to_dict() for workflow in self._workflows.values()]
+
+    def on_frame(self, agent_id, node_id, frame, timestamp=None):
+        """Feed a newly received agent frame to every workflow bound to its stream."""
+        with self._lock:
+            bound = list(self._by_stream.get(f"{agent_id}:{node_id}", ()))
+        for workflow, source_id in bound:
+            if workflow.set_source(source_id, frame):
+                self._schedule(workflow)
+
+    def _schedule(self, workflow):
+        with workflow.lock:
+            if workflow.running or not workflow.dirty:
+                return  # The running pass loop picks the new dirty nodes up.
+            workflow.running = True
+        self._spawn(self._run, workflow)
+
+    def _run(self, workflow):
+        while True:
+            changed = workflow.evaluate(self.services)
+            if changed and workflow.loaded:
+                self._emit(workflow.workflow_id, {
+                    "workflow_id": workflow.workflow_id,
+                    "values": {node_id: preview_value(value) for node_id, value in changed.items()},
+                    "errors": dict(workflow.errors),
+                    "pass_ms": workflow.last_pass_ms,
+                    "timestamp": workflow.last_pass_at
+                })
+            with workflow.lock:
+                if not workflow.dirty or not workflow.loaded:
+                    workflow.running = False
+                    return
+
+# ---------------------------------------------------------------------
+# Self-Checks: Node Parity with the WebUI
+# ---------------------------------------------------------------------
+# Run from Data/Server: python -m Python_API_Endpoints.workflow_engine
+def check_ocr_labels():
+    # Every engine / backend label of the WebUI OCR node must reach the pool exactly as
+    # an /api/ocr request with the same labels would.
+    calls = []
+
+    def run(image, **options):
+        calls.append(options)
+        return ["text"]
+
+    services = WorkflowServices(ocr=ocr_service(run), macro_trigger=lambda *args: None)
+    handler = NODE_HANDLERS["OCR_Text_Extraction"]
+    for engine in ("TesseractOCR", "TesseractOCR-Persistent", "EasyOCR"):
+        for backend in ("CPU", "GPU"):
+            node = WorkflowNode({"id": "ocr", "type": "OCR_Text_Extraction", "data": {"engine": engine, "backend": backend}})
+            assert handler(node, NodeInputs({None: [b"\x89PNG"]}), services) == ["text"], (engine, backend)
+            expected_engine, expected_backend, use_cache, preprocess, error = parse_ocr_options({"engine": engine, "backend": backend})
+            assert error is None, error
+            assert calls[-1] == {"engine": expected_engine, "backend": expected_backend,
+                                 "use_cache": use_cache, "preprocess": preprocess}, (engine, backend, calls[-1])
+            print(f"{engine:>24} {backend}: {calls[-1]['engine']}:{calls[-1]['backend']}")
+    assert {call["engine"] for call in calls} == {"tesseract", "tesseract_persistent", "easyocr"}
+
+def check_bw_threshold():
+    # (127 + 128 + 128) / 3 = 127.67 is below a cutoff of 128 on the canvas, even though
+    # it would round to 128.
+    from io import BytesIO
+    from PIL import Image
+
+    source = Image.new("RGB", (2, 1))
+    source.putpixel((0, 0), (127, 128, 128))
+    source.putpixel((1, 0), (128, 128, 128))
+    buf = BytesIO()
+    source.save(buf, format="PNG")
+    services = WorkflowServices(ocr=None, macro_trigger=None)
+    node = WorkflowNode({"id": "bw", "type": "BWThresholdNode", "data": {"value": "128.9"}})
+    result = Image.open(BytesIO(NODE_HANDLERS["BWThresholdNode"](node, NodeInputs({None: [buf.getvalue()]}), services)))
+    assert [result.getpixel((x, 0)) for x in range(2)] == [0, 255], list(result.getdata())
+    print("BWThresholdNode: ok")
+
+if __name__ == "__main__":
+    check_ocr_labels()
+    check_bw_threshold()
@@ -0,0 +1,302 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/workflow_nodes.py
+
+import re
+import json
+import base64
+from io import BytesIO
+
+from PIL import Image
+
+from Python_API_Endpoints.ocr_engines import parse_preprocess
+
+# ---------------------------------------------------------------------
+# Python Implementations of Workflow Nodes
+# ---------------------------------------------------------------------
+# Server-side counterparts of the WebUI nodes (WebUI/src/nodes), used by the headless
+# workflow engine. Each handler receives the node, its input values grouped by target
+# handle, and the engine's services, and returns the node's output value. They mirror
+# the JavaScript semantics, including the string conventions ("1" / "0", "Line Does
+# Not Exist", "Key Not Found"), so a workflow behaves the same with or without a
+# browser tab. Images travel between nodes as raw PNG bytes instead of base64 strings.
+
+NODE_HANDLERS = {}
+# Nodes that are evaluated by the engine but only display their input in the WebUI.
+PASSTHROUGH_TYPES = {"Image_Viewer", "Node_JSON_Pretty_Display", "Node_TextArray_Display"}
+NOT_FOUND_LINE = "Line Does Not Exist"
+NOT_FOUND_KEY = "Key Not Found"
+
+def node_handler(*types):
+    def register(fn):
+        for node_type in types:
+            NODE_HANDLERS[node_type] = fn
+        return fn
+    return register
+
+class NodeInputs:
+    """Upstream values of one node, keyed by target handle (None for the default handle)."""
+    def __init__(self, values):
+        self.values = values
+
+    def first(self, handle=None, default=None):
+        values = self.values.get(handle)
+        return values[0] if values else default
+
+    def all(self, handle=None):
+        return list(self.values.get(handle, ()))
+
+    def connected(self, handle=None):
+        return bool(self.values.get(handle))
+
+    def any(self, default=None):
+        # The WebUI nodes read "the" input edge regardless of its handle id.
+        for values in self.values.values():
+            if values:
+                return values[0]
+        return default
+
+def js_string(value) -> str:
+    """String(value) the way the WebUI nodes would render it."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+def parse_float(value) -> float:
+    """parseFloat(value) || 0"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = re.match(r"\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?", str(value or ""))
+    return float(match.group(0)) if match else 0.0
+
+def parse_int(value, default):
+    """parseInt(value, 10), falling back to `default` where the WebUI would get NaN."""
+    match = re.match(r"\s*([-+]?\d+)", str(value if value is not None else ""))
+    return int(match.group(1)) if match else default
+
+def is_enabled(value, default=True) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() != "false"
+    return bool(value)
+
+def to_image_bytes(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if isinstance(value, str) and value:
+        return base64.b64decode(value.split(",", 1)[1] if value.startswith("data:") else value)
+    return None
+
+def js_regex(pattern, flags):
+    """Compile a JavaScript-style pattern + flags; returns (regex, global)."""
+    options = 0
+    if "i" in flags:
+        options |= re.IGNORECASE
+    if "m" in flags:
+        options |= re.MULTILINE
+    if "s" in flags:
+        options |= re.DOTALL
+    # Named groups: (?<name>...) -> (?P<name>...)
+    pattern = re.sub(r"\(\?<(?![=!])", "(?P<", pattern)
+    return re.compile(pattern, options), "g" in flags
+
+def js_replacement(replacement):
+    # $1 / $& -> \g<1> / \g<0>; other backslashes are literal like in JavaScript.
+    replacement = replacement.replace("\\", "\\\\")
+    replacement = re.sub(r"\$(\d+)", r"\\g<\1>", replacement)
+    return replacement.replace("$&", r"\g<0>").replace("$$", "$")
+
+# ---------------- General Purpose ----------------
+@node_handler("DataNode")
+def data_node(node, inputs, services):
+    if inputs.connected():
+        return inputs.first(default="")
+    return node.data.get("value", "")
+
+@node_handler("Upload_Text_File")
+def upload_text_node(node, inputs, services):
+    return list(node.data.get("lines") or [])
+
+@node_handler("Borealis_Agent")
+def agent_node(node, inputs, services):
+    return node.data.get("agent_id") or ""
+
+@node_handler("MathNode")
+def math_node(node, inputs, services):
+    operator = node.data.get("operator") or "Add"
+    a_values, b_values = inputs.all("a"), inputs.all("b")
+    a = sum(parse_float(v) for v in a_values)
+    b = sum(parse_float(v) for v in b_values)
+    if operator == "Subtract":
+        value = a - b
+    elif operator == "Multiply":
+        value = a * b
+    elif operator == "Divide":
+        value = a / b if b != 0 else 0
+    elif operator == "Average":
+        count = len(a_values) + len(b_values)
+        value = (a + b) / count if count else 0
+    else:
+        value = a + b
+    return js_string(float(value))
+
+COMPARISONS = {
+    "Equal (==)": lambda a, b: a == b,
+    "Not Equal (!=)": lambda a, b: a != b,
+    "Greater Than (>)": lambda a, b: a > b,
+    "Less Than (<)": lambda a, b: a < b,
+    "Greater Than or Equal (>=)": lambda a, b: a >= b,
+    "Less Than or Equal (<=)": lambda a, b: a <= b
+}
+
+@node_handler("ComparisonNode")
+def comparison_node(node, inputs, services):
+    input_type = node.data.get("inputType") or "Number"
+    operator = node.data.get("operator") or "Equal (==)"
+    if input_type == "String" and operator not in ("Equal (==)", "Not Equal (!=)"):
+        operator = "Equal (==)"
+
+    def combine(values):
+        values = [v for v in values if v is not None]
+        if input_type == "Number":
+            return sum(parse_float(v) for v in values)
+        return "".join(js_string(v) for v in values)
+
+    a, b = combine(inputs.all("a")), combine(inputs.all("b"))
+    if operator == "Within Range":
+        try:
+            start, end = float(node.data.get("rangeStart")), float(node.data.get("rangeEnd"))
+            return "1" if start <= end and start <= float(a) <= end else "0"
+        except (TypeError, ValueError):
+            return "0"
+    compare = COMPARISONS.get(operator)
+    return "1" if compare and compare(a, b) else "0"
+
+# ---------------- Data Analysis & Manipulation ----------------
+@node_handler("ArrayIndexExtractor")
+def array_index_node(node, inputs, services):
+    upstream = inputs.any()
+    if not isinstance(upstream, list):
+        return NOT_FOUND_LINE
+    try:
+        index = max(0, int(node.data.get("lineNumber") or 1) - 1)
+    except (TypeError, ValueError):
+        index = 0
+    value = upstream[index] if index < len(upstream) else None
+    return NOT_FOUND_LINE if value is None else value
+
+@node_handler("RegexReplace")
+def regex_replace_node(node, inputs, services):
+    value = js_string(inputs.any(default="") or "")
+    pattern = node.data.get("pattern")
+    if not pattern or not is_enabled(node.data.get("enabled")):
+        return value
+    replacement = (node.data.get("replacement") or "").strip()
+    if len(replacement) >= 2 and replacement.startswith('"') and replacement.endswith('"'):
+        replacement = replacement[1:-1]
+    try:
+        regex, is_global = js_regex(pattern, node.data.get("flags") or "g")
+        return regex.sub(js_replacement(replacement), value, count=0 if is_global else 1)
+    except (re.error, IndexError) as e:
+        return f"[Error] {e}"
+
+@node_handler("RegexSearch")
+def regex_search_node(node, inputs, services):
+    pattern = node.data.get("pattern") or ""
+    if not pattern:
+        return "0"
+    try:
+        regex, _ = js_regex(pattern, node.data.get("flags") or "i")
+    except re.error:
+        return "0"
+    return "1" if regex.search(js_string(inputs.any(default="") or "")) else "0"
+
+@node_handler("JSON_Value_Extractor")
+def json_value_node(node, inputs, services):
+    upstream = inputs.any()
+    key_name = node.data.get("keyName") or ""
+    if not key_name or not isinstance(upstream, (dict, list)):
+        return NOT_FOUND_KEY
+    value = upstream
+    for segment in key_name.split("."):
+        if isinstance(value, dict) and segment in value:
+            value = value[segment]
+        elif isinstance(value, list) and segment.isdigit() and int(segment) < len(value):
+            value = value[int(segment)]
+        else:
+            return NOT_FOUND_KEY
+    return js_string(value) if value is not None else "null"
+
+@node_handler("OCR_Text_Extraction")
+def ocr_node(node, inputs, services):
+    engine = node.data.get("engine") or "None"
+    image = to_image_bytes(inputs.any())
+    if engine == "None" or not image:
+        return []
+    preprocess = node.data.get("preprocess") or None
+    try:
+        preprocess = parse_preprocess(json.loads(preprocess) if isinstance(preprocess, str) else preprocess)
+    except ValueError:
+        preprocess = []  # The WebUI node ignores an invalid pipeline as well.
+    lines = services.ocr(image, engine, node.data.get("backend") or "CPU", preprocess)
+    data_type = node.data.get("dataType") or "Mixed"
+    if data_type == "Numerical":
+        lines = [re.sub(r"\s+", " ", re.sub(r"[^\d.%\s]", "", line)).strip() for line in lines]
+    elif data_type == "String":
+        lines = [re.sub(r"\s+", " ", re.sub(r"[^a-zA-Z\s]", "", line)).strip() for line in lines]
+    return [line for line in lines if line] if data_type != "Mixed" else lines
+
+# ---------------- Image Processing ----------------
+@node_handler("BWThresholdNode")
+def bw_threshold_node(node, inputs, services):
+    image = to_image_bytes(inputs.any())
+    if not image:
+        return ""
+    cutoff = parse_int(node.data.get("value"), 128)
+    return services.run(bw_threshold, image, cutoff)
+
+def bw_threshold(image_bytes, cutoff):
+    """
+    The WebUI node's canvas loop: a pixel whose unrounded (R + G + B) / 3 is below the
+    cutoff becomes black, everything else white; alpha is kept.
+    """
+    import numpy as np
+
+    rgba = Image.open(BytesIO(image_bytes)).convert("RGBA")
+    pixels = np.asarray(rgba)
+    total = pixels[..., :3].sum(axis=2, dtype=np.int32)
+    bw = Image.fromarray(np.where(total < 3 * cutoff, 0, 255).astype(np.uint8), "L")
+    if rgba.getextrema()[3][0] < 255:
+        bw = Image.merge("RGBA", (bw, bw, bw, rgba.getchannel("A")))
+    buf = BytesIO()
+    bw.save(buf, format="PNG", compress_level=1)
+    return buf.getvalue()
+
+# ---------------- Flow Control ----------------
+@node_handler("Edge_Toggle")
+def edge_toggle_node(node, inputs, services):
+    if not is_enabled(node.data.get("enabled")):
+        return 0
+    return inputs.any(default=node.data.get("value"))
+
+# ---------------- Agent Roles ----------------
+@node_handler("Macro_KeyPress")
+def macro_node(node, inputs, services):
+    # Forward the upstream trigger to the agent's macro role (same event the WebUI sends).
+    if not inputs.connected("trigger"):
+        return None
+    trigger = 1 if js_string(inputs.first("trigger")).strip() == "1" else 0
+    if node.agent_id:
+        services.macro_trigger(node.agent_id, node.id, trigger)
+    return trigger
+
+def passthrough_node(node, inputs, services):
+    return inputs.any()
+
+for _node_type in PASSTHROUGH_TYPES:
+    NODE_HANDLERS[_node_type] = passthrough_node
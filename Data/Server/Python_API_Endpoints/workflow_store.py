@@ -0,0 +1,267 @@
+#////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/Server/Python_API_Endpoints/workflow_store.py
+
+import os
+import re
+import json
+import time
+import base64
+import hashlib
+import binascii
+import threading
+
+from Python_API_Endpoints.frame_store import sniff_content_type
+
+# ---------------------------------------------------------------------
+# Workflow Persistence with Content-Addressed Blobs
+# ---------------------------------------------------------------------
+# Saved workflows keep their graph JSON small: every large base64 / data URL string
+# inside node data (e.g. the last screenshot a node held) is decoded and written once
+# to a blob store addressed by its SHA-256, and replaced in the graph by a reference
+#   {"$blob": "<sha256>", "encoding": "base64" | "data_url" | "text", "content_type": ..., "size": ...}
+# Identical images across nodes, saves and workflows are stored once. Clients fetch
+# blobs on demand from /api/blobs/<sha256>, which never change and cache forever.
+#   BOREALIS_BLOB_MIN_BYTES: strings shorter than this stay inline (default 4096)
+
+BLOB_MIN_BYTES = int(os.environ.get("BOREALIS_BLOB_MIN_BYTES", 4096))
+BLOB_KEY = "$blob"
+_BASE64_RE = re.compile(r"^[A-Za-z0-9+/\r\n]+={0,2}$")
+_DATA_URL_RE = re.compile(r"^data:([\w.+-]+/[\w.+-]+);base64,")
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+_WORKFLOW_ID_RE = re.compile(r"^[\w .()-]+(/[\w .()-]+)*$")
+
+class WorkflowStoreError(ValueError):
+    pass
+
+def is_blob_ref(value):
+    return isinstance(value, dict) and isinstance(value.get(BLOB_KEY), str)
+
+def workflow_id_from_name(name):
+    # Same file naming as the WebUI's export: spaces to underscores, lowercase.
+    slug = re.sub(r"\s+", "_", str(name or "").strip()).lower()
+    return re.sub(r"[^\w.()-]", "", slug) or "workflow"
+
+class BlobStore:
+    def __init__(self, root):
+        self.root = root
+        self.writes = 0
+        self.deduplicated = 0
+
+    def path(self, digest):
+        if not _DIGEST_RE.match(digest or ""):
+            raise WorkflowStoreError(f"Invalid blob digest '{digest}'.")
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            try:
+                os.utime(path)  # A fresh reference: keeps collect_garbage() from taking it mid-save.
+            except OSError:
+                pass  # Removed in between; written again below.
+            else:
+                self.deduplicated += 1
+                return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.writes += 1
+        return digest
+
+    def get(self, digest) -> bytes:
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def exists(self, digest):
+        try:
+            return os.path.exists(self.path(digest))
+        except WorkflowStoreError:
+            return False
+
+    def digests(self):
+        if not os.path.isdir(self.root):
+            return set()
+        return {
+            name for prefix in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, prefix))
+            for name in os.listdir(os.path.join(self.root, prefix)) if _DIGEST_RE.match(name)
+        }
+
+    def delete(self, digest):
+        try:
+            os.remove(self.path(digest))
+            return True
+        except OSError:
+            return False
+
+class WorkflowStore:
+    """
+    Workflows saved as <root>/<workflow_id>.json (ids may contain "/" subfolders, like
+    the bundled "Flyff Universe/..." examples), blobs under <root>/.blobs.
+    """
+    def __init__(self, root, min_blob_bytes=BLOB_MIN_BYTES):
+        self.root = root
+        self.blobs = BlobStore(os.path.join(root, ".blobs"))
+        self.min_blob_bytes = min_blob_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, workflow_id):
+        workflow_id = str(workflow_id or "").strip().strip("/")
+        if not _WORKFLOW_ID_RE.match(workflow_id) or any(part in (".", "..") for part in workflow_id.split("/")):
+            raise WorkflowStoreError(f"Invalid workflow id '{workflow_id}'.")
+        return os.path.join(self.root, *workflow_id.split("/")) + ".json"
+
+    # ---------------- Blob Externalization ----------------
+    def externalize(self, value):
+        """Return a copy of value with every large binary string replaced by a blob reference."""
+        if isinstance(value, dict):
+            if is_blob_ref(value):
+                if not self.blobs.exists(value[BLOB_KEY]):
+                    raise WorkflowStoreError(f"Unknown blob '{value[BLOB_KEY]}'.")
+                return value
+            return {key: self.externalize(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.externalize(item) for item in value]
+        if isinstance(value, str) and len(value) >= self.min_blob_bytes:
+            return self._externalize_string(value)
+        return value
+
+    def _externalize_string(self, text):
+        match = _DATA_URL_RE.match(text)
+        payload = text[match.end():] if match else text
+        data = None
+        if _BASE64_RE.match(payload):
+            try:
+                data = base64.b64decode(payload, validate=False)
+            except (binascii.Error, ValueError):
+                data = None
+        if data is not None and base64.b64encode(data).decode("ascii") == payload:
+            content_type = match.group(1) if match else sniff_content_type(data)
+            encoding = "data_url" if match else "base64"
+        else:
+            # Large plain text (or non-canonical base64): stored as-is so it round-trips exactly.
+            data, content_type, encoding = text.encode("utf-8"), "text/plain; charset=utf-8", "text"
+        return {
+            BLOB_KEY: self.blobs.put(data),
+            "encoding": encoding,
+            "content_type": content_type,
+            "size": len(data)
+        }
+
+    def inline(self, value):
+        """Return a copy of value with every blob reference replaced by its original string."""
+        if isinstance(value, dict):
+            if is_blob_ref(value):
+                data = self.blobs.get(value[BLOB_KEY])
+                if value.get("encoding") == "text":
+                    return data.decode("utf-8")
+                encoded = base64.b64encode(data).decode("ascii")
+                if value.get("encoding") == "data_url":
+                    return f"data:{value.get('content_type')};base64,{encoded}"
+                return encoded
+            return {key: self.inline(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.inline(item) for item in value]
+        return value
+
+    # ---------------- Workflows ----------------
+    def save(self, workflow_id, graph):
+        if not isinstance(graph, dict) or not isinstance(graph.get("nodes"), list):
+            raise WorkflowStoreError("Workflow JSON must contain a nodes[] list.")
+        path = self._path(workflow_id)
+        stored = self.externalize(graph)
+        text = self._write(path, stored)
+        return {"workflow_id": workflow_id, "bytes": len(text), "blobs": sorted(self.references(stored))}
+
+    def _write(self, path, stored):
+        text = json.dumps(stored, indent=2)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        return text
+
+    def load(self, workflow_id, inline=False):
+        """Load a workflow; blobs stay references unless inline=True (export / headless runs).
+        Reading never writes: a file that still holds inline images (WebUI export, bundled
+        workflows) is returned as it is and only externalized when it is saved (or imported
+        through a save), so every blob reference handed out is owned by a file."""
+        path = self._path(workflow_id)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(workflow_id)
+        with open(path, "r", encoding="utf-8") as f:
+            graph = json.load(f)
+        return self.inline(graph) if inline else graph
+
+    def delete(self, workflow_id):
+        path = self._path(workflow_id)
+        with self._lock:
+            if not os.path.isfile(path):
+                return False
+            os.remove(path)
+        return True
+
+    def list(self):
+        workflows = []
+        for folder, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(folder, name)
+                workflow_id = os.path.relpath(path, self.root)[:-len(".json")].replace(os.sep, "/")
+                stat = os.stat(path)
+                workflows.append({
+                    "workflow_id": workflow_id,
+                    "bytes": stat.st_size,
+                    "updated": stat.st_mtime
+                })
+        return sorted(workflows, key=lambda w: w["workflow_id"])
+
+    @staticmethod
+    def references(value, found=None):
+        found = set() if found is None else found
+        if isinstance(value, dict):
+            if is_blob_ref(value):
+                found.add(value[BLOB_KEY])
+            else:
+                for item in value.values():
+                    WorkflowStore.references(item, found)
+        elif isinstance(value, list):
+            for item in value:
+                WorkflowStore.references(item, found)
+        return found
+
+    def collect_garbage(self, min_age=3600):
+        """Delete blobs no saved workflow references (older than min_age seconds, so a
+        blob uploaded for a save that is still in flight is never removed)."""
+        referenced = set()
+        for workflow in self.list():
+            try:
+                with open(self._path(workflow["workflow_id"]), "r", encoding="utf-8") as f:
+                    self.references(json.load(f), referenced)
+            except (OSError, ValueError):
+                continue
+        removed = 0
+        now = time.time()
+        for digest in self.blobs.digests() - referenced:
+            try:
+                if now - os.path.getmtime(self.blobs.path(digest)) < min_age:
+                    continue
+            except OSError:
+                continue
+            removed += self.blobs.delete(digest)
+        return removed
+
+    def stats(self):
+        digests = self.blobs.digests()
+        return {
+            "workflows": len(self.list()),
+            "blobs": len(digests),
+            "blob_bytes": sum(os.path.getsize(self.blobs.path(d)) for d in digests),
+            "blob_writes": self.blobs.writes,
+            "blob_deduplicated": self.blobs.deduplicated
+        }
@@ -43,6 +43,7 @@ import NodeSidebar from "./Node_Sidebar";
 import {
   CloseAllDialog,
   CreditsDialog,
+  OpenWorkflowDialog,
   RenameTabDialog,
   TabContextMenu
 } from "./Dialogs";
@@ -57,6 +58,153 @@ if (!window.BorealisSocket) {
   });
 }
 
+// Stream subscriptions: the server only relays an agent_id:node_id stream's frames,
+// macro status and OCR results to sockets subscribed to it. Subscriptions are
+// reference counted across nodes and replayed after a reconnect.
+if (!window.BorealisSubscribeStream) {
+  const streamRefs = {};
+  window.BorealisSocket.on("connect", () => {
+    Object.keys(streamRefs).forEach((key) => {
+      const [agent_id, node_id] = key.split("|");
+      window.BorealisSocket.emit("subscribe_stream", { agent_id, node_id });
+    });
+  });
+  window.BorealisSubscribeStream = (agent_id, node_id) => {
+    if (!agent_id) return () => {};
+    const key = `${agent_id}|${node_id || ""}`;
+    streamRefs[key] = (streamRefs[key] || 0) + 1;
+    if (streamRefs[key] === 1) {
+      window.BorealisSocket.emit("subscribe_stream", { agent_id, node_id });
+    }
+    return () => {
+      streamRefs[key] -= 1;
+      if (streamRefs[key] <= 0) {
+        delete streamRefs[key];
+        window.BorealisSocket.emit("unsubscribe_stream", { agent_id, node_id });
+      }
+    };
+  };
+}
+
+// Agent presence: one shared agent list for every node, kept current by the server's
+// "agents_changed" deltas instead of each node re-polling /api/agents. Deltas carry a
+// seq; a gap (missed delta) is repaired with /api/agents?since=<seq>.
+if (!window.BorealisSubscribeAgents) {
+  const presence = { seq: null, agents: {}, listeners: new Set() };
+  const notify = () => presence.listeners.forEach((listener) => listener(presence.agents));
+  const applyDelta = (delta) => {
+    const agents = delta.full ? { ...delta.agents } : { ...presence.agents, ...delta.upserted };
+    (delta.removed || []).forEach((aid) => delete agents[aid]);
+    presence.agents = agents;
+    presence.seq = delta.seq;
+    notify();
+  };
+  const resync = () => {
+    fetch(`/api/agents?since=${presence.seq}`)
+      .then((res) => res.json())
+      .then(applyDelta)
+      .catch(() => {});
+  };
+  const subscribe = () => {
+    window.BorealisSocket.emit("subscribe_agents", {}, (snapshot) => {
+      if (snapshot && (presence.seq === null || snapshot.seq > presence.seq)) applyDelta(snapshot);
+    });
+  };
+  window.BorealisSocket.on("agents_changed", (delta) => {
+    if (presence.seq === null || delta.seq <= presence.seq) return;
+    if (delta.seq !== presence.seq + 1) return resync();
+    applyDelta(delta);
+  });
+  window.BorealisSocket.on("connect", () => {
+    // The server may have restarted (seq starts over), so take its snapshot as is.
+    presence.seq = null;
+    if (presence.listeners.size) subscribe();
+  });
+  window.BorealisSubscribeAgents = (listener) => {
+    presence.listeners.add(listener);
+    if (presence.listeners.size === 1) subscribe();
+    else if (presence.seq !== null) listener(presence.agents);
+    return () => {
+      presence.listeners.delete(listener);
+      if (presence.listeners.size === 0) {
+        window.BorealisSocket.emit("unsubscribe_agents", {});
+        presence.seq = null;
+      }
+    };
+  };
+}
+
+// Workflow blobs: workflows saved on the server hold {"$blob": sha256, ...} references
+// instead of large base64 fields. Each digest is fetched once, after its tab opens, and
+// the reference is remembered so saving an unchanged image never uploads it again.
+const blobFetches = new Map();
+const blobRefsByValue = new Map();
+
+const isBlobRef = (value) => !!value && typeof value === "object" && typeof value.$blob === "string";
+
+const fetchBlob = (ref) => {
+  if (!blobFetches.has(ref.$blob)) {
+    const pending = fetch(`/api/blobs/${ref.$blob}`)
+      .then((resp) => {
+        if (!resp.ok) throw new Error(`Blob ${ref.$blob} not found`);
+        return ref.encoding === "text" ? resp.text() : resp.arrayBuffer();
+      })
+      .then((body) => {
+        if (ref.encoding === "text") return body;
+        const bytes = new Uint8Array(body);
+        let binary = "";
+        for (let i = 0; i < bytes.length; i += 0x8000) {
+          binary += String.fromCharCode(...bytes.subarray(i, i + 0x8000));
+        }
+        const encoded = btoa(binary);
+        return ref.encoding === "data_url" ? `data:${ref.content_type};base64,${encoded}` : encoded;
+      })
+      .catch((err) => {
+        blobFetches.delete(ref.$blob);
+        throw err;
+      });
+    blobFetches.set(ref.$blob, pending);
+  }
+  return blobFetches.get(ref.$blob).then((value) => {
+    blobRefsByValue.set(value, ref);
+    return value;
+  });
+};
+
+const mapBlobRefs = (value, fn) => {
+  if (isBlobRef(value)) return fn(value);
+  if (Array.isArray(value)) return value.map((item) => mapBlobRefs(item, fn));
+  if (value && typeof value === "object") {
+    return Object.fromEntries(Object.entries(value).map(([k, v]) => [k, mapBlobRefs(v, fn)]));
+  }
+  return value;
+};
+
+const collectBlobRefs = (value, found = {}) => {
+  mapBlobRefs(value, (ref) => (found[ref.$blob] = ref));
+  return found;
+};
+
+const resolveBlobRefs = async (value) => {
+  const resolved = {};
+  await Promise.all(
+    Object.values(collectBlobRefs(value)).map(async (ref) => (resolved[ref.$blob] = await fetchBlob(ref)))
+  );
+  return mapBlobRefs(value, (ref) => resolved[ref.$blob]);
+};
+
+// Inverse for saving: values that are still exactly a fetched blob go back as references.
+const restoreBlobRefs = (value) => {
+  if (typeof value === "string") return blobRefsByValue.get(value) || value;
+  if (Array.isArray(value)) return value.map(restoreBlobRefs);
+  if (value && typeof value === "object" && !isBlobRef(value)) {
+    return Object.fromEntries(Object.entries(value).map(([k, v]) => [k, restoreBlobRefs(v)]));
+  }
+  return value;
+};
+
+const workflowUrl = (workflowId) => `/api/workflows/${workflowId.split("/").map(encodeURIComponent).join("/")}`;
+
 if (!window.BorealisUpdateRate) {
   window.BorealisUpdateRate = 200;
 }
@@ -128,8 +276,33 @@ export default function App() {
   const [renameValue, setRenameValue] = useState("");
   const [tabMenuAnchor, setTabMenuAnchor] = useState(null);
   const [tabMenuTabId, setTabMenuTabId] = useState(null);
+  const [serverWorkflows, setServerWorkflows] = useState(null);
   const fileInputRef = useRef(null);
 
+  // Swap a tab's blob references for their contents as each blob arrives; the graph
+  // itself is usable right away.
+  const loadTabBlobs = (tabId, nodes) => {
+    Object.values(collectBlobRefs(nodes || [])).forEach((ref) =>
+      fetchBlob(ref)
+        .then((value) =>
+          setTabs((old) =>
+            old.map((tab) =>
+              tab.id !== tabId
+                ? tab
+                : {
+                    ...tab,
+                    nodes: tab.nodes.map((n) => ({
+                      ...n,
+                      data: mapBlobRefs(n.data, (r) => (r.$blob === ref.$blob ? value : r))
+                    }))
+                  }
+            )
+          )
+        )
+        .catch((err) => console.error("Failed to load workflow blob:", err))
+    );
+  };
+
   useEffect(() => {
     const saved = localStorage.getItem(LOCAL_STORAGE_KEY);
     if (saved) {
@@ -138,6 +311,7 @@ export default function App() {
         if (Array.isArray(parsed.tabs) && parsed.activeTabId) {
           setTabs(parsed.tabs);
           setActiveTabId(parsed.activeTabId);
+          parsed.tabs.forEach((tab) => loadTabBlobs(tab.id, tab.nodes));
         }
       } catch (err) {
         console.warn("Failed to parse saved state:", err);
@@ -289,7 +463,7 @@ export default function App() {
     if (!activeTab) return;
     const data = JSON.stringify(
       {
-        nodes: activeTab.nodes,
+        nodes: await resolveBlobRefs(activeTab.nodes),
         edges: activeTab.edges,
         tab_name: activeTab.tab_name
       },
@@ -328,6 +502,62 @@ export default function App() {
     }
   };
 
+  const handleSaveFlowToServer = async () => {
+    const activeTab = tabs.find((x) => x.id === activeTabId);
+    if (!activeTab) return;
+    try {
+      const resp = await fetch(activeTab.workflow_id ? workflowUrl(activeTab.workflow_id) : "/api/workflows", {
+        method: activeTab.workflow_id ? "PUT" : "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          nodes: restoreBlobRefs(activeTab.nodes),
+          edges: activeTab.edges,
+          tab_name: activeTab.tab_name
+        })
+      });
+      const result = await resp.json();
+      if (!resp.ok) throw new Error(result.error || resp.statusText);
+      setTabs((old) =>
+        old.map((tab) => (tab.id === activeTab.id ? { ...tab, workflow_id: result.workflow_id } : tab))
+      );
+    } catch (err) {
+      console.error("Failed to save workflow to server:", err);
+    }
+  };
+
+  const handleOpenServerFlowDialog = async () => {
+    try {
+      const resp = await fetch("/api/workflows");
+      setServerWorkflows(resp.ok ? await resp.json() : []);
+    } catch (err) {
+      console.error("Failed to list server workflows:", err);
+    }
+  };
+
+  const handleOpenServerFlow = async (workflowId) => {
+    setServerWorkflows(null);
+    try {
+      const resp = await fetch(workflowUrl(workflowId));
+      const json = await resp.json();
+      if (!resp.ok) throw new Error(json.error || resp.statusText);
+      const newId = "flow_" + (tabs.length + 1);
+      setTabs((prev) => [
+        ...prev,
+        {
+          id: newId,
+          tab_name: json.tab_name || workflowId,
+          workflow_id: workflowId,
+          nodes: json.nodes || [],
+          edges: json.edges || []
+        }
+      ]);
+      setActiveTabId(newId);
+      loadTabBlobs(newId, json.nodes);
+    } catch (err) {
+      console.error("Failed to open server workflow:", err);
+    }
+  };
+
   const handleImportFlow = async () => {
     if (window.showOpenFilePicker) {
       try {
@@ -415,6 +645,8 @@ export default function App() {
             categorizedNodes={categorizedNodes}
             handleExportFlow={handleExportFlow}
             handleImportFlow={handleImportFlow}
+            handleSaveFlowToServer={handleSaveFlowToServer}
+            handleOpenServerFlowDialog={handleOpenServerFlowDialog}
             handleOpenCloseAllDialog={handleOpenCloseAllDialog}
             fileInputRef={fileInputRef}
             onFileInputChange={handleFileInputChange}
@@ -464,6 +696,11 @@ export default function App() {
         onConfirm={handleConfirmCloseAll}
       />
       <CreditsDialog open={creditsDialogOpen} onClose={() => setCreditsDialogOpen(false)} />
+      <OpenWorkflowDialog
+        workflows={serverWorkflows}
+        onClose={() => setServerWorkflows(null)}
+        onOpen={handleOpenServerFlow}
+      />
       <RenameTabDialog
         open={renameDialogOpen}
         value={renameValue}
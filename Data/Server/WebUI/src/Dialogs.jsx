@@ -7,6 +7,9 @@ import {
   DialogContentText,
   DialogActions,
   Button,
+  List,
+  ListItemButton,
+  ListItemText,
   Menu,
   MenuItem,
   TextField
@@ -95,6 +98,34 @@ export function RenameTabDialog({ open, value, onChange, onCancel, onSave }) {
   );
 }
 
+export function OpenWorkflowDialog({ workflows, onClose, onOpen }) {
+  return (
+    <Dialog open={Array.isArray(workflows)} onClose={onClose} PaperProps={{ sx: { bgcolor: "#121212", color: "#fff", minWidth: 360 } }}>
+      <DialogTitle>Open Workflow from Server</DialogTitle>
+      <DialogContent>
+        {(workflows || []).length === 0 ? (
+          <DialogContentText sx={{ color: "#ccc" }}>No workflows have been saved on the server yet.</DialogContentText>
+        ) : (
+          <List dense>
+            {workflows.map((w) => (
+              <ListItemButton key={w.workflow_id} onClick={() => onOpen(w.workflow_id)}>
+                <ListItemText
+                  primary={w.workflow_id}
+                  secondary={`${(w.bytes / 1024).toFixed(1)} KB - ${new Date(w.updated * 1000).toLocaleString()}`}
+                  secondaryTypographyProps={{ sx: { color: "#888" } }}
+                />
+              </ListItemButton>
+            ))}
+          </List>
+        )}
+      </DialogContent>
+      <DialogActions>
+        <Button onClick={onClose} sx={{ color: "#58a6ff" }}>Cancel</Button>
+      </DialogActions>
+    </Dialog>
+  );
+}
+
 export function TabContextMenu({ anchor, onClose, onRename, onCloseTab }) {
   return (
     <Menu
@@ -14,6 +14,8 @@ import {
   ExpandMore as ExpandMoreIcon,
   Save as SaveIcon,
   FileOpen as FileOpenIcon,
+  CloudUpload as CloudUploadIcon,
+  CloudDownload as CloudDownloadIcon,
   DeleteForever as DeleteForeverIcon,
   DragIndicator as DragIndicatorIcon,
   Polyline as PolylineIcon,
@@ -25,6 +27,8 @@ export default function NodeSidebar({
   categorizedNodes,
   handleExportFlow,
   handleImportFlow,
+  handleSaveFlowToServer,
+  handleOpenServerFlowDialog,
   handleOpenCloseAllDialog,
   fileInputRef,
   onFileInputChange
@@ -81,6 +85,16 @@ export default function NodeSidebar({
                     Import Flow
                   </Button>
                 </Tooltip>
+                <Tooltip title="Save Current Tab on the Borealis Server" placement="right" arrow>
+                  <Button fullWidth startIcon={<CloudUploadIcon />} onClick={handleSaveFlowToServer} sx={buttonStyle}>
+                    Save Flow to Server
+                  </Button>
+                </Tooltip>
+                <Tooltip title="Open a Workflow Saved on the Borealis Server" placement="right" arrow>
+                  <Button fullWidth startIcon={<CloudDownloadIcon />} onClick={handleOpenServerFlowDialog} sx={buttonStyle}>
+                    Open Flow from Server
+                  </Button>
+                </Tooltip>
                 <Tooltip title="Destroy all Flow Tabs Immediately" placement="right" arrow>
                   <Button fullWidth startIcon={<DeleteForeverIcon />} onClick={handleOpenCloseAllDialog} sx={buttonStyle}>
                     Close All Flows
@@ -46,7 +46,8 @@ const MacroKeyPressNode = ({ id, data }) => {
   const running = data?.active === true || data?.active === "true";
 
   // Store for last macro error/status
-  const [lastMacroStatus, setLastMacroStatus] = useState({ success: true, message: "", timestamp: null });
+  const [lastMacroStatus, setLastMacroStatus] = useState({ success: true, message: "", timestamp: null, latency: null });
+  const triggerRef = useRef(null);
 
   // Setup WebSocket for agent macro status updates
   useEffect(() => {
@@ -63,7 +64,8 @@ const MacroKeyPressNode = ({ id, data }) => {
         setLastMacroStatus({
           success: !!payload.success,
           message: payload.message || "",
-          timestamp: payload.timestamp || Date.now()
+          timestamp: payload.timestamp || Date.now(),
+          latency: payload.trigger_latency_ms ?? null
         });
         setStatus({
           state: payload.success ? "success" : "error",
@@ -72,12 +74,46 @@ const MacroKeyPressNode = ({ id, data }) => {
       }
     }
 
+    const unsubscribe = window.BorealisSubscribeStream
+      ? window.BorealisSubscribeStream(agent_id, id)
+      : () => {};
     socket.on("macro_status", handleMacroStatus);
     return () => {
+      unsubscribe();
       socket.off("macro_status", handleMacroStatus);
     };
   }, [agent_id, id]);
 
+  // Push the upstream trigger value (and the active flag) to the agent as soon as it
+  // changes, so trigger modes react without a full re-provision.
+  const triggerEdge = edges.find((e) => e.target === id && e.targetHandle === "trigger");
+  const triggerSource = triggerEdge?.source;
+  useEffect(() => {
+    if (!agent_id) return;
+    const pushTrigger = (patch) => {
+      if (window.BorealisSocket) {
+        window.BorealisSocket.emit("macro_trigger", { agent_id, node_id: id, ...patch });
+      }
+    };
+
+    pushTrigger({ active: running });
+    if (!triggerSource) return;
+
+    triggerRef.current = null;
+    const intervalId = setInterval(() => {
+      const upstream = window.BorealisValueBus[triggerSource];
+      const trigger = String(upstream ?? "").trim() === "1" ? 1 : 0;
+      if (trigger !== triggerRef.current) {
+        triggerRef.current = trigger;
+        setNodes((nds) =>
+          nds.map((n) => (n.id === id ? { ...n, data: { ...n.data, trigger: String(trigger) } } : n))
+        );
+        pushTrigger({ trigger });
+      }
+    }, window.BorealisUpdateRate || 100);
+    return () => clearInterval(intervalId);
+  }, [agent_id, id, triggerSource, running, setNodes]);
+
   // Auto-refresh window list from agent
   useEffect(() => {
     let intervalId = null;
@@ -252,6 +288,12 @@ const MacroKeyPressNode = ({ id, data }) => {
         <br />
         <strong>Macro Type</strong>: {data?.macro_type || "keypress"}
         <br />
+        {lastMacroStatus.latency != null && (
+          <>
+            <strong>Trigger Latency</strong>: {lastMacroStatus.latency} ms
+            <br />
+          </>
+        )}
         <button
           onClick={handleToggleMacro}
           style={{
@@ -321,8 +363,13 @@ Supports manual, continuous, trigger, and one-shot modes for automation and even
 **Event-Driven Support:**
 - Chain with other Borealis nodes (text recognition, event triggers, etc).
 
+**Trigger Input:**
+- Connect any node to the "Trigger" handle; an upstream value of "1" is trigger on, anything else is off.
+- Changes are pushed to the agent immediately, which wakes the macro without waiting for its next interval.
+
 **Live Status:**
 - Displays last agent macro event and error feedback in node.
+- Trigger modes also show the latency from trigger change to macro sent on the agent.
 
 ---
   `.trim()
@@ -31,6 +31,16 @@ const AgentScreenshotNode = ({ id, data }) => {
   };
   const visible = (data?.visible ?? "true") === "true";
   const alias = data?.alias || "";
+  const changeDetection = data?.change_detection || "skip";
+  const keyframeInterval = parseFloat(data?.keyframe_interval ?? 10) || 10;
+  const encoding = data?.encoding || "png";
+  const pngLevel = parseInt(data?.png_level ?? 6, 10);
+  const quality = parseInt(data?.quality ?? 80, 10) || 80;
+  const scale = parseFloat(data?.scale ?? 1) || 1;
+  const [encodeMs, setEncodeMs] = useState(null);
+  const minFps = parseFloat(data?.min_fps ?? 0.2) || 0.2;
+  const maxFps = parseFloat(data?.max_fps ?? 0) || null;
+  const [effectiveFps, setEffectiveFps] = useState(null);
   const [imageBase64, setImageBase64] = useState(data?.value || "");
 
   // Always push current imageBase64 into BorealisValueBus at the global update rate
@@ -48,10 +58,14 @@ const AgentScreenshotNode = ({ id, data }) => {
     return () => clearInterval(intervalId);
   }, [id, imageBase64, setNodes]);
 
-  // Listen for agent screenshot and overlay region updates
+  const provisionerEdge = edges.find(e => e.target === id && e.sourceHandle === "provisioner");
+  const streamAgentId = getNodes().find(n => n.id === provisionerEdge?.source)?.data?.agent_id;
+
+  // Listen for agent screenshot and overlay region updates (only this node's stream is relayed)
   useEffect(() => {
     const socket = window.BorealisSocket;
-    if (!socket) return;
+    if (!socket || !streamAgentId) return;
+    const unsubscribe = window.BorealisSubscribeStream(streamAgentId, id);
 
     const handleScreenshot = (payload) => {
       if (payload?.node_id !== id) return;
@@ -60,6 +74,8 @@ const AgentScreenshotNode = ({ id, data }) => {
         setImageBase64(payload.image_base64);
         window.BorealisValueBus[id] = payload.image_base64;
       }
+      if (payload.encode_ms !== undefined) setEncodeMs(payload.encode_ms);
+      if (payload.fps !== undefined) setEffectiveFps(payload.fps);
       const { x, y, w, h } = payload;
       if (
         x !== undefined &&
@@ -76,8 +92,11 @@ const AgentScreenshotNode = ({ id, data }) => {
     };
 
     socket.on("agent_screenshot_task", handleScreenshot);
-    return () => socket.off("agent_screenshot_task", handleScreenshot);
-  }, [id, setNodes]);
+    return () => {
+      unsubscribe();
+      socket.off("agent_screenshot_task", handleScreenshot);
+    };
+  }, [id, streamAgentId, setNodes]);
 
   // Register this node for the agent provisioning sync
   window.__BorealisInstructionNodes = window.__BorealisInstructionNodes || {};
@@ -87,6 +106,14 @@ const AgentScreenshotNode = ({ id, data }) => {
     interval,
     visible,
     alias,
+    change_detection: changeDetection,
+    keyframe_interval: keyframeInterval,
+    encoding,
+    png_level: isNaN(pngLevel) ? 6 : pngLevel,
+    quality,
+    scale,
+    min_fps: minFps,
+    max_fps: maxFps,
     ...region
   });
 
@@ -121,7 +148,7 @@ const AgentScreenshotNode = ({ id, data }) => {
           <b>Region:</b> X:{region.x} Y:{region.y} W:{region.w} H:{region.h}
         </div>
         <div>
-          <b>Interval:</b> {interval} ms
+          <b>Interval:</b> {interval} ms{effectiveFps !== null ? ` (${effectiveFps} fps)` : ""}
         </div>
         <div>
           <b>Overlay:</b> {visible ? "Yes" : "No"}
@@ -131,7 +158,7 @@ const AgentScreenshotNode = ({ id, data }) => {
         </div>
         <div style={{ textAlign: "center", fontSize: "8px", color: "#aaa" }}>
           {imageBase64
-            ? `Last image: ${Math.round(imageBase64.length / 1024)} KB`
+            ? `Last image: ${Math.round(imageBase64.length / 1024)} KB${encodeMs !== null ? ` (${encoding}, ${encodeMs} ms encode)` : ""}`
             : "Awaiting Screenshot Data..."}
         </div>
       </div>
@@ -202,6 +229,56 @@ Capture a live screenshot of a defined region from a remote Borealis Agent.
       label: "Overlay Label",
       type: "text",
       defaultValue: ""
+    },
+    {
+      key: "change_detection",
+      label: "Change Detection",
+      type: "select",
+      options: ["skip", "tiles", "off"],
+      defaultValue: "skip"
+    },
+    {
+      key: "keyframe_interval",
+      label: "Keyframe Interval (s)",
+      type: "text",
+      defaultValue: "10"
+    },
+    {
+      key: "encoding",
+      label: "Frame Encoding",
+      type: "select",
+      options: ["png", "jpeg", "webp"],
+      defaultValue: "png"
+    },
+    {
+      key: "png_level",
+      label: "PNG Compress Level (0-9)",
+      type: "text",
+      defaultValue: "6"
+    },
+    {
+      key: "quality",
+      label: "JPEG / WebP Quality (1-100)",
+      type: "text",
+      defaultValue: "80"
+    },
+    {
+      key: "scale",
+      label: "Downscale Factor (0.1-1)",
+      type: "text",
+      defaultValue: "1"
+    },
+    {
+      key: "min_fps",
+      label: "Minimum FPS (under congestion)",
+      type: "text",
+      defaultValue: "0.2"
+    },
+    {
+      key: "max_fps",
+      label: "Maximum FPS (blank = 1000 / interval)",
+      type: "text",
+      defaultValue: ""
     }
   ],
   usage_documentation: `
@@ -219,6 +296,10 @@ This node defines a screenshot-capture role for a Borealis Agent.
 **Configuration**
 - All fields are edited via the right sidebar.
 - Coordinates update live if region is changed from the Agent.
+- **Change Detection**: \`skip\` (default) does not resend a region that has not changed, \`tiles\` also sends only the changed tiles of a partly changed region (the server rebuilds the full frame), \`off\` sends every capture.
+- **Keyframe Interval**: a full frame is still sent at least this often, even when nothing changed.
+- **Frame Encoding**: \`png\` is lossless (lower compress levels encode faster but are larger), \`jpeg\` / \`webp\` trade fidelity for much smaller frames. **Downscale Factor** shrinks the region before encoding. The node shows the agent's encode time per frame.
+- **Minimum / Maximum FPS**: the agent adapts its capture rate to how fast the server acknowledges frames, slowing down to no less than the minimum on a congested link and speeding back up to at most the maximum. The node shows the effective FPS.
 
 **Warning**
 - Changing region from the Agent UI will update this node's coordinates.
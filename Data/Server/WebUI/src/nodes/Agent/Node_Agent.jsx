@@ -24,17 +24,10 @@ const BorealisAgentNode = ({ id, data }) => {
       .sort((a, b) => b.last_seen - a.last_seen);
   }, [agents]);
 
-  // Fetch Agents Periodically
+  // Live Agent List (pushed "agents_changed" deltas, shared by all agent nodes)
   useEffect(() => {
-    const fetchAgents = () => {
-      fetch("/api/agents")
-        .then((res) => res.json())
-        .then(setAgents)
-        .catch(() => {});
-    };
-    fetchAgents();
-    const interval = setInterval(fetchAgents, 4000);
-    return () => clearInterval(interval);
+    if (!window.BorealisSubscribeAgents) return;
+    return window.BorealisSubscribeAgents(setAgents);
   }, []);
 
   // Sync node data with sidebar changes
@@ -111,7 +104,7 @@ const BorealisAgentNode = ({ id, data }) => {
   const selectedAgentStatus = useMemo(() => {
     if (!selectedAgent) return "Unassigned";
     const agent = agents[selectedAgent];
-    if (!agent) return "Reconnecting...";
+    if (!agent || agent.status === "offline") return "Reconnecting...";
     return agent.status === "provisioned" ? "Connected" : "Available";
   }, [agents, selectedAgent]);
 
@@ -200,7 +193,7 @@ This node represents an available Borealis Agent (Python client) you can control
 - **Select** an agent from the list of online agents.
 - **Connect/Disconnect** from the agent at any time.
 - **Attach roles** (by connecting "Agent Role" nodes to this node's output handle) to assign behaviors dynamically.
-- **Live status** shows if the agent is available, connected, or offline.
+- **Live status** shows if the agent is available, connected, or offline. The agent list is pushed by the server as agents connect, heartbeat, disconnect or time out, so there is no polling.
 
 #### How to Use
 1. **Drag in a Borealis Agent node.**
@@ -19,13 +19,14 @@ if (!window.BorealisUpdateRate) window.BorealisUpdateRate = 100;
 
 const OCRNode = ({ id, data }) => {
     const edges = useStore((state) => state.edges);
-    const { setNodes } = useReactFlow();
+    const { setNodes, getNodes } = useReactFlow();
 
     const [ocrOutput, setOcrOutput] = useState("");
     const valueRef = useRef("");
     const lastUsed = useRef({ engine: "", backend: "", dataType: "" });
     const lastProcessedAt = useRef(0);
     const lastImageHash = useRef(0);
+    const serverJobRef = useRef(null);
 
     // Always get config from props (sidebar sets these in node.data)
     const engine = data?.engine || "None";
@@ -34,6 +35,31 @@ const OCRNode = ({ id, data }) => {
     const customRateEnabled = data?.customRateEnabled ?? true;
     const customRateMs = data?.customRateMs || 1000;
     const changeThreshold = data?.changeThreshold || 0;
+    const serverStream = (data?.serverStream ?? "false") === "true";
+    const preprocessJson = data?.preprocess || "";
+
+    // Optional server-side preprocessing pipeline (JSON array of steps); ignored if invalid
+    const parsePreprocess = () => {
+        if (!preprocessJson.trim()) return undefined;
+        try {
+            const steps = JSON.parse(preprocessJson);
+            return Array.isArray(steps) ? steps : undefined;
+        } catch {
+            return undefined;
+        }
+    };
+
+    // Resolve the agent screenshot stream feeding this node (agent_id + screenshot node_id)
+    const inputEdge = edges.find((e) => e.target === id);
+    const upstreamNode = inputEdge ? getNodes().find((n) => n.id === inputEdge.source) : null;
+    const provisionerEdge = upstreamNode?.type === "Agent_Role_Screenshot"
+        ? edges.find((e) => e.target === upstreamNode.id && e.sourceHandle === "provisioner")
+        : null;
+    const streamAgentId = provisionerEdge
+        ? getNodes().find((n) => n.id === provisionerEdge.source)?.data?.agent_id
+        : null;
+    const streamNodeId = streamAgentId ? upstreamNode.id : null;
+    const useServerStream = serverStream && engine !== "None" && !!streamAgentId;
 
     // OCR API Call
     const sendToOCRAPI = async (base64) => {
@@ -42,7 +68,7 @@ const OCRNode = ({ id, data }) => {
             const response = await fetch("/api/ocr", {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ image_base64: cleanBase64, engine, backend })
+                body: JSON.stringify({ image_base64: cleanBase64, engine, backend, preprocess: parsePreprocess() })
             });
             const result = await response.json();
             return response.ok && Array.isArray(result.lines)
@@ -64,7 +90,67 @@ const OCRNode = ({ id, data }) => {
         return lines;
     };
 
+    // Server-side stream OCR: the server OCRs agent frames as they arrive and pushes text only.
+    // Each attach holds one reference to the (possibly shared) server job; cleanup releases it.
+    useEffect(() => {
+        const socket = window.BorealisSocket;
+        if (!useServerStream) return;
+        let attachedJobId = null;
+        let released = false;
+
+        const detach = (jobId) => {
+            fetch(`/api/ocr/streams/${encodeURIComponent(jobId)}`, { method: "DELETE", keepalive: true }).catch(() => {});
+        };
+
+        const applyLines = (lines) => {
+            const filtered = filterLines(lines || []);
+            setOcrOutput(filtered.join("\n"));
+            window.BorealisValueBus[id] = filtered;
+        };
+
+        const handleResult = (payload) => {
+            if (payload?.job_id === serverJobRef.current) applyLines(payload.lines);
+        };
+
+        fetch("/api/ocr/streams", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ agent_id: streamAgentId, node_id: streamNodeId, engine, backend, preprocess: parsePreprocess() })
+        })
+            .then((res) => res.json())
+            .then((job) => {
+                if (!job?.job_id) return;
+                if (released) {
+                    detach(job.job_id); // Cleaned up before the attach finished.
+                    return;
+                }
+                attachedJobId = job.job_id;
+                serverJobRef.current = job.job_id;
+                if (Array.isArray(job.last_lines)) applyLines(job.last_lines);
+            })
+            .catch(() => {});
+
+        const unsubscribe = window.BorealisSubscribeStream
+            ? window.BorealisSubscribeStream(streamAgentId, streamNodeId)
+            : () => {};
+        if (socket) socket.on("ocr_result", handleResult);
+        const release = () => {
+            if (released) return;
+            released = true;
+            if (attachedJobId) detach(attachedJobId);
+            if (serverJobRef.current === attachedJobId) serverJobRef.current = null;
+        };
+        window.addEventListener("pagehide", release);
+        return () => {
+            unsubscribe();
+            if (socket) socket.off("ocr_result", handleResult);
+            window.removeEventListener("pagehide", release);
+            release();
+        };
+    }, [id, useServerStream, streamAgentId, streamNodeId, engine, backend, dataType, preprocessJson]);
+
     useEffect(() => {
+        if (useServerStream) return;
         let intervalId = null;
         let currentRate = window.BorealisUpdateRate || 100;
 
@@ -119,7 +205,7 @@ const OCRNode = ({ id, data }) => {
             clearInterval(intervalId);
             clearInterval(monitor);
         };
-    }, [id, engine, backend, dataType, customRateEnabled, customRateMs, changeThreshold, edges]);
+    }, [id, engine, backend, dataType, customRateEnabled, customRateMs, changeThreshold, edges, useServerStream, preprocessJson]);
 
     return (
         <div className="borealis-node" style={{ minWidth: "200px" }}>
@@ -170,7 +256,7 @@ export default {
             key: "engine",
             label: "OCR Engine",
             type: "select",
-            options: ["None", "TesseractOCR", "EasyOCR"],
+            options: ["None", "TesseractOCR", "TesseractOCR-Persistent", "EasyOCR"],
             defaultValue: "None"
         },
         {
@@ -205,6 +291,19 @@ export default {
             label: "Change Detection Sensitivity (0-100)",
             type: "text",
             defaultValue: "0"
+        },
+        {
+            key: "preprocess",
+            label: "Server Preprocessing Pipeline (JSON)",
+            type: "text",
+            defaultValue: ""
+        },
+        {
+            key: "serverStream",
+            label: "Server-Side Agent Stream OCR",
+            type: "select",
+            options: ["false", "true"],
+            defaultValue: "false"
         }
     ],
     usage_documentation: `
@@ -213,11 +312,14 @@ export default {
 Extracts text (lines) from an **upstream image node** using a selectable backend OCR engine (Tesseract or EasyOCR). Designed for screenshots, scanned forms, and live image data pipelines.
 
 **Features:**
-- **Engine:** Select between None, TesseractOCR, or EasyOCR
+- **Engine:** Select between None, TesseractOCR, TesseractOCR-Persistent, or EasyOCR
+  - *TesseractOCR-Persistent* keeps Tesseract loaded on the server instead of starting a process per image (requires \`tesserocr\` on the server, otherwise falls back to TesseractOCR)
 - **Backend:** Choose CPU or GPU (if supported)
 - **Data Type Filter:** Post-processes recognized lines for numerical-only or string-only content
 - **Custom API Rate Limit:** When enabled, you can set a custom polling rate for OCR requests (in ms)
 - **Change Detection Sensitivity:** Node will only re-OCR if the input image changes significantly (hash-based, 0 disables)
+- **Server Preprocessing Pipeline:** Optional JSON array of steps run on the server before OCR, in one decode, e.g. \`[{"op":"crop","x":0,"y":0,"w":200,"h":40},{"op":"scale","factor":2},{"op":"grayscale"},{"op":"contrast","value":60},{"op":"threshold","value":140}]\` (replaces chaining Grayscale / Threshold / Contrast nodes in front of OCR)
+- **Server-Side Agent Stream OCR:** When the input is an Agent Screenshot node, the server OCRs each new agent frame directly and pushes only the text to this node (no image round-trip, keeps running while the UI is closed)
 
 **Outputs:**
 - Array of recognized lines, pushed to downstream nodes
@@ -1,19 +1,38 @@
 #////////// PROJECT FILE SEPARATION LINE ////////// CODE AFTER THIS LINE ARE FROM: <ProjectRoot>/Data/server.py
 
 import eventlet
-# Monkey-patch stdlib for cooperative sockets
-eventlet.monkey_patch()
+from eventlet import tpool
+import multiprocessing
+# Monkey-patch stdlib for cooperative sockets (only in the server process itself; OCR
+# workers are spawned without re-running this module, see ocr_workers.py)
+if multiprocessing.current_process().name == "MainProcess":
+    eventlet.monkey_patch()
 
 import requests
 from flask import Flask, request, jsonify, Response, send_from_directory, make_response
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_cors import CORS
 
+import sys
+import copy
 import time
+import json
+import base64
+import socket
+import subprocess
 import os # To Read Production ReactJS Server Folder
 
 # Borealis Python API Endpoints
-from Python_API_Endpoints.ocr_engines import run_ocr_on_base64
+from Python_API_Endpoints.ocr_workers import OCRWorkerPool, OCRQueueFull, OCR_WARMUP
+from Python_API_Endpoints.ocr_streams import OCRStreamManager
+from Python_API_Endpoints.ocr_engines import parse_ocr_options
+from Python_API_Endpoints.frame_store import FrameStore, FRAME_TTL, sniff_content_type
+from Python_API_Endpoints.frame_tiles import TileAssembler
+from Python_API_Endpoints.workflow_engine import WorkflowEngine, WorkflowServices, WorkflowError, ocr_service
+from Python_API_Endpoints.workflow_store import WorkflowStore, WorkflowStoreError, workflow_id_from_name
+from Python_API_Endpoints.api_proxy import UpstreamProxy
+from Python_API_Endpoints.agent_presence import AgentPresence, AGENT_HEARTBEAT_INTERVAL
+from Python_API_Endpoints.shared_state import open_state_backend, socketio_queue_options, modify, DELETE, SERVER_WORKERS, MESSAGE_QUEUE_URL
 
 # ---------------------------------------------
 # Flask + WebSocket Server Configuration
@@ -27,6 +46,13 @@ app = Flask(
 # Enable CORS on All Routes
 CORS(app)
 
+# Agent / config / frame state, in-process by default or shared by several worker
+# processes (BOREALIS_STATE_BACKEND), whose Socket.IO emits reach each other's clients
+# through BOREALIS_MESSAGE_QUEUE (see shared_state.py).
+# SQLite queries run in eventlet's thread pool, so a busy state file never stalls the hub.
+state_backend = open_state_backend(run=tpool.execute)
+WORKER_ID = os.environ.get("BOREALIS_WORKER_INDEX", str(os.getpid()))
+
 socketio = SocketIO(
     app,
     cors_allowed_origins="*",
@@ -34,7 +60,8 @@ socketio = SocketIO(
     engineio_options={
         'max_http_buffer_size':       100_000_000,
         'max_websocket_message_size': 100_000_000
-    }
+    },
+    **socketio_queue_options(run=tpool.execute)
 )
 
 # ---------------------------------------------
@@ -56,44 +83,345 @@ def serve_dist(path):
 # ---------------------------------------------
 @app.route("/health")
 def health():
-    return jsonify({"status": "ok"})
+    return jsonify({"status": "ok", "ocr": ocr_pool.engine_status()})
 
 # ---------------------------------------------
 # Borealis Python API Endpoints
 # ---------------------------------------------
+# OCR runs in a pool of worker processes so model inference never blocks the
+# eventlet hub that relays screenshots and serves the rest of the API.
+ocr_pool = OCRWorkerPool()
+
+def ocr_queue_full_response(err):
+    resp = jsonify({"error": str(err), "queue": ocr_pool.stats()})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(err.retry_after)
+    return resp
+
 # /api/ocr: Accepts a base64 image and OCR engine selection,
-# and returns extracted text lines.
+# and returns extracted text lines. Send "cache": false to bypass the result cache,
+# and an optional "preprocess" pipeline (crop / scale / grayscale / threshold / contrast
+# steps, see image_preprocessing.py) to prepare the image server-side in one decode.
+# Binary uploads: POST the raw image bytes (Content-Type image/* or
+# application/octet-stream) with the options as query parameters instead.
 @app.route("/api/ocr", methods=["POST"])
 def ocr_endpoint():
-    payload = request.get_json()
-    image_b64 = payload.get("image_base64")
-    engine = payload.get("engine", "tesseract").lower().strip()
-    backend = payload.get("backend", "cpu").lower().strip()
-
-    if engine in ["tesseractocr", "tesseract"]:
-        engine = "tesseract"
-    elif engine == "easyocr":
-        engine = "easyocr"
+    if request.mimetype == "application/octet-stream" or request.mimetype.startswith("image/"):
+        image = request.get_data()
+        payload = request.args.to_dict()
+        if payload.get("preprocess"):
+            try:
+                payload["preprocess"] = json.loads(payload["preprocess"])
+            except ValueError:
+                return jsonify({"error": "Query parameter 'preprocess' must be a JSON array."}), 400
     else:
-        return jsonify({"error": f"OCR engine '{engine}' not recognized."}), 400
+        payload = request.get_json()
+        image = payload.get("image_base64")
+    engine, backend, use_cache, preprocess, error = parse_ocr_options(payload)
+
+    if error:
+        return jsonify({"error": error}), 400
 
     try:
-        lines = run_ocr_on_base64(image_b64, engine=engine, backend=backend)
+        lines = ocr_pool.run(image, engine=engine, backend=backend, use_cache=use_cache, preprocess=preprocess)
         return jsonify({"lines": lines})
+    except OCRQueueFull as e:
+        return ocr_queue_full_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# /api/ocr/batch: Accepts {"images": [base64, ...]} with the same options as /api/ocr,
+# and returns {"results": [{"lines": [...]} | {"error": "..."}]} in input order.
+@app.route("/api/ocr/batch", methods=["POST"])
+def ocr_batch_endpoint():
+    payload = request.get_json()
+    images = payload.get("images")
+    engine, backend, use_cache, preprocess, error = parse_ocr_options(payload)
+
+    if error:
+        return jsonify({"error": error}), 400
+    if not isinstance(images, list) or not images:
+        return jsonify({"error": "Missing images[] in OCR batch payload."}), 400
+
+    results = ocr_pool.run_batch(images, engine=engine, backend=backend, use_cache=use_cache, preprocess=preprocess)
+    rejected = [r for r in results if isinstance(r, OCRQueueFull)]
+    if len(rejected) == len(results):
+        return ocr_queue_full_response(rejected[0])
+
+    return jsonify({"results": [
+        {"error": str(r)} if isinstance(r, Exception) else {"lines": r}
+        for r in results
+    ]})
+
+# /api/ocr/stats: Reports OCR worker pool queue depth, wait/run times, cache hit rates
+# and micro-batch sizes/latencies.
+@app.route("/api/ocr/stats")
+def ocr_stats():
+    return jsonify(ocr_pool.stats())
+
+# ---------------------------------------------
+# Server-Side OCR on Agent Screenshot Streams
+# ---------------------------------------------
+# Attach an OCR job to an agent_id:node_id screenshot stream. It runs whenever a new
+# frame arrives from the agent and emits "ocr_result" with the text lines to the
+# clients subscribed to that stream, so browsers no longer post frames to /api/ocr.
+ocr_streams = OCRStreamManager(
+    ocr_pool,
+    spawn=socketio.start_background_task,
+    emit=lambda payload: emit_to_stream("ocr_result", payload, stream_key(payload["agent_id"], payload["node_id"]))
+)
+
+@app.route("/api/ocr/streams", methods=["GET"])
+def list_ocr_streams():
+    return jsonify(ocr_streams.jobs())
+
+@app.route("/api/ocr/streams", methods=["POST"])
+def attach_ocr_stream():
+    payload = request.get_json() or {}
+    agent_id = payload.get("agent_id")
+    node_id = payload.get("node_id")
+    engine, backend, use_cache, preprocess, error = parse_ocr_options(payload)
+
+    if not agent_id or not node_id:
+        return jsonify({"error": "Missing agent_id or node_id in OCR stream payload."}), 400
+    if error:
+        return jsonify({"error": error}), 400
+
+    job = ocr_streams.attach(agent_id, node_id, engine, backend, use_cache, preprocess)
+    # Start from the current frame instead of waiting for the next capture; only this
+    # job gets it, the others on the stream already had it.
+    latest = frame_store.get(stream_key(agent_id, node_id))
+    if latest and job.frames_seen == 0:
+        ocr_streams.prime(job, latest.image_bytes, latest.timestamp)
+    return jsonify(job.to_dict())
+
+@app.route("/api/ocr/streams/<job_id>", methods=["GET"])
+def get_ocr_stream(job_id):
+    job = ocr_streams.get(job_id)
+    if job is None:
+        return jsonify({"error": f"OCR stream '{job_id}' not found."}), 404
+    return jsonify(job)
+
+@app.route("/api/ocr/streams/<job_id>", methods=["DELETE"])
+def detach_ocr_stream(job_id):
+    # Each POST holds one reference; the job keeps running until every holder detached.
+    references = ocr_streams.detach(job_id)
+    if references is None:
+        return jsonify({"error": f"OCR stream '{job_id}' not found."}), 404
+    return jsonify({"status": "detached" if references == 0 else "released", "job_id": job_id, "references": references})
+
 # ---------------------------------------------
 # Borealis Agent API Endpoints
 # ---------------------------------------------
 # These endpoints handle agent registration, provisioning, and image streaming.
-registered_agents = {}
-agent_configurations = {}
-latest_images = {}
+agent_configurations = state_backend.mapping("agent_configurations")
+# Trigger / active values pushed to macro roles since their config was provisioned,
+# "agent_id:node_id:field" -> {"version": config version, "value": ...}. Kept apart from
+# agent_configurations so a trigger never rewrites (and races with) a provision.
+macro_triggers = state_backend.mapping("macro_triggers")
+MACRO_TRIGGER_FIELDS = ("trigger", "active")
+
+def agent_config(agent_id):
+    """The provisioned config with the trigger values pushed since, as sent to the agent."""
+    config = copy.deepcopy(agent_configurations.get(agent_id))
+    if config is None:
+        return None
+    prefix = f"{agent_id}:"
+    for key, pushed in list(macro_triggers.items()):
+        if not key.startswith(prefix):
+            continue
+        if pushed["version"] != config["version"]:
+            # Pushed for an older provision, whose roles replaced it.
+            modify(macro_triggers, key, lambda entry: DELETE if entry and entry["version"] < config["version"] else None)
+            continue
+        node_id, _, field = key[len(prefix):].rpartition(":")
+        for role in config["roles"]:
+            if isinstance(role, dict) and role.get("node_id") == node_id:
+                role[field] = pushed["value"]
+    return config
+# Online / offline agents: sid index, heartbeat expiry and "agents_changed" deltas to
+# the "agent_presence" room (see agent_presence.py)
+agent_presence = AgentPresence(
+    status_of=lambda agent_id: "provisioned" if agent_id in agent_configurations else "orphaned",
+    emit=lambda delta: socketio.emit("agents_changed", delta, to="agent_presence"),
+    backend=state_backend
+)
+registered_agents = agent_presence.agents
+# Latest frame per stream, bounded by TTL and a memory budget (see frame_store.py)
+frame_store = FrameStore(shared=state_backend.mapping("frames", raw=True, ttl=FRAME_TTL) if state_backend.shared else None)
+# PNG decode / encode of tiled updates runs in eventlet's thread pool, off the hub
+tile_assembler = TileAssembler(run=tpool.execute)
+# Rate controller state reported by agents with each frame (effective FPS, interval);
+# stored at most once per second per stream, like AgentPresence.touch()
+stream_rates = state_backend.mapping("stream_rates")
+stream_rates_written = {}  # stream key -> time.monotonic() of the last write
 
+# ---------------------------------------------
+# Frame Transport (binary / base64 negotiation)
+# ---------------------------------------------
+# Frames are stored as raw PNG bytes. Clients that announce {"binary_frames": true}
+# via "client_capabilities" receive them as Socket.IO binary attachments
+# ("image_bytes"); every other client keeps receiving "image_base64" strings.
+SERVER_CAPABILITIES = {"binary_frames": True, "frame_tiles": True, "heartbeat_interval": AGENT_HEARTBEAT_INTERVAL}
+frame_consumers = {}  # sid -> "binary" | "base64"
+
+# ---------------------------------------------
+# Socket.IO Rooms
+# ---------------------------------------------
+# Agents join "agent:<agent_id>" (and "agents"), so configs and window-list requests
+# reach only the agent they are meant for. UI clients "subscribe_stream" to the
+# agent_id:node_id streams they display and receive frames, macro status and OCR
+# results for those streams only; "list_agent_windows" adds the requester to
+# "agent_watchers:<agent_id>", where the agent's reply is delivered.
+stream_subscribers = {}  # stream key -> {sid: frame mode}
+client_streams = {}      # sid -> set of subscribed stream keys
+# With several workers, each one also publishes which frame modes its own clients want
+# per stream, so the worker an agent is connected to relays frames for all of them.
+shared_stream_modes = state_backend.mapping("stream_modes") if state_backend.shared else None
+remote_stream_modes = {}  # stream key -> (refresh at, modes wanted by other workers)
+
+def stream_key(agent_id, node_id=None):
+    return f"{agent_id}:{node_id}" if node_id else str(agent_id)
+
+def stream_room(key, mode):
+    return f"stream:{key}:{mode}"
+
+def publish_stream_modes(key):
+    if shared_stream_modes is None:
+        return
+    modes = sorted(set(stream_subscribers.get(key, {}).values()))
+
+    def change(workers):
+        # Only this worker's own entry changes; the other workers' entries are kept as stored.
+        workers = workers or {}
+        if modes == workers.get(WORKER_ID, []):
+            return None
+        if modes:
+            workers[WORKER_ID] = modes
+        else:
+            workers.pop(WORKER_ID, None)
+        return workers or DELETE
+
+    modify(shared_stream_modes, key, change)
+
+def stream_modes(key):
+    modes = set(stream_subscribers.get(key, {}).values())
+    if shared_stream_modes is None:
+        return modes
+    now = time.monotonic()
+    cached = remote_stream_modes.get(key)
+    if cached is None or cached[0] < now:
+        workers = shared_stream_modes.get(key, {})
+        cached = remote_stream_modes[key] = (now + 1.0, {mode for wanted in workers.values() for mode in wanted})
+    return modes | cached[1]
+
+def subscribe_stream(sid, key):
+    mode = frame_consumers.get(sid, "base64")
+    stream_subscribers.setdefault(key, {})[sid] = mode
+    client_streams.setdefault(sid, set()).add(key)
+    join_room(stream_room(key, mode), sid=sid)
+    publish_stream_modes(key)
+
+def unsubscribe_stream(sid, key):
+    subscribers = stream_subscribers.get(key, {})
+    mode = subscribers.pop(sid, None)
+    if not subscribers:
+        stream_subscribers.pop(key, None)
+    client_streams.get(sid, set()).discard(key)
+    if mode:
+        leave_room(stream_room(key, mode), sid=sid)
+    publish_stream_modes(key)
+
+def emit_to_stream(event, payload, key):
+    """Emit a non-frame event to every subscriber of a stream, whatever its frame mode."""
+    for mode in stream_modes(key):
+        socketio.emit(event, payload, to=stream_room(key, mode))
+
+def read_frame_payload(data):
+    """Return the raw image bytes carried by an agent frame event (None if geometry-only)."""
+    image_bytes = data.get("image_bytes")
+    if image_bytes:
+        return bytes(image_bytes)
+    image_b64 = data.get("image_base64")
+    if image_b64:
+        return base64.b64decode(image_b64)
+    return None
+
+def assemble_tiles(agent_id, node_id, data):
+    """
+    Rebuild a full frame from an agent's dirty tiles and store it; returns the stored
+    Frame, or None (and asks for a keyframe) if the base frame is gone.
+    """
+    key = stream_key(agent_id, node_id)
+    with tile_assembler.lock(key):
+        base = frame_store.get(key)
+        frame = None
+        if base is not None:
+            tiles = [(tile.get("x", 0), tile.get("y", 0), read_frame_payload(tile)) for tile in data["tiles"]]
+            frame = tile_assembler.apply(key, base.image_bytes, tiles, (data.get("frame_w"), data.get("frame_h")))
+        if frame is not None:
+            return frame_store.put(key, frame)
+    socketio.emit("request_keyframe", {"agent_id": agent_id, "node_id": node_id}, to=f"agent:{agent_id}")
+    return None
+
+def relay_frame(event, data, frame, key):
+    meta = {k: v for k, v in data.items() if k not in ("image_bytes", "image_base64", "tiles")}
+    modes = stream_modes(key)
+    if "binary" in modes:
+        socketio.emit(event, {**meta, "image_bytes": frame}, to=stream_room(key, "binary"))
+    if "base64" in modes:
+        # Reuse the agent's string when it sent base64, so legacy paths never re-encode.
+        image_b64 = data.get("image_base64") or (base64.b64encode(frame).decode("utf-8") if frame else "")
+        socketio.emit(event, {**meta, "image_base64": image_b64}, to=stream_room(key, "base64"))
+
+# /api/agents?since=<seq>: Only what changed after seq ({"seq", "full": false, "upserted",
+# "removed"}), or {"seq", "full": true, "agents"} if seq is too old. Without since, the
+# full registered_agents dict as before.
 @app.route("/api/agents")
 def get_agents():
-    return jsonify(registered_agents)
+    since = request.args.get("since", type=int)
+    if since is not None:
+        return jsonify(agent_presence.changes_since(since))
+    return jsonify({
+        agent_id: {k: v for k, v in agent.items() if k != "sid"}  # The connection's sid stays internal.
+        for agent_id, agent in registered_agents.items()
+    })
+
+@app.route("/api/agents/presence")
+def agent_presence_stats():
+    return jsonify(agent_presence.stats())
+
+presence_sweeper_started = False
+
+def ensure_presence_sweeper():
+    # Started with the first agent; each sweep only pops heap entries that are due.
+    global presence_sweeper_started
+    if presence_sweeper_started:
+        return
+    presence_sweeper_started = True
+
+    def sweep():
+        while True:
+            agent_presence.expire()
+            socketio.sleep(1)
+
+    socketio.start_background_task(sweep)
+
+# /api/agents/<agent_id>/stats: Latest per-role telemetry reported by the agent
+# (capture / encode / emit latency, payload size, rates, drops, macro latency),
+# next to what the server observed for the same streams.
+@app.route("/api/agents/<agent_id>/stats")
+def get_agent_stats(agent_id):
+    agent = registered_agents.get(agent_id)
+    if agent is None:
+        return jsonify({"error": f"Agent '{agent_id}' not found."}), 404
+    prefix = f"{agent_id}:"
+    streams = {key[len(prefix):]: rates for key, rates in stream_rates.items() if key.startswith(prefix)}
+    return jsonify({
+        "agent_id": agent_id,
+        **agent.get("stats", {"roles": {}}),
+        "server": {"streams": streams}
+    })
 
 @app.route("/api/agent/provision", methods=["POST"])
 def provision_agent():
@@ -104,18 +432,197 @@ def provision_agent():
     if not agent_id or not isinstance(roles, list):
         return jsonify({"error": "Missing agent_id or roles[] in provision payload."}), 400
 
-    config = {"roles": roles}
-    agent_configurations[agent_id] = config
+    # The version only moves when the roles actually change, so agents can ignore repeated pushes.
+    # Versions come from an atomic counter, so provisions racing on two workers never share one.
+    def change(previous):
+        if previous is not None and previous["roles"] == roles:
+            return None
+        return {"roles": roles, "version": state_backend.incr("agent_config_version", agent_id)}
+
+    modify(agent_configurations, agent_id, change)
+    config = agent_config(agent_id)
+
+    agent_presence.refresh_status(agent_id)
+
+    # Frames of nodes that are no longer part of the agent's roles are dropped right away.
+    keep_nodes = {role.get("node_id") for role in roles if isinstance(role, dict)}
+    frame_store.delete_agent(agent_id, keep_nodes=keep_nodes)
+    for key in [k for k in stream_rates if k.startswith(f"{agent_id}:") and k.split(":", 1)[1] not in keep_nodes]:
+        stream_rates.pop(key, None)
+        stream_rates_written.pop(key, None)
+
+    socketio.emit("agent_config", config, to=f"agent:{agent_id}")
+    return jsonify({"status": "provisioned", "roles": roles, "version": config["version"]})
+
+# /api/agent/<agent_id>/node/<node_id>/frame: Latest frame of a stream as an image.
+# Supports If-None-Match, so pollers only download frames that actually changed.
+@app.route("/api/agent/<agent_id>/node/<node_id>/frame")
+def get_latest_frame(agent_id, node_id):
+    frame = frame_store.get(stream_key(agent_id, node_id))
+    if frame is None:
+        return jsonify({"error": f"No recent frame for {agent_id}:{node_id}."}), 404
+
+    if frame.etag in request.if_none_match:
+        resp = make_response("", 304)
+    else:
+        resp = make_response(frame.image_bytes)
+        resp.headers["Content-Type"] = frame.content_type
+    resp.set_etag(frame.etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Frame-Timestamp"] = str(frame.timestamp)
+    return resp
+
+# /api/frames/stats: Frame store size, hit rate, evictions and expirations, how many
+# frames were rebuilt from dirty tiles, and each stream's adaptive frame rate.
+@app.route("/api/frames/stats")
+def frame_store_stats():
+    return jsonify({**frame_store.stats(), "tiles": tile_assembler.stats(), "streams": dict(stream_rates.items())})
+
+# ---------------------------------------------
+# Workflow Persistence
+# ---------------------------------------------
+# Workflows are saved as <BOREALIS_WORKFLOWS_DIR>/<workflow_id>.json with their large
+# base64 fields moved to a content-addressed blob store (see workflow_store.py), so
+# opening a workflow transfers kilobytes; images are fetched from /api/blobs as needed.
+# The default sits next to the server folder (Server/Workflows when deployed), because
+# the launch scripts recreate Server/Borealis on every start; they also seed it with the
+# bundled workflows from the repository's Workflows folder.
+WORKFLOWS_DIR = os.environ.get(
+    "BOREALIS_WORKFLOWS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Workflows")
+)
+workflow_store = WorkflowStore(WORKFLOWS_DIR)
 
-    if agent_id in registered_agents:
-        registered_agents[agent_id]["status"] = "provisioned"
+@app.route("/api/workflows", methods=["GET"])
+def list_workflows():
+    return jsonify(workflow_store.list())
 
-    socketio.emit("agent_config", config)
-    return jsonify({"status": "provisioned", "roles": roles})
+@app.route("/api/workflows", methods=["POST"])
+def create_workflow():
+    graph = request.get_json(silent=True) or {}
+    return save_workflow(workflow_id_from_name(graph.get("tab_name")))
+
+# ?inline=1 returns the workflow with every blob embedded again (file export).
+@app.route("/api/workflows/<path:workflow_id>", methods=["GET"])
+def load_workflow(workflow_id):
+    try:
+        graph = workflow_store.load(workflow_id, inline=request.args.get("inline") in ("1", "true"))
+    except FileNotFoundError:
+        return jsonify({"error": f"Workflow '{workflow_id}' not found."}), 404
+    except (WorkflowStoreError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({**graph, "workflow_id": workflow_id})
+
+@app.route("/api/workflows/<path:workflow_id>", methods=["PUT"])
+def save_workflow(workflow_id):
+    graph = request.get_json(silent=True)
+    if not isinstance(graph, dict):
+        return jsonify({"error": "Workflow JSON body required."}), 400
+    graph.pop("workflow_id", None)
+    try:
+        return jsonify(workflow_store.save(workflow_id, graph))
+    except WorkflowStoreError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/api/workflows/<path:workflow_id>", methods=["DELETE"])
+def delete_workflow(workflow_id):
+    try:
+        deleted = workflow_store.delete(workflow_id)
+    except WorkflowStoreError as e:
+        return jsonify({"error": str(e)}), 400
+    if not deleted:
+        return jsonify({"error": f"Workflow '{workflow_id}' not found."}), 404
+    return jsonify({"status": "deleted", "workflow_id": workflow_id, "blobs_removed": workflow_store.collect_garbage()})
+
+# Blobs are immutable (named by their SHA-256), so browsers may cache them forever.
+@app.route("/api/blobs/<digest>")
+def get_blob(digest):
+    try:
+        data = workflow_store.blobs.get(digest)
+    except (WorkflowStoreError, OSError):
+        return jsonify({"error": f"Blob '{digest}' not found."}), 404
+    resp = make_response(data)
+    resp.headers["Content-Type"] = sniff_content_type(data)
+    resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    resp.set_etag(digest)
+    return resp
+
+@app.route("/api/workflow_store/stats")
+def workflow_store_stats():
+    return jsonify(workflow_store.stats())
+
+# ---------------------------------------------
+# Headless Workflow Engine
+# ---------------------------------------------
+# Runs saved workflows on the server (see workflow_engine.py), fed by agent frames,
+# so they keep running without a browser tab. Changed node values are emitted as
+# "workflow_values" to clients that joined the workflow via "subscribe_workflow".
+
+def latest_frame_bytes(key):
+    frame = frame_store.get(key)
+    return frame.image_bytes if frame else None
+
+workflow_engine = WorkflowEngine(
+    WorkflowServices(
+        ocr=ocr_service(ocr_pool.run),
+        macro_trigger=lambda agent_id, node_id, trigger: forward_macro_trigger({"agent_id": agent_id, "node_id": node_id, "trigger": trigger}),
+        run=tpool.execute
+    ),
+    spawn=socketio.start_background_task,
+    emit=lambda workflow_id, payload: socketio.emit("workflow_values", payload, to=f"workflow:{workflow_id}")
+)
+
+def read_workflow_file(relative_path):
+    workflow_id = relative_path[:-len(".json")] if relative_path.endswith(".json") else relative_path
+    try:
+        return workflow_store.load(workflow_id, inline=True)
+    except (FileNotFoundError, WorkflowStoreError):
+        raise WorkflowError(f"Workflow file '{relative_path}' not found.")
+
+# /api/workflow_runs: Start (or replace) a headless run. Body is either the workflow
+# JSON itself under "graph", or "path" of a saved workflow (relative to the Workflows
+# folder, ".json" optional), e.g.
+# {"workflow_id": "flyff", "path": "Flyff Universe/flyff_character_status_workflow.json"}
+@app.route("/api/workflow_runs", methods=["POST"])
+def start_workflow_run():
+    payload = request.get_json() or {}
+    try:
+        if payload.get("graph"):
+            graph = workflow_store.inline(payload["graph"])  # May still hold blob references.
+        else:
+            graph = read_workflow_file(payload.get("path") or "")
+        workflow_id = str(payload.get("workflow_id") or graph.get("tab_name") or "").strip()
+        if not workflow_id:
+            raise WorkflowError("Missing workflow_id (or tab_name in the workflow JSON).")
+        workflow = workflow_engine.load(workflow_id, graph, frames=latest_frame_bytes)
+    except (WorkflowError, WorkflowStoreError, OSError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(workflow.to_dict())
+
+@app.route("/api/workflow_runs", methods=["GET"])
+def list_workflow_runs():
+    return jsonify(workflow_engine.workflows())
+
+@app.route("/api/workflow_runs/<workflow_id>", methods=["GET"])
+def get_workflow_run(workflow_id):
+    workflow = workflow_engine.get(workflow_id)
+    if workflow is None:
+        return jsonify({"error": f"Workflow run '{workflow_id}' not found."}), 404
+    return jsonify(workflow)
+
+@app.route("/api/workflow_runs/<workflow_id>", methods=["DELETE"])
+def stop_workflow_run(workflow_id):
+    if not workflow_engine.unload(workflow_id):
+        return jsonify({"error": f"Workflow run '{workflow_id}' not found."}), 404
+    return jsonify({"status": "stopped", "workflow_id": workflow_id})
 
 # ---------------------------------------------
 # Borealis External API Proxy Endpoint
 # ---------------------------------------------
+# Pooled keep-alive connections per upstream host, streamed bodies, and identical
+# concurrent GETs collapsed into one upstream call (optionally cached, see api_proxy.py).
+api_proxy = UpstreamProxy()
+
 @app.route("/api/proxy", methods=["GET", "POST", "OPTIONS"])
 def proxy():
     target = request.args.get("url")
@@ -123,22 +630,23 @@ def proxy():
         return {"error": "Missing ?url="}, 400
 
     # Forward method, headers, body
-    upstream = requests.request(
-        method  = request.method,
-        url     = target,
-        headers = {k:v for k,v in request.headers if k.lower() != "host"},
-        data    = request.get_data(),
-        timeout = 10
-    )
-
-    excluded = ["content-encoding","content-length","transfer-encoding","connection"]
-    headers  = [(k,v) for k,v in upstream.raw.headers.items() if k.lower() not in excluded]
-
-    resp = make_response(upstream.content, upstream.status_code)
-    for k,v in headers:
-        resp.headers[k] = v
+    try:
+        result = api_proxy.forward(request.method, target, request.headers.items(), request.get_data())
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except requests.RequestException as e:
+        return {"error": f"Upstream request failed: {e}"}, 502
+
+    resp = Response(result.body, result.status)
+    for k,v in result.headers:
+        resp.headers.add(k, v)  # add(), so repeated headers such as Set-Cookie all pass through
+    resp.headers["X-Borealis-Proxy-Cache"] = result.cache
     return resp
 
+@app.route("/api/proxy/stats")
+def proxy_stats():
+    return jsonify(api_proxy.stats())
+
 # ---------------------------------------------
 # Live Screenshot Viewer for Debugging
 # ---------------------------------------------
@@ -177,10 +685,20 @@ def screenshot_node_viewer(agent_id, node_id):
             const ctx = canvas.getContext("2d");
             const socket = io(window.location.origin, {{ transports: ["websocket"] }});
 
+            socket.on("connect", () => {{
+                socket.emit("client_capabilities", {{ binary_frames: true }});
+                socket.emit("subscribe_stream", {{ agent_id: agentId, node_id: nodeId }});
+            }});
+
             socket.on("agent_screenshot_task", (data) => {{
                 if (data.agent_id !== agentId || data.node_id !== nodeId) return;
-                const base64 = data.image_base64;
-                if (!base64 || base64.length < 100) return;
+                let src = null;
+                if (data.image_bytes) {{
+                    src = URL.createObjectURL(new Blob([data.image_bytes], {{ type: data.format || "image/png" }}));
+                }} else if (data.image_base64 && data.image_base64.length >= 100) {{
+                    src = "data:" + (data.format || "image/png") + ";base64," + data.image_base64;
+                }}
+                if (!src) return;
 
                 const img = new Image();
                 img.onload = () => {{
@@ -190,8 +708,9 @@ def screenshot_node_viewer(agent_id, node_id):
                     }}
                     ctx.clearRect(0, 0, canvas.width, canvas.height);
                     ctx.drawImage(img, 0, 0);
+                    if (data.image_bytes) URL.revokeObjectURL(src);
                 }};
-                img.src = "data:image/png;base64," + base64;
+                img.src = src;
             }});
         </script>
     </body>
@@ -201,24 +720,80 @@ def screenshot_node_viewer(agent_id, node_id):
 # ---------------------------------------------
 # WebSocket Events for Real-Time Communication
 # ---------------------------------------------
+@socketio.on("connect")
+def on_connect():
+    # Every client starts as a base64 frame consumer until it announces otherwise.
+    frame_consumers[request.sid] = "base64"
+
+@socketio.on("client_capabilities")
+def receive_client_capabilities(data):
+    if data.get("binary_frames") and frame_consumers.get(request.sid) != "binary":
+        frame_consumers[request.sid] = "binary"
+        # Move existing subscriptions over to the binary rooms.
+        for key in list(client_streams.get(request.sid, ())):
+            unsubscribe_stream(request.sid, key)
+            subscribe_stream(request.sid, key)
+
+@socketio.on("subscribe_stream")
+def handle_subscribe_stream(data):
+    agent_id = data.get("agent_id")
+    if not agent_id:
+        return
+    subscribe_stream(request.sid, stream_key(agent_id, data.get("node_id")))
+
+@socketio.on("subscribe_workflow")
+def on_subscribe_workflow(data):
+    if data.get("workflow_id"):
+        join_room(f"workflow:{data['workflow_id']}")
+
+@socketio.on("unsubscribe_workflow")
+def on_unsubscribe_workflow(data):
+    if data.get("workflow_id"):
+        leave_room(f"workflow:{data['workflow_id']}")
+
+@socketio.on("unsubscribe_stream")
+def handle_unsubscribe_stream(data):
+    agent_id = data.get("agent_id")
+    if not agent_id:
+        return
+    unsubscribe_stream(request.sid, stream_key(agent_id, data.get("node_id")))
+
 @socketio.on("agent_screenshot_task")
 def receive_screenshot_task(data):
+    # The return value is the Socket.IO ack agents use for backpressure (see rate_control.py).
+    started = time.perf_counter()
     agent_id = data.get("agent_id")
     node_id = data.get("node_id")
-    image = data.get("image_base64", "")
-    
+
     if not agent_id or not node_id:
         print("[WS] Screenshot task missing agent_id or node_id.")
         return
 
-    if image:
-        latest_images[f"{agent_id}:{node_id}"] = {
-            "image_base64": image,
-            "timestamp": time.time()
+    if data.get("tiles"):
+        stored = assemble_tiles(agent_id, node_id, data)
+        frame = stored.image_bytes if stored else None
+        data = {**data, "format": "image/png"}  # Reassembled frames are always PNG
+    else:
+        frame = read_frame_payload(data)
+        stored = frame_store.put(stream_key(agent_id, node_id), frame) if frame else None
+
+    agent_presence.touch(agent_id)
+    if frame:
+        ocr_streams.on_frame(agent_id, node_id, frame, stored.timestamp)
+        workflow_engine.on_frame(agent_id, node_id, frame, stored.timestamp)
+
+    if "fps" in data and stream_rates_written.get(stream_key(agent_id, node_id), 0) < time.monotonic() - 1:
+        stream_rates_written[stream_key(agent_id, node_id)] = time.monotonic()
+        stream_rates[stream_key(agent_id, node_id)] = {
+            "effective_fps": data.get("fps"),
+            "interval_ms": data.get("interval_ms"),
+            "encode_ms": data.get("encode_ms"),
+            "updated": time.time()
         }
 
     # Emit the full payload, including geometry (even if image is empty)
-    emit("agent_screenshot_task", data, broadcast=True)
+    relay_frame("agent_screenshot_task", data, frame, stream_key(agent_id, node_id))
+    return {"server_ms": round((time.perf_counter() - started) * 1000, 2)}
 
 @socketio.on("connect_agent")
 def connect_agent(data):
@@ -226,41 +801,83 @@ def connect_agent(data):
     hostname = data.get("hostname", "unknown")
     print(f"Agent connected: {agent_id}")
 
-    registered_agents[agent_id] = {
-        "agent_id": agent_id,
-        "hostname": hostname,
-        "last_seen": time.time(),
-        "status": "orphaned" if agent_id not in agent_configurations else "provisioned"
-    }
+    agent_presence.connect(agent_id, request.sid, hostname)
+    ensure_presence_sweeper()
+
+    join_room(f"agent:{agent_id}")
+    join_room("agents")
+
+    # Agents produce frames rather than consume them; tell them what transport we accept.
+    frame_consumers.pop(request.sid, None)
+    emit("server_capabilities", SERVER_CAPABILITIES)
+
+@socketio.on("agent_stats")
+def receive_agent_stats(data):
+    """
+    Periodic telemetry from an agent, see role_telemetry.py on the agent. Payload:
+    {"agent_id", "timestamp", "roles": {node_id: {...}}, "capture": {...}, "macro": {...}}
+    """
+    agent_presence.touch(data.get("agent_id"))
+    agent_presence.update(data.get("agent_id"), stats={
+        "reported_at": data.get("timestamp"),
+        "received_at": time.time(),
+        "roles": data.get("roles", {}),
+        "capture": data.get("capture", {}),
+        "macro": data.get("macro", {})
+    })
+
+@socketio.on("agent_heartbeat")
+def receive_agent_heartbeat(data):
+    agent_id = data.get("agent_id")
+    if agent_id:
+        agent_presence.heartbeat(agent_id, request.sid, data.get("hostname"))
+        ensure_presence_sweeper()
+
+# UI clients join "agent_presence" for "agents_changed" deltas; the ack is the current
+# snapshot, deltas with a seq at or below it are already included.
+@socketio.on("subscribe_agents")
+def on_subscribe_agents(data=None):
+    join_room("agent_presence")
+    return agent_presence.snapshot()
+
+@socketio.on("unsubscribe_agents")
+def on_unsubscribe_agents(data=None):
+    leave_room("agent_presence")
 
 @socketio.on("request_config")
 def send_agent_config(data):
     agent_id = data.get("agent_id")
-    config = agent_configurations.get(agent_id)
+    config = agent_config(agent_id)
     if config:
         emit("agent_config", config)
 
 @socketio.on("screenshot")
 def receive_screenshot(data):
     agent_id = data.get("agent_id")
-    image = data.get("image_base64")
+    frame = read_frame_payload(data)
 
-    if agent_id and image:
-        latest_images[agent_id] = {
-            "image_base64": image,
-            "timestamp": time.time()
-        }
-        emit("new_screenshot", {"agent_id": agent_id, "image_base64": image}, broadcast=True)
+    if agent_id and frame:
+        frame_store.put(stream_key(agent_id), frame)
+        relay_frame("new_screenshot", {"agent_id": agent_id, "image_base64": data.get("image_base64")}, frame, stream_key(agent_id))
 
 @socketio.on("disconnect")
 def on_disconnect():
-    print("[WebSocket] Connection Disconnected")
+    # Socket.IO drops the rooms themselves; only our subscription index needs cleanup.
+    for key in list(client_streams.pop(request.sid, ())):
+        subscribers = stream_subscribers.get(key, {})
+        subscribers.pop(request.sid, None)
+        if not subscribers:
+            stream_subscribers.pop(key, None)
+        publish_stream_modes(key)
+    frame_consumers.pop(request.sid, None)
+    agent_id = agent_presence.disconnect(request.sid)
+    print(f"[WebSocket] Agent Disconnected: {agent_id}" if agent_id else "[WebSocket] Connection Disconnected")
 
 # Macro Websocket Handlers
 @socketio.on("macro_status")
 def receive_macro_status(data):
     """
-    Receives macro status/errors from agent and relays to all clients
+    Receives macro status/errors from agent and relays them to the node's subscribers
     Expected payload: {
         "agent_id": ...,
         "node_id": ...,
@@ -270,30 +887,116 @@ def receive_macro_status(data):
     }
     """
     print(f"[Macro Status] Agent {data.get('agent_id')} Node {data.get('node_id')} Success: {data.get('success')} Msg: {data.get('message')}")
-    emit("macro_status", data, broadcast=True)
+    emit_to_stream("macro_status", data, stream_key(data.get("agent_id"), data.get("node_id")))
+
+@socketio.on("macro_trigger")
+def handle_macro_trigger(data):
+    """
+    Pushes a macro node's trigger value (and active flag) straight to its agent, so the
+    role reacts without waiting for a full re-provision. Stored config is kept in sync
+    without bumping its version, so a reconnecting agent gets the latest values.
+    Expected payload: {"agent_id": ..., "node_id": ..., "trigger": 0/1, "active": optional}
+    """
+    forward_macro_trigger(data)
+
+def forward_macro_trigger(data):
+    # Shared by the WebUI event above and headless workflows (workflow_engine.py).
+    agent_id = data.get("agent_id")
+    node_id = data.get("node_id")
+    if not agent_id or not node_id:
+        return
+    config = agent_configurations.get(agent_id)
+    if config is not None:
+        # One entry per field, never a rewrite of the provisioned config (see agent_config()).
+        for field in MACRO_TRIGGER_FIELDS:
+            if field in data:
+                macro_triggers[f"{agent_id}:{node_id}:{field}"] = {"version": config["version"], "value": data[field]}
+    socketio.emit("macro_trigger", data, to=f"agent:{agent_id}")
 
 @socketio.on("list_agent_windows")
 def handle_list_agent_windows(data):
     """
-    Forwards list_agent_windows event to all agents (or filter for a specific agent_id).
+    Forwards list_agent_windows to the requested agent (or to every agent if no agent_id),
+    and subscribes the requester to that agent's window list replies.
     """
     agent_id = data.get("agent_id")
-    # You can target a specific agent if you track rooms/sessions.
-    # For now, broadcast to all agents so the correct one can reply.
-    emit("list_agent_windows", data, broadcast=True)
+    if agent_id:
+        join_room(f"agent_watchers:{agent_id}")
+        emit("list_agent_windows", data, to=f"agent:{agent_id}")
+    else:
+        join_room("agent_watchers:*")
+        emit("list_agent_windows", data, to="agents")
 
 @socketio.on("agent_window_list")
 def handle_agent_window_list(data):
     """
-    Relay the list of windows from the agent back to all connected clients.
+    Relay the list of windows from the agent back to the clients that asked for it.
     """
-    emit("agent_window_list", data, broadcast=True)
+    emit("agent_window_list", data, to=[f"agent_watchers:{data.get('agent_id')}", "agent_watchers:*"])
 
 
+# ---------------------------------------------
+# Multi-Worker Mode
+# ---------------------------------------------
+# BOREALIS_WORKERS=N starts N server processes that all accept on port 5000
+# (SO_REUSEPORT; the kernel spreads connections across them). Agents and the WebUI use
+# websocket-only Socket.IO, so no sticky sessions are needed. Requires a shared
+# BOREALIS_STATE_BACKEND and a BOREALIS_MESSAGE_QUEUE, e.g. for one machine:
+#   BOREALIS_WORKERS=4 BOREALIS_STATE_BACKEND=sqlite:///state.db BOREALIS_MESSAGE_QUEUE=sqlite:///queue.db
+# OCR pools, OCR stream jobs and headless workflow runs stay per worker.
+def run_worker_pool(workers):
+    if not state_backend.shared or not MESSAGE_QUEUE_URL:
+        sys.exit("[Server] BOREALIS_WORKERS > 1 needs a shared BOREALIS_STATE_BACKEND and a BOREALIS_MESSAGE_QUEUE.")
+    if not hasattr(socket, "SO_REUSEPORT"):
+        sys.exit("[Server] BOREALIS_WORKERS > 1 needs SO_REUSEPORT (Linux / BSD / macOS).")
+    command = [sys.executable] if getattr(sys, "frozen", False) else [sys.executable, os.path.abspath(__file__)]
+
+    def start(index):
+        # A (re)started worker has no clients yet; drop what it published before.
+        def change(wanted):
+            if not wanted or str(index) not in wanted:
+                return None
+            wanted.pop(str(index))
+            return wanted or DELETE
+
+        for key in list(shared_stream_modes):
+            modify(shared_stream_modes, key, change)
+        return subprocess.Popen(command, env={**os.environ, "BOREALIS_WORKER_INDEX": str(index)})
+
+    processes = {index: start(index) for index in range(workers)}
+    print(f"[Server] Started {workers} workers: {[p.pid for p in processes.values()]}")
+    try:
+        while True:
+            time.sleep(1)
+            for index, process in list(processes.items()):
+                if process.poll() is not None:
+                    print(f"[Server] Worker {index} exited with code {process.returncode}; restarting.")
+                    processes[index] = start(index)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.wait(timeout=10)
+
 # ---------------------------------------------
 # Server Launch
 # ---------------------------------------------
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    if SERVER_WORKERS > 1 and "BOREALIS_WORKER_INDEX" not in os.environ:
+        run_worker_pool(SERVER_WORKERS)
+        sys.exit(0)
     import eventlet.wsgi
-    listener = eventlet.listen(('0.0.0.0', 5000))
-    eventlet.wsgi.server(listener, app)
+    listener = eventlet.listen(('0.0.0.0', 5000), reuse_port=SERVER_WORKERS > 1 or None)
+    if state_backend.shared:
+        # Renews this worker's lease and reaps agents of dead workers, even with no agents of its own.
+        ensure_presence_sweeper()
+    if OCR_WARMUP:
+        # Load OCR models in the background once the port is bound, not before.
+        eventlet.spawn(ocr_pool.warm_up)
+    try:
+        eventlet.wsgi.server(listener, app)
+    finally:
+        ocr_pool.shutdown()